@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+과목/주차/강의 목록 추출 WebDriver 왕복 횟수 비교 (로컬 픽스처 페이지)
+- 과목 목록과 주차/학습하기 버튼이 있는 HTML 을 만들어 headless Chrome 으로 열고
+- 요소별 find_element/.text/get_attribute 방식(예전)과 page_extract 의 스크립트 한 번 방식을 비교
+- WebDriver 명령 수(= HTTP 왕복 수)와 걸린 시간을 출력하고 JSON 으로 저장
+- Chrome 과 selenium 이 필요하지만 네트워크나 LMS 계정은 필요 없음
+
+사용 예:
+    python benchmarks/dom_extraction.py --subjects 12 --weeks 15 --lectures 6
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from selenium import webdriver  # noqa: E402
+from selenium.webdriver.chrome.options import Options  # noqa: E402
+from selenium.webdriver.common.by import By  # noqa: E402
+
+from page_extract import read_elements, read_lecture_buttons, read_subjects  # noqa: E402
+from run_benchmarks import DEFAULT_RESULTS_DIR, git_commit  # noqa: E402
+
+
+def fixture_html(subjects: int, weeks: int, lectures: int):
+    rows = []
+    for index in range(subjects):
+        rows.append(
+            f'<div class="content-container"><a href="#" onclick="eclassRoom(\'A{index:04d}\');">'
+            f'<span class="content-title">과목 {index + 1}</span></a></div>'
+        )
+    week_rows = []
+    for week in range(1, weeks + 1):
+        cls = "wb-week" + (" wb-disabled" if week % 5 == 0 else "")
+        week_rows.append(f'<div class="{cls}"><span class="wb-week">{week}주</span></div>')
+    buttons = []
+    for index in range(lectures):
+        buttons.append(
+            f'<a href="#" onclick="viewGo(\'1\',\'{index}\',\'A\',\'B\',\'KJ{index:04d}\');">{index + 1}차시 강의</a>'
+        )
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'></head><body>"
+        + "".join(rows)
+        + '<div id="chart">' + "".join(week_rows) + "</div>"
+        + "<div>" + "".join(buttons) + "</div></body></html>"
+    )
+
+
+class CommandCounter:
+    """
+    driver.execute 를 감싸 WebDriver 명령(HTTP 왕복) 수를 셈
+    """
+
+    def __init__(self, driver):
+        self.count = 0
+        original = driver.execute
+
+        def execute(*args, **kwargs):
+            self.count += 1
+            return original(*args, **kwargs)
+
+        driver.execute = execute
+
+
+# 예전 방식 (요소마다 명령)
+
+def legacy_subjects(driver):
+    result = []
+    for subject in driver.find_elements(By.CLASS_NAME, "content-container"):
+        title = subject.find_element(By.CLASS_NAME, "content-title").text
+        onclick = subject.find_element(By.TAG_NAME, "a").get_attribute("onclick")
+        result.append((title, onclick))
+    return result
+
+
+def legacy_weeks(driver, elements):
+    return [(element.get_attribute("class"), element.text) for element in elements]
+
+
+def legacy_lectures(driver):
+    buttons = driver.find_elements(By.XPATH, "//*[contains(@onclick, 'viewGo(')]")
+    return [(button.get_attribute("onclick"), button.text.strip()) for button in buttons]
+
+
+# 스크립트 한 번
+
+def batch_subjects(driver):
+    return [(item["title"], item["onclick"]) for item in read_subjects(driver)]
+
+
+def batch_weeks(driver, elements):
+    return [(item["cls"], item["text"]) for item in read_elements(driver, elements)]
+
+
+def batch_lectures(driver):
+    return [(item["onclick"], item["text"]) for item in read_lecture_buttons(driver)]
+
+
+def run(driver, counter, function, repeat, *args):
+    times, commands, value = [], 0, None
+    for _ in range(repeat):
+        before = counter.count
+        began = time.perf_counter()
+        value = function(driver, *args)
+        times.append(time.perf_counter() - began)
+        commands = counter.count - before
+    return times, commands, value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="목록 추출 WebDriver 왕복 횟수 비교")
+    parser.add_argument("--subjects", type=int, default=12)
+    parser.add_argument("--weeks", type=int, default=15)
+    parser.add_argument("--lectures", type=int, default=6, help="주차 하나의 학습하기 버튼 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/dom_<시각>_<커밋>.json)")
+    args = parser.parse_args(argv)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".html", delete=False, encoding="utf-8") as f:
+        f.write(fixture_html(args.subjects, args.weeks, args.lectures))
+        page = f.name
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    driver = webdriver.Chrome(options=options)
+    entries = []
+    try:
+        driver.get("file:///" + page.replace(os.sep, "/").lstrip("/"))
+        counter = CommandCounter(driver)
+        week_elements = driver.find_elements(By.XPATH, '//div[@id="chart"]//div[contains(@class, "wb-week")]')
+        cases = [
+            ("subjects", legacy_subjects, batch_subjects, ()),
+            ("weeks", legacy_weeks, batch_weeks, (week_elements,)),
+            ("lectures", legacy_lectures, batch_lectures, ()),
+        ]
+        for name, legacy, batch, extra in cases:
+            for variant, function in (("per-element", legacy), ("batch", batch)):
+                times, commands, value = run(driver, counter, function, args.repeat, *extra)
+                entry = {
+                    "case": name,
+                    "variant": variant,
+                    "items": len(value),
+                    "commands": commands,
+                    "median": round(statistics.median(times), 4),
+                    "min": round(min(times), 4),
+                }
+                entries.append(entry)
+                print(f"{name:<9} {variant:<12} 항목 {entry['items']:4d}  명령 {commands:5d}  "
+                      f"median {entry['median'] * 1000:8.1f}ms")
+            legacy_value = legacy(driver, *extra)
+            if [tuple(v) for v in legacy_value] != [tuple(v) for v in batch(driver, *extra)]:
+                print(f"  [경고] {name}: 두 방식의 결과가 다릅니다")
+    finally:
+        driver.quit()
+        os.remove(page)
+
+    commit = git_commit()
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"dom_{time.strftime('%Y%m%d-%H%M%S')}_{commit}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"commit": commit, "settings": vars(args), "results": entries}, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,518 @@
+# -*- coding: utf-8 -*-
+"""
+미디어 처리 파이프라인 오프라인 벤치마크
+- 번들 ffmpeg(imageio-ffmpeg)로 길이/분할 수가 다른 가짜 강의 영상을 로컬에서 생성
+- 로컬 HTTP 서버(Range 지원 / 미지원 두 가지)로 내려주고 다운로드, 재생 시간 확인, 병합, 음성 추출 시간을 측정
+- 결과는 JSON 으로 저장해 커밋끼리 비교 (--compare 로 이전 결과와의 차이 출력)
+- 네트워크 연결이나 실제 LMS 계정 없이 실행됨
+
+사용 예:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --quick
+    python benchmarks/run_benchmarks.py --lengths 600,1800 --parts 1,4 --repeat 3 --compare benchmarks/results/old.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from audio_extract import (AUDIO_FORMAT_M4A, AUDIO_FORMATS, AUDIO_PROFILE_COPY, AUDIO_PROFILES,  # noqa: E402
+                           extract_audio, parallel_extract_audio)
+from ffmpeg_util import ffmpeg_exe, probe_duration, run_ffmpeg  # noqa: E402
+from http_client import MEDIA_RETRY_STATUS_FORCELIST, HttpClient  # noqa: E402
+from media_merge import concat_copy, transcode_concat  # noqa: E402
+from mp4box import read_duration_us  # noqa: E402
+from transfer import DEFAULT_CONNECTIONS, SegmentDownloader, remove_verification  # noqa: E402
+
+try:
+    # 예전 음성 추출 방식 (VideoFileClip(...).audio.write_audiofile) 비교용, 없으면 건너뜀
+    from moviepy import VideoFileClip
+except ImportError:
+    VideoFileClip = None
+
+try:
+    # 병렬 음성 인코딩 이음새 측정용, 없으면 측정하지 않음
+    import numpy
+except ImportError:
+    numpy = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_WORK_DIR = os.path.join(BENCH_DIR, ".work")
+DEFAULT_RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+STEPS = ("download", "probe", "merge", "audio")
+DEFAULT_LENGTHS = (60, 600, 1800)
+DEFAULT_PARTS = (1, 4)
+QUICK_LENGTHS = (30,)
+QUICK_PARTS = (1, 2)
+
+# 가짜 강의 영상: 저해상도 테스트 패턴 + 7초마다 0.8초 쉬는 단음 (무음 구간 탐색이 실제처럼 동작하도록)
+VIDEO_SIZE = "640x360"
+ODD_VIDEO_SIZE = "854x480"
+VIDEO_RATE = 15
+AUDIO_SOURCE = "aevalsrc=0.3*sin(2*PI*220*t)*gt(mod(t\\,7)\\,0.8):s=44100:c=stereo"
+# 병렬 음성 인코딩 이음새 측정: 비교 샘플레이트, 경계 앞뒤로 맞춰 볼 길이(초, 단음이 끊기는 곳이 들어가도록),
+# 찾아볼 최대 어긋남(초)
+SEAM_RATE = 48000
+SEAM_WINDOW = 4.0
+SEAM_MAX_LAG = 0.05
+
+# 서버에서 한 번에 보내는 크기
+SEND_CHUNK = 64 * 1024
+
+
+def log_quiet(message):
+    pass
+
+
+# ---------------------------------------------------------------------------
+# 가짜 강의 영상 생성
+# ---------------------------------------------------------------------------
+
+def generate_part(path: str, seconds: float, size=VIDEO_SIZE):
+    """
+    seconds 길이의 H.264 + AAC mp4 생성 (이미 있으면 그대로 사용)
+    """
+    if os.path.exists(path):
+        return path
+    run_ffmpeg([
+        "-f", "lavfi", "-i", f"testsrc2=size={size}:rate={VIDEO_RATE}",
+        "-f", "lavfi", "-i", AUDIO_SOURCE,
+        "-t", f"{seconds:.3f}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", "-g", str(VIDEO_RATE * 10),
+        "-c:a", "aac", "-b:a", "128k",
+        "-movflags", "+faststart", "-f", "mp4", path + ".tmp"
+    ])
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def generate_lecture(work_dir: str, length: int, parts: int):
+    """
+    length 초짜리 강의를 parts 개로 나눈 분할 영상 목록과,
+    마지막 분할만 해상도가 다른(재인코딩 병합이 필요한) 목록 반환
+    """
+    lecture_dir = os.path.join(work_dir, "media", f"{length}s_{parts}p")
+    os.makedirs(lecture_dir, exist_ok=True)
+    seconds = length / parts
+    paths = [generate_part(os.path.join(lecture_dir, f"part{index + 1}.mp4"), seconds) for index in range(parts)]
+    odd_paths = []
+    if parts > 1:
+        odd_last = generate_part(os.path.join(lecture_dir, f"part{parts}_odd.mp4"), seconds, ODD_VIDEO_SIZE)
+        odd_paths = paths[:-1] + [odd_last]
+    return paths, odd_paths
+
+
+# ---------------------------------------------------------------------------
+# 로컬 HTTP 서버
+# ---------------------------------------------------------------------------
+
+_RANGE_RE = re.compile(r"bytes=(\d+)-(\d*)$")
+
+
+class MediaRequestHandler(SimpleHTTPRequestHandler):
+    """
+    정적 파일 서버. range_enabled 가 False 면 Range 헤더를 무시하고 항상 200 전체 응답
+    throttle: 연결 하나의 최대 전송 속도 (bytes/s, 0 이면 제한 없음)
+    """
+    range_enabled = True
+    throttle = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._send(head=True)
+
+    def do_GET(self):
+        self._send(head=False)
+
+    def _send(self, head: bool):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        stat = os.stat(path)
+        size = stat.st_size
+        start, end = 0, size - 1
+        status = HTTPStatus.OK
+        match = _RANGE_RE.match(self.headers.get("Range", "")) if self.range_enabled else None
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            if start > end:
+                self.send_error(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                return
+            status = HTTPStatus.PARTIAL_CONTENT
+
+        self.send_response(status)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Last-Modified", self.date_time_string(int(stat.st_mtime)))
+        self.send_header("ETag", f'"{size:x}-{int(stat.st_mtime):x}"')
+        if self.range_enabled:
+            self.send_header("Accept-Ranges", "bytes")
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if head:
+            return
+
+        remaining = end - start + 1
+        began = time.monotonic()
+        sent = 0
+        with open(path, "rb") as f:
+            f.seek(start)
+            while remaining > 0:
+                chunk = f.read(min(SEND_CHUNK, remaining))
+                if not chunk:
+                    break
+                try:
+                    self.wfile.write(chunk)
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+                remaining -= len(chunk)
+                sent += len(chunk)
+                if self.throttle:
+                    ahead = sent / self.throttle - (time.monotonic() - began)
+                    if ahead > 0:
+                        time.sleep(ahead)
+
+
+class MediaServer:
+    """
+    root 폴더를 127.0.0.1 의 빈 포트로 내려주는 서버 (with 문으로 시작/종료)
+    """
+
+    def __init__(self, root: str, range_enabled: bool, throttle=0):
+        handler = type("Handler", (MediaRequestHandler,), {"range_enabled": range_enabled, "throttle": throttle})
+        self.root = root
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), lambda *a: handler(*a, directory=root))
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path: str):
+        relative = os.path.relpath(path, self.root).replace(os.sep, "/")
+        return f"http://127.0.0.1:{self.server.server_address[1]}/{relative}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+# ---------------------------------------------------------------------------
+# 측정
+# ---------------------------------------------------------------------------
+
+def _remove(path: str):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def measure(run, repeat: int, cleanup=None):
+    """
+    run() 을 repeat 번 실행한 시간(초) 목록과 마지막 반환값
+    cleanup 이 있으면 매 실행 뒤(측정 시간 밖에서) 호출
+    """
+    times, value = [], None
+    for _ in range(repeat):
+        began = time.perf_counter()
+        value = run()
+        times.append(time.perf_counter() - began)
+        if cleanup:
+            cleanup()
+    return times, value
+
+
+class Results:
+    def __init__(self):
+        self.entries = []
+
+    def add(self, case: str, step: str, variant: str, times, size=0, **extra):
+        entry = {
+            "case": case,
+            "step": step,
+            "variant": variant,
+            "runs": [round(t, 4) for t in times],
+            "median": round(statistics.median(times), 4),
+            "min": round(min(times), 4),
+            "bytes": size,
+        }
+        entry.update(extra)
+        self.entries.append(entry)
+        extra_text = "".join(f", {k}={v}" for k, v in extra.items())
+        print(f"  {step:<9} {variant:<28} median {entry['median']:8.3f}s  min {entry['min']:8.3f}s{extra_text}")
+
+
+def bench_download(case, paths, work_dir, results, repeat, throttle):
+    out_dir = os.path.join(work_dir, "download")
+    os.makedirs(out_dir, exist_ok=True)
+    size = sum(os.path.getsize(p) for p in paths)
+    http = HttpClient(status_forcelist=MEDIA_RETRY_STATUS_FORCELIST)
+    media_root = os.path.join(work_dir, "media")
+    targets = [os.path.join(out_dir, os.path.basename(p)) for p in paths]
+
+    def cleanup():
+        for target in targets:
+            for suffix in ("", ".part", ".part.json"):
+                _remove(target + suffix)
+            remove_verification(target)
+
+    variants = [("range", connections) for connections in sorted({1, DEFAULT_CONNECTIONS})] + [("no-range", 1)]
+    try:
+        for mode, connections in variants:
+            with MediaServer(media_root, range_enabled=(mode == "range"), throttle=throttle) as server:
+                downloader = SegmentDownloader(log_quiet, connections=connections, http=http)
+
+                def run():
+                    # 실제 다운로드처럼 분할 영상을 차례대로 받음
+                    for path, target in zip(paths, targets):
+                        downloader.download(server.url(path), target)
+
+                cleanup()
+                times, _ = measure(run, repeat, cleanup)
+            label = f"{mode} x{connections}" if mode == "range" else mode
+            results.add(case, "download", label, times, size, mb_per_sec=round(size / statistics.median(times) / 1e6, 1))
+    finally:
+        http.close()
+        cleanup()
+
+
+def bench_probe(case, paths, results, repeat):
+    # 다운로드 후 재생 시간 확인: moov 헤더 파싱 vs ffmpeg 실행
+    times, _ = measure(lambda: [read_duration_us(p) for p in paths], repeat)
+    results.add(case, "probe", "mp4box", times)
+    times, _ = measure(lambda: [probe_duration(p) for p in paths], repeat)
+    results.add(case, "probe", "ffmpeg", times)
+
+
+def bench_merge(case, paths, odd_paths, work_dir, results, repeat):
+    merged = os.path.join(work_dir, "merged.mp4")
+    times, _ = measure(lambda: concat_copy(paths, merged), repeat)
+    results.add(case, "merge", "concat_copy", times, os.path.getsize(merged))
+    if odd_paths:
+        output = os.path.join(work_dir, "merged_transcode.mp4")
+        times, _ = measure(lambda: transcode_concat(odd_paths, output), repeat, lambda: _remove(output))
+        results.add(case, "merge", "transcode_concat", times)
+    return merged
+
+
+def write_audiofile(video: str, output: str):
+    # MoviePy 가 표준 출력에 찍는 파일 정보는 버림
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        clip = VideoFileClip(video)
+        try:
+            clip.audio.write_audiofile(output, logger=None)
+        finally:
+            clip.close()
+
+
+def _decode_mono(path: str, rate: int):
+    pcm = path + ".f32"
+    try:
+        run_ffmpeg(["-i", path, "-vn", "-ac", "1", "-ar", str(rate), "-f", "f32le", pcm])
+        return numpy.fromfile(pcm, dtype=numpy.float32)
+    finally:
+        _remove(pcm)
+
+
+def seam_offsets(reference: str, candidate: str, seams, rate=SEAM_RATE):
+    """
+    candidate(병렬 인코딩)가 reference(한 번에 인코딩)에 비해 각 구간 경계에서 몇 ms 어긋나는지
+    경계 앞뒤 SEAM_WINDOW 초를 상호상관으로 맞춰 본 지연에서 파일 시작 부분의 지연을 뺀 값 (0 이면 이음새 없음)
+    """
+    ref, cand = _decode_mono(reference, rate), _decode_mono(candidate, rate)
+    half, max_lag = int(SEAM_WINDOW * rate), int(SEAM_MAX_LAG * rate)
+
+    def lag_at(seconds):
+        center = min(max(int(seconds * rate), half + max_lag), min(len(ref), len(cand)) - half - max_lag)
+        window = ref[center - half:center + half]
+        scores = numpy.correlate(cand[center - half - max_lag:center + half + max_lag], window, "valid")
+        return int(numpy.argmax(scores)) - max_lag
+
+    start = lag_at(0)
+    return [round((lag_at(seam) - start) * 1000 / rate, 3) for seam in seams]
+
+
+def bench_audio(case, video, work_dir, results, repeat, workers):
+    if VideoFileClip is not None:
+        output = os.path.join(work_dir, "audio.moviepy.mp3")
+        times, _ = measure(lambda: write_audiofile(video, output), repeat)
+        results.add(case, "audio", "mp3/write_audiofile", times, os.path.getsize(output))
+        _remove(output)
+    for audio_format in AUDIO_FORMATS:
+        for profile in AUDIO_PROFILES:
+            output = os.path.join(work_dir, f"audio.{profile}.{audio_format}")
+            times, method = measure(lambda: extract_audio(video, output, audio_format, profile), repeat)
+            results.add(case, "audio", f"{audio_format}/{profile}", times, os.path.getsize(output), method=method)
+            if (audio_format == AUDIO_FORMAT_M4A and profile == AUDIO_PROFILE_COPY) or workers < 2:
+                # 스트림 복사는 구간을 나누지 않음
+                _remove(output)
+                continue
+            parallel_output = os.path.join(work_dir, f"audio.{profile}.parallel.{audio_format}")
+            times, (method, seams) = measure(
+                lambda: parallel_extract_audio(video, parallel_output, audio_format, profile, workers=workers),
+                repeat
+            )
+            # 한 번에 인코딩한 결과와 비교해 경계마다 어긋난 정도(ms)와 전체 길이 차이(ms) 기록
+            results.add(case, "audio", f"{audio_format}/{profile} parallel", times,
+                        os.path.getsize(parallel_output), chunks=len(seams) + 1,
+                        seam_offsets_ms=seam_offsets(output, parallel_output, seams) if seams and numpy else None,
+                        length_delta_ms=round((probe_duration(parallel_output) - probe_duration(output)) * 1000, 1))
+            _remove(output)
+            _remove(parallel_output)
+
+
+def run_case(length, parts, args, results):
+    case = f"{length}s x{parts}"
+    print(f"[{case}] 영상 준비 중...")
+    paths, odd_paths = generate_lecture(args.work_dir, length, parts)
+    scratch = os.path.join(args.work_dir, "scratch")
+    _remove(scratch)
+    os.makedirs(scratch)
+    try:
+        if "download" in args.steps:
+            bench_download(case, paths, args.work_dir, results, args.repeat, args.throttle)
+        if "probe" in args.steps:
+            bench_probe(case, paths, results, args.repeat)
+        video = paths[0]
+        if parts > 1 and ("merge" in args.steps or "audio" in args.steps):
+            if "merge" in args.steps:
+                video = bench_merge(case, paths, odd_paths, scratch, results, args.repeat)
+            else:
+                video = os.path.join(scratch, "merged.mp4")
+                concat_copy(paths, video)
+        if "audio" in args.steps:
+            bench_audio(case, video, scratch, results, args.repeat, args.workers)
+    finally:
+        _remove(scratch)
+
+
+# ---------------------------------------------------------------------------
+# 결과 저장 / 비교
+# ---------------------------------------------------------------------------
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            check=True
+        ).stdout.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def ffmpeg_version():
+    _code, stderr = run_ffmpeg(["-version"], check=False)
+    return stderr.splitlines()[0] if stderr else ""
+
+
+def compare(previous_path: str, entries):
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = json.load(f)
+    old = {(e["case"], e["step"], e["variant"]): e["median"] for e in previous.get("results", [])}
+    print(f"\n이전 결과와 비교 ({previous.get('commit', '?')} -> 현재, 중앙값 기준)")
+    for entry in entries:
+        key = (entry["case"], entry["step"], entry["variant"])
+        if key not in old or not old[key]:
+            continue
+        change = (entry["median"] - old[key]) / old[key] * 100
+        print(f"  {entry['case']:<12} {entry['step']:<9} {entry['variant']:<28} "
+              f"{old[key]:8.3f}s -> {entry['median']:8.3f}s ({change:+.1f}%)")
+
+
+def _int_list(text: str):
+    return [int(v) for v in text.split(",") if v.strip()]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="미디어 처리 파이프라인 오프라인 벤치마크")
+    parser.add_argument("--lengths", type=_int_list, help="강의 길이(초) 목록, 예: 60,600,1800")
+    parser.add_argument("--parts", type=_int_list, help="분할 수 목록, 예: 1,4")
+    parser.add_argument("--quick", action="store_true", help="짧은 영상 하나로 빠르게 확인")
+    parser.add_argument("--repeat", type=int, default=3, help="측정 반복 횟수 (중앙값/최솟값 기록)")
+    parser.add_argument("--steps", type=lambda t: [s for s in t.split(",") if s], default=list(STEPS),
+                        help=f"측정할 단계 ({','.join(STEPS)})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="병렬 음성 인코딩 구간 수 상한")
+    parser.add_argument("--throttle", type=float, default=0,
+                        help="서버 연결 하나의 최대 전송 속도 (MB/s, 0 이면 제한 없음)")
+    parser.add_argument("--work-dir", default=DEFAULT_WORK_DIR, help="생성한 영상을 보관할 폴더 (다음 실행에 재사용)")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/<시각>_<커밋>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+    unknown = set(args.steps) - set(STEPS)
+    if unknown:
+        parser.error(f"알 수 없는 단계: {', '.join(sorted(unknown))}")
+    if args.quick:
+        args.lengths = args.lengths or list(QUICK_LENGTHS)
+        args.parts = args.parts or list(QUICK_PARTS)
+        args.repeat = 1
+    args.lengths = args.lengths or list(DEFAULT_LENGTHS)
+    args.parts = args.parts or list(DEFAULT_PARTS)
+    args.throttle = int(args.throttle * 1000000)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.work_dir, exist_ok=True)
+    commit = git_commit()
+    print(f"ffmpeg: {ffmpeg_exe()}")
+
+    results = Results()
+    began = time.time()
+    for length in args.lengths:
+        for parts in args.parts:
+            run_case(length, parts, args, results)
+
+    report = {
+        "commit": commit,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(began)),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": ffmpeg_version(),
+        "settings": {
+            "lengths": args.lengths,
+            "parts": args.parts,
+            "repeat": args.repeat,
+            "workers": args.workers,
+            "throttle": args.throttle,
+            "steps": args.steps,
+        },
+        "results": results.entries,
+    }
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(began))}_{commit}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {output}")
+
+    if args.compare:
+        compare(args.compare, results.entries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,610 @@
+# -*- coding: utf-8 -*-
+"""
+HLS(m3u8) / DASH(mpd) 매니페스트 다운로드
+- uniplayer 가 progressive mp4 대신 분할 스트림을 재생하는 학교용
+- 매니페스트를 해석해 가장 좋은 화질(대역폭)을 고르고, 미디어 세그먼트를 제한된 동시 연결로 병렬 다운로드
+- 받은 세그먼트를 순서대로 이어 붙인 뒤 ffmpeg 로 재인코딩 없이(-c copy) mp4 로 만듦
+- 세그먼트는 '<파일>.segments/' 에 하나씩 저장되므로 중단돼도 다음 실행에서 받은 세그먼트는 건너뜀
+"""
+import os
+import re
+import shutil
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from math import ceil
+from urllib.parse import urljoin, urlparse
+
+from ffmpeg_util import run_ffmpeg
+from http_client import default_client
+from mp4box import Mp4StructureError, check_structure
+from segment_cache import file_sha256
+from transfer import (
+    MAX_RETRIES, MEDIA_HEADERS, PART_SUFFIX, RETRYABLE_ERRORS, IncompleteDownload, RangeNotSupported,
+    backoff_delay, load_verification, save_verification
+)
+
+MANIFEST_EXTENSIONS = (".m3u8", ".mpd")
+DEFAULT_SEGMENT_WORKERS = 4
+SEGMENTS_SUFFIX = ".segments"
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class ManifestError(Exception):
+    """
+    해석할 수 없거나 지원하지 않는 매니페스트 (라이브, DRM 등)
+    """
+
+
+def is_manifest_url(url: str):
+    """
+    URL 경로가 HLS/DASH 매니페스트인지 (쿼리 문자열 무시)
+    """
+    if not url:
+        return False
+    return urlparse(url).path.lower().endswith(MANIFEST_EXTENSIONS)
+
+
+class MediaSegment:
+    """
+    url: 세그먼트 주소
+    duration: 재생 시간 (초)
+    byte_range: (시작, 끝) 바이트 (끝 포함, 없으면 파일 전체)
+    key: HLS AES-128 키 정보 {"uri", "iv"} (암호화되지 않았으면 None)
+    sequence: HLS 미디어 시퀀스 번호 (IV 기본값 계산용)
+    """
+
+    def __init__(self, url, duration=0.0, byte_range=None, key=None, sequence=0):
+        self.url = url
+        self.duration = duration
+        self.byte_range = byte_range
+        self.key = key
+        self.sequence = sequence
+
+
+class MediaTrack:
+    """
+    이어 붙이면 하나의 스트림이 되는 세그먼트 목록
+    kind: "muxed"(영상+음성), "video", "audio"
+    init: 초기화 세그먼트 (fMP4/DASH, 없으면 None)
+    """
+
+    def __init__(self, kind, segments, init=None, bandwidth=0):
+        self.kind = kind
+        self.segments = segments
+        self.init = init
+        self.bandwidth = bandwidth
+
+    @property
+    def duration(self):
+        return sum(s.duration for s in self.segments)
+
+
+# ----------------------------------------------------------------------
+# HLS
+# ----------------------------------------------------------------------
+_ATTRIBUTE_RE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def parse_attributes(text: str):
+    """
+    'BANDWIDTH=1280000,CODECS="avc1.4d401f,mp4a.40.2"' -> dict (따옴표 제거)
+    """
+    return {name: value.strip('"') for name, value in _ATTRIBUTE_RE.findall(text)}
+
+
+def _parse_byte_range(text: str, previous_end: int):
+    """
+    EXT-X-BYTERANGE 값 'n[@o]' -> (시작, 끝). 오프셋이 없으면 이전 범위 바로 다음부터
+    """
+    length, _, offset = text.partition("@")
+    start = int(offset) if offset else previous_end + 1
+    return start, start + int(length) - 1
+
+
+def parse_m3u8(text: str, base_url: str):
+    """
+    m3u8 해석
+    마스터 재생목록이면 {"variants": [{"url", "bandwidth", "resolution", "audio"}], "media": {group: [{"url", "default"}]}}
+    미디어 재생목록이면 {"track": MediaTrack}
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if not lines or not lines[0].startswith("#EXTM3U"):
+        raise ManifestError("m3u8 형식이 아닙니다.")
+
+    if any(line.startswith("#EXT-X-STREAM-INF") for line in lines):
+        variants = []
+        media = {}
+        pending = None
+        for line in lines:
+            if line.startswith("#EXT-X-STREAM-INF:"):
+                pending = parse_attributes(line.split(":", 1)[1])
+            elif line.startswith("#EXT-X-MEDIA:"):
+                attrs = parse_attributes(line.split(":", 1)[1])
+                if attrs.get("TYPE") == "AUDIO" and attrs.get("URI"):
+                    media.setdefault(attrs.get("GROUP-ID", ""), []).append({
+                        "url": urljoin(base_url, attrs["URI"]),
+                        "default": attrs.get("DEFAULT") == "YES",
+                    })
+            elif not line.startswith("#") and pending is not None:
+                width, _, height = pending.get("RESOLUTION", "0x0").partition("x")
+                variants.append({
+                    "url": urljoin(base_url, line),
+                    "bandwidth": int(pending.get("BANDWIDTH", 0) or 0),
+                    "resolution": (int(width or 0), int(height or 0)),
+                    "audio": pending.get("AUDIO"),
+                })
+                pending = None
+        if not variants:
+            raise ManifestError("마스터 재생목록에 화질 정보가 없습니다.")
+        return {"variants": variants, "media": media}
+
+    segments = []
+    init = None
+    key = None
+    sequence = 0
+    duration = None
+    byte_range = None
+    last_end = -1
+    ended = False
+    vod = False
+    for line in lines:
+        if line.startswith("#EXT-X-MEDIA-SEQUENCE:"):
+            sequence = int(line.split(":", 1)[1])
+        elif line.startswith("#EXT-X-PLAYLIST-TYPE:"):
+            vod = line.split(":", 1)[1].strip() == "VOD"
+        elif line.startswith("#EXT-X-ENDLIST"):
+            ended = True
+        elif line.startswith("#EXT-X-KEY:"):
+            attrs = parse_attributes(line.split(":", 1)[1])
+            method = attrs.get("METHOD", "NONE")
+            if method == "NONE":
+                key = None
+            elif method == "AES-128":
+                key = {"uri": urljoin(base_url, attrs["URI"]), "iv": attrs.get("IV")}
+            else:
+                raise ManifestError(f"지원하지 않는 암호화 방식: {method}")
+        elif line.startswith("#EXT-X-MAP:"):
+            attrs = parse_attributes(line.split(":", 1)[1])
+            init_range = _parse_byte_range(attrs["BYTERANGE"], -1) if attrs.get("BYTERANGE") else None
+            init = MediaSegment(urljoin(base_url, attrs["URI"]), byte_range=init_range)
+        elif line.startswith("#EXTINF:"):
+            duration = float(line.split(":", 1)[1].split(",", 1)[0] or 0)
+        elif line.startswith("#EXT-X-BYTERANGE:"):
+            byte_range = _parse_byte_range(line.split(":", 1)[1], last_end)
+        elif not line.startswith("#"):
+            if duration is None:
+                continue
+            segments.append(MediaSegment(urljoin(base_url, line), duration, byte_range, key, sequence))
+            if byte_range:
+                last_end = byte_range[1]
+            sequence += 1
+            duration = None
+            byte_range = None
+    if not (ended or vod):
+        raise ManifestError("라이브 재생목록은 지원하지 않습니다.")
+    if not segments:
+        raise ManifestError("재생목록에 세그먼트가 없습니다.")
+    return {"track": MediaTrack("muxed", segments, init)}
+
+
+def select_variant(variants):
+    """
+    대역폭(같으면 해상도)이 가장 높은 화질 선택
+    """
+    return max(variants, key=lambda v: (v["bandwidth"], v["resolution"][0] * v["resolution"][1]))
+
+
+# ----------------------------------------------------------------------
+# DASH
+# ----------------------------------------------------------------------
+_DURATION_RE = re.compile(
+    r"P(?:(?P<days>[\d.]+)D)?(?:T(?:(?P<hours>[\d.]+)H)?(?:(?P<minutes>[\d.]+)M)?(?:(?P<seconds>[\d.]+)S)?)?"
+)
+_TEMPLATE_RE = re.compile(r"\$(RepresentationID|Number|Bandwidth|Time)(%0\d+d)?\$")
+
+
+def parse_iso_duration(text: str):
+    """
+    'PT1H2M3.5S' -> 3723.5 (초)
+    """
+    m = _DURATION_RE.fullmatch(text or "")
+    if not m:
+        raise ManifestError(f"재생 시간 형식 오류: {text}")
+    parts = {k: float(v) for k, v in m.groupdict().items() if v}
+    return (parts.get("days", 0) * 86400 + parts.get("hours", 0) * 3600
+            + parts.get("minutes", 0) * 60 + parts.get("seconds", 0))
+
+
+def _fill_template(template: str, values: dict):
+    def replace(m):
+        value = values[m.group(1)]
+        return m.group(2) % value if m.group(2) else str(value)
+    return _TEMPLATE_RE.sub(replace, template).replace("$$", "$")
+
+
+def _local(tag: str):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child(element, name):
+    for child in element:
+        if _local(child.tag) == name:
+            return child
+    return None
+
+
+def _children(element, name):
+    return [child for child in element if _local(child.tag) == name]
+
+
+def _base_url(element, parent_url):
+    base = _child(element, "BaseURL")
+    return urljoin(parent_url, base.text.strip()) if base is not None and base.text else parent_url
+
+
+def _inherited(name, *elements):
+    """
+    Period -> AdaptationSet -> Representation 에 있는 name 요소의 속성을 합침 (가까운 요소가 우선)
+    (합친 속성, 가까운 순서의 요소 목록) 반환. 없으면 (None, [])
+    """
+    merged = {}
+    found = []
+    for element in elements:
+        child = _child(element, name) if element is not None else None
+        if child is not None:
+            merged.update(child.attrib)
+            found.insert(0, child)
+    return (merged, found) if found else (None, [])
+
+
+def _nearest_child(elements, name):
+    for element in elements:
+        child = _child(element, name)
+        if child is not None:
+            return child
+    return None
+
+
+def _byte_range(text):
+    if not text:
+        return None
+    start, _, end = text.partition("-")
+    return int(start), int(end)
+
+
+def _dash_segments(period, adaptation, representation, base_url, period_duration):
+    values = {"RepresentationID": representation.get("id", ""), "Bandwidth": representation.get("bandwidth", 0)}
+
+    template, template_elements = _inherited("SegmentTemplate", period, adaptation, representation)
+    if template is not None:
+        timescale = int(template.get("timescale", 1))
+        number = int(template.get("startNumber", 1))
+        init = None
+        if template.get("initialization"):
+            init = MediaSegment(urljoin(base_url, _fill_template(template["initialization"], values)))
+        segments = []
+        timeline = _nearest_child(template_elements, "SegmentTimeline")
+        if timeline is not None:
+            t = 0
+            for s in _children(timeline, "S"):
+                t = int(s.get("t", t))
+                d = int(s.get("d"))
+                repeat = int(s.get("r", 0))
+                if repeat < 0:
+                    # 기간 끝까지 반복
+                    repeat = max(0, ceil((period_duration * timescale - t) / d) - 1)
+                for _ in range(repeat + 1):
+                    url = _fill_template(template["media"], dict(values, Number=number, Time=t))
+                    segments.append(MediaSegment(urljoin(base_url, url), d / timescale))
+                    t += d
+                    number += 1
+        elif template.get("duration"):
+            seg_duration = int(template["duration"]) / timescale
+            if period_duration <= 0:
+                raise ManifestError("재생 시간을 알 수 없어 세그먼트 수를 계산할 수 없습니다.")
+            count = ceil(period_duration / seg_duration - 1e-9)
+            for i in range(count):
+                url = _fill_template(template["media"], dict(values, Number=number + i, Time=0))
+                segments.append(MediaSegment(
+                    urljoin(base_url, url), min(seg_duration, period_duration - i * seg_duration)
+                ))
+        else:
+            raise ManifestError("SegmentTemplate 에 세그먼트 정보가 없습니다.")
+        return init, segments
+
+    segment_list, list_elements = _inherited("SegmentList", period, adaptation, representation)
+    if segment_list is not None:
+        timescale = int(segment_list.get("timescale", 1))
+        seg_duration = int(segment_list.get("duration", 0)) / timescale
+        init = None
+        init_element = _nearest_child(list_elements, "Initialization")
+        if init_element is not None:
+            init = MediaSegment(urljoin(base_url, init_element.get("sourceURL", "")),
+                                byte_range=_byte_range(init_element.get("range")))
+        segments = [
+            MediaSegment(urljoin(base_url, s.get("media", "")), seg_duration, _byte_range(s.get("mediaRange")))
+            for s in _children(list_elements[0], "SegmentURL")
+        ]
+        return init, segments
+
+    # SegmentBase / BaseURL 만 있는 경우: 파일 하나 전체
+    return None, [MediaSegment(base_url, period_duration)]
+
+
+def parse_mpd(text: str, base_url: str):
+    """
+    mpd 해석. 가장 좋은 영상/음성 표현을 골라 MediaTrack 목록 반환 (첫 번째 Period 만 사용)
+    """
+    try:
+        root = ET.fromstring(text)
+    except ET.ParseError as e:
+        raise ManifestError(f"mpd 형식 오류: {e}")
+    if _local(root.tag) != "MPD":
+        raise ManifestError("mpd 형식이 아닙니다.")
+    if root.get("type", "static") != "static":
+        raise ManifestError("라이브(dynamic) mpd 는 지원하지 않습니다.")
+    total = parse_iso_duration(root.get("mediaPresentationDuration")) if root.get("mediaPresentationDuration") else 0
+
+    periods = _children(root, "Period")
+    if not periods:
+        raise ManifestError("mpd 에 Period 가 없습니다.")
+    period = periods[0]
+    period_duration = parse_iso_duration(period.get("duration")) if period.get("duration") else total
+    period_url = _base_url(period, _base_url(root, base_url))
+
+    best = {}
+    for adaptation in _children(period, "AdaptationSet"):
+        if _child(adaptation, "ContentProtection") is not None:
+            raise ManifestError("DRM 으로 보호된 스트림은 지원하지 않습니다.")
+        for representation in _children(adaptation, "Representation"):
+            mime = representation.get("mimeType") or adaptation.get("mimeType") or ""
+            content = adaptation.get("contentType") or mime.split("/", 1)[0]
+            if content not in ("video", "audio"):
+                continue
+            bandwidth = int(representation.get("bandwidth", 0))
+            if content not in best or bandwidth > best[content][0]:
+                best[content] = (bandwidth, adaptation, representation)
+
+    if not best:
+        raise ManifestError("mpd 에 영상/음성 표현이 없습니다.")
+    tracks = []
+    for kind in ("video", "audio"):
+        if kind not in best:
+            continue
+        bandwidth, adaptation, representation = best[kind]
+        url = _base_url(representation, _base_url(adaptation, period_url))
+        init, segments = _dash_segments(period, adaptation, representation, url, period_duration)
+        tracks.append(MediaTrack(kind, segments, init, bandwidth))
+    if len(tracks) == 1:
+        tracks[0].kind = "muxed"
+    return tracks
+
+
+# ----------------------------------------------------------------------
+# 다운로드
+# ----------------------------------------------------------------------
+class StreamDownloader:
+    """
+    HLS/DASH 매니페스트 URL 을 mp4 파일 하나로 받는 전송기 (SegmentDownloader 와 같은 인자/반환 형식)
+    workers: 세그먼트 동시 다운로드 수
+    storage: 받기 전에 디스크 여유 공간을 확인할 StorageManager (없으면 확인하지 않음)
+    """
+
+    def __init__(self, log, progress=None, workers=DEFAULT_SEGMENT_WORKERS, timeout=10,
+                 max_retries=MAX_RETRIES, http=None, scheduler=None, storage=None):
+        self.log = log
+        self.storage = storage
+        self.progress = progress
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.http = http or default_client()
+        self.scheduler = scheduler
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._done = 0
+        self._total = 0
+
+    def _slot(self, url: str):
+        return self.scheduler.slot(url) if self.scheduler else nullcontext()
+
+    def _get(self, url: str, byte_range=None):
+        """
+        재시도/백오프를 적용한 GET. 응답 본문(bytes) 반환
+        byte_range 를 주면 206 응답이면서 본문이 정확히 그 길이여야 함 (200 전체 응답이면 RangeNotSupported)
+        """
+        headers = dict(MEDIA_HEADERS)
+        if byte_range:
+            headers["Range"] = f"bytes={byte_range[0]}-{byte_range[1]}"
+        attempt = 0
+        while True:
+            try:
+                with self._slot(url):
+                    response = self.http.get(url, headers=headers, timeout=self.timeout)
+                    response.raise_for_status()
+                    if byte_range and response.status_code != 206:
+                        # 파일 전체가 오면 다른 세그먼트의 바이트까지 섞이므로 받지 않음
+                        response.close()
+                        raise RangeNotSupported(f"Range 요청에 {response.status_code} 응답: {url}")
+                    data = response.content
+                expected = response.headers.get("content-length")
+                if expected and int(expected) != len(data):
+                    raise IOError(f"수신 바이트 부족 ({len(data)}/{expected})")
+                if byte_range and len(data) != byte_range[1] - byte_range[0] + 1:
+                    raise IncompleteDownload(
+                        f"구간 {byte_range[0]}-{byte_range[1]} 수신 바이트 불일치 "
+                        f"({len(data)}/{byte_range[1] - byte_range[0] + 1})"
+                    )
+                if self.scheduler:
+                    self.scheduler.report_bytes(len(data))
+                return data
+            except RETRYABLE_ERRORS as e:
+                if self.scheduler:
+                    self.scheduler.report_error(e)
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                self.log(f"세그먼트 오류, {delay:.0f}초 후 재시도 ({attempt}/{self.max_retries}): {str(e)}")
+                time.sleep(delay)
+
+    def load_tracks(self, url: str):
+        """
+        매니페스트 URL -> 받을 MediaTrack 목록 (마스터 재생목록이면 화질 선택)
+        """
+        text = self._get(url).decode("utf-8-sig", errors="replace")
+        if urlparse(url).path.lower().endswith(".mpd"):
+            tracks = parse_mpd(text, url)
+        else:
+            parsed = parse_m3u8(text, url)
+            if "variants" in parsed:
+                variant = select_variant(parsed["variants"])
+                self.log(f"HLS 화질 선택: {variant['bandwidth']} bps {variant['resolution'][0]}x{variant['resolution'][1]}")
+                track = parse_m3u8(self._get(variant["url"]).decode("utf-8-sig", errors="replace"),
+                                   variant["url"])["track"]
+                tracks = [track]
+                renditions = parsed["media"].get(variant["audio"]) if variant["audio"] else None
+                if renditions:
+                    audio = next((r for r in renditions if r["default"]), renditions[0])
+                    audio_track = parse_m3u8(self._get(audio["url"]).decode("utf-8-sig", errors="replace"),
+                                             audio["url"])["track"]
+                    track.kind = "video"
+                    audio_track.kind = "audio"
+                    tracks.append(audio_track)
+            else:
+                tracks = [parsed["track"]]
+        for track in tracks:
+            self.log(f"{track.kind} 트랙: 세그먼트 {len(track.segments)}개, {track.duration:.0f}초")
+        return tracks
+
+    def _decrypt(self, data: bytes, segment: MediaSegment):
+        """
+        HLS AES-128(CBC, PKCS7) 복호화
+        """
+        from cryptography.hazmat.primitives import padding
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+        with self._lock:
+            key = self._keys.get(segment.key["uri"])
+        if key is None:
+            key = self._get(segment.key["uri"])
+            with self._lock:
+                self._keys[segment.key["uri"]] = key
+        if segment.key["iv"]:
+            iv = bytes.fromhex(segment.key["iv"][2:] if segment.key["iv"].lower().startswith("0x")
+                               else segment.key["iv"])
+        else:
+            iv = segment.sequence.to_bytes(16, "big")
+        decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+        padded = decryptor.update(data) + decryptor.finalize()
+        unpadder = padding.PKCS7(128).unpadder()
+        return unpadder.update(padded) + unpadder.finalize()
+
+    def _fetch_segment(self, segment: MediaSegment, path: str):
+        """
+        세그먼트 하나를 path 에 저장 (이미 받은 세그먼트면 건너뜀)
+        """
+        if not os.path.exists(path):
+            data = self._get(segment.url, segment.byte_range)
+            if segment.key:
+                data = self._decrypt(data, segment)
+            tmp_path = path + PART_SUFFIX
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            if self.progress:
+                self.progress.add_bytes(len(data))
+        with self._lock:
+            self._done += 1
+            done = self._done
+        if self.progress:
+            self.progress.set_stage_percent(done * 100.0 / max(self._total, 1))
+
+    def _download_track(self, track: MediaTrack, work_dir: str):
+        """
+        트랙의 세그먼트를 병렬로 받아 순서대로 이어 붙인 파일 경로 반환
+        """
+        os.makedirs(work_dir, exist_ok=True)
+        jobs = []
+        if track.init:
+            jobs.append((track.init, os.path.join(work_dir, "init.seg")))
+        jobs.extend(
+            (segment, os.path.join(work_dir, f"{i:06d}.seg")) for i, segment in enumerate(track.segments)
+        )
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._fetch_segment, segment, path) for segment, path in jobs]
+            errors = []
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(e)
+        if errors:
+            raise errors[0]
+
+        first = jobs[0][1]
+        with open(first, "rb") as f:
+            head = f.read(8)
+        extension = "mp4" if head[4:8] in (b"ftyp", b"styp", b"moov", b"moof") else "ts"
+        joined = os.path.join(work_dir, f"joined.{extension}")
+        with open(joined + PART_SUFFIX, "wb") as out:
+            for _segment, path in jobs:
+                with open(path, "rb") as f:
+                    shutil.copyfileobj(f, out, COPY_BUFFER_SIZE)
+        os.replace(joined + PART_SUFFIX, joined)
+        return joined
+
+    def download(self, url: str, file_name: str):
+        """
+        매니페스트 url 을 file_name(mp4)으로 저장. 실패하면 예외 발생 (받은 세그먼트는 남겨 둠)
+        반환: {"url", "size", "etag", "last_modified", "sha256", "cached", "verified", "duration"}
+        """
+        record = load_verification(file_name)
+        if record and "duration" in record:
+            self.log(f"검증된 파일이 있어 다운로드 생략: {os.path.basename(file_name)}")
+            return {"url": url, "size": record["size"], "etag": "", "last_modified": "", "sha256": record["sha256"],
+                    "cached": True, "verified": True, "duration": record["duration"]}
+
+        tracks = self.load_tracks(url)
+        if self.storage:
+            # 대역폭 x 길이로 추정 (세그먼트 + 합친 mp4 가 잠시 함께 있으므로 2배)
+            estimate = sum(int(t.bandwidth * t.duration / 8) for t in tracks)
+            self.storage.ensure_free(estimate * 2, os.path.basename(file_name))
+        segments_dir = file_name + SEGMENTS_SUFFIX
+        self._done = 0
+        self._total = sum(len(t.segments) + (1 if t.init else 0) for t in tracks)
+
+        joined = {}
+        for track in tracks:
+            joined[track.kind] = self._download_track(track, os.path.join(segments_dir, track.kind))
+
+        # 재인코딩 없이 mp4 컨테이너로 옮김
+        part_path = file_name + PART_SUFFIX
+        args = []
+        if "muxed" in joined:
+            args += ["-i", joined["muxed"], "-map", "0:v?", "-map", "0:a?"]
+        else:
+            args += ["-i", joined["video"], "-i", joined["audio"], "-map", "0:v:0", "-map", "1:a:0"]
+        args += ["-c", "copy"]
+        if any(path.endswith(".ts") for path in joined.values()):
+            # MPEG-TS 의 ADTS AAC -> mp4 용 AAC
+            args += ["-bsf:a", "aac_adtstoasc"]
+        args += ["-movflags", "+faststart", "-f", "mp4", part_path]
+        self.log("세그먼트를 mp4 로 합치는 중 (재인코딩 없음)...")
+        run_ffmpeg(args)
+
+        try:
+            check_structure(part_path)
+        except Mp4StructureError as e:
+            raise IOError(f"합친 mp4 검증 실패: {e}")
+        digest = file_sha256(part_path)
+        os.replace(part_path, file_name)
+        shutil.rmtree(segments_dir, ignore_errors=True)
+        size = os.path.getsize(file_name)
+        duration = max(t.duration for t in tracks)
+        save_verification(file_name, size, digest, duration=duration)
+        return {"url": url, "size": size, "etag": "", "last_modified": "", "sha256": digest,
+                "cached": False, "verified": True, "duration": duration}
@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""
+강의 음성 추출
+- 출력 형식(m4a / mp3) x 프로필(copy / speech-small / archive) 조합으로 ffmpeg 인자를 결정
+- copy: m4a 는 영상의 AAC 음성 트랙을 디코딩 없이 그대로 복사 (강의 하나에 1초 남짓),
+  mp3 는 예전 MoviePy 기본값(128k)으로 변환
+- speech-small: 한 명이 말하는 강의용. 모노 + 낮은 샘플레이트 + 낮은 비트레이트로 인코딩이 빠르고 용량이 작음
+- archive: 고음질 보관용
+- 분할 영상은 받는 즉시 조각(fragment)별로 음성을 뽑아 두고, 마지막에 조각을 이어 붙여 최종 음성 생성
+- 긴 강의를 변환할 때는 구간을 나눠 여러 ffmpeg 로 동시에 인코딩한 뒤 이어 붙임 (parallel_extract_audio)
+  각 구간을 앞뒤로 몇 프레임 더 인코딩한 뒤 프레임 단위로 잘라 붙여, 한 번에 인코딩한 것과 같은 프레임 격자가 되게 함
+  (인코더 시작 지연/끝 패딩이 이음새에 남지 않음). 경계는 가능하면 무음 구간으로 옮김
+"""
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from ffmpeg_util import probe_duration, run_ffmpeg
+from media_merge import concat_copy, probe_streams
+from mp4box import Mp4StructureError, read_duration_us
+
+AUDIO_FORMAT_M4A = "m4a"
+AUDIO_FORMAT_MP3 = "mp3"
+AUDIO_FORMATS = {
+    AUDIO_FORMAT_M4A: "M4A (AAC)",
+    AUDIO_FORMAT_MP3: "MP3",
+}
+DEFAULT_AUDIO_FORMAT = AUDIO_FORMAT_M4A
+
+AUDIO_PROFILE_COPY = "copy"
+AUDIO_PROFILE_SPEECH = "speech-small"
+AUDIO_PROFILE_ARCHIVE = "archive"
+AUDIO_PROFILES = {
+    AUDIO_PROFILE_COPY: "copy (원본 음질, M4A 는 변환 없이 복사)",
+    AUDIO_PROFILE_SPEECH: "speech-small (모노 24kHz 저용량, 강의 음성용)",
+    AUDIO_PROFILE_ARCHIVE: "archive (스테레오 고음질 보관용)",
+}
+DEFAULT_AUDIO_PROFILE = AUDIO_PROFILE_COPY
+
+# 원본 음성이 AAC 가 아닐 때 m4a copy 프로필에서 변환하는 비트레이트
+FALLBACK_AAC_BITRATE = "128k"
+# mp3 copy 프로필 비트레이트 (MoviePy write_audiofile 기본값과 같음)
+MP3_BITRATE = "128k"
+
+# (형식, 프로필) -> ffmpeg 음성 인코딩 인자 (copy + m4a 는 원본 코덱에 따라 결정)
+# 내장 aac 인코더는 VBR(-q:a) 품질이 불안정해 비트레이트로 지정
+PROFILE_ARGS = {
+    (AUDIO_FORMAT_MP3, AUDIO_PROFILE_COPY): ["-c:a", "libmp3lame", "-b:a", MP3_BITRATE],
+    (AUDIO_FORMAT_M4A, AUDIO_PROFILE_SPEECH): ["-c:a", "aac", "-ac", "1", "-ar", "24000", "-b:a", "48k"],
+    (AUDIO_FORMAT_MP3, AUDIO_PROFILE_SPEECH): ["-c:a", "libmp3lame", "-ac", "1", "-ar", "22050", "-q:a", "7"],
+    (AUDIO_FORMAT_M4A, AUDIO_PROFILE_ARCHIVE): ["-c:a", "aac", "-ar", "48000", "-b:a", "192k"],
+    (AUDIO_FORMAT_MP3, AUDIO_PROFILE_ARCHIVE): ["-c:a", "libmp3lame", "-q:a", "2"],
+}
+
+# 추출 방식 -> 로그 표시용
+METHOD_LABELS = {
+    "copy": "스트림 복사",
+    "aac": "AAC 변환",
+    "mp3": "MP3 변환",
+}
+
+# 음성 폴더 안에 분할 영상별 음성 조각을 두는 하위 폴더
+FRAGMENT_DIR_NAME = "parts"
+
+# 병렬 인코딩: 이보다 짧은 강의는 그냥 한 번에 변환 (구간 나누기/무음 탐색 비용이 더 큼)
+PARALLEL_MIN_DURATION = 20 * 60
+# 구간 하나의 최소 길이 (초)
+PARALLEL_MIN_CHUNK = 5 * 60
+# 구간 경계를 찾을 때 원래 경계 앞뒤로 무음을 찾는 범위 (초)
+SILENCE_SEARCH_WINDOW = 30
+SILENCE_FILTER = "silencedetect=noise=-35dB:d=0.3"
+_SILENCE_RE = re.compile(r"silence_(start|end): (-?[\d.]+)")
+# 구간 앞뒤로 더 인코딩했다가 버리는 프레임 수 (인코더가 이음새 앞뒤를 같은 상태로 인코딩하도록)
+OVERLAP_FRAMES = 8
+# 구간 인코딩 결과를 프레임 단위로 자를 수 있게 헤더가 프레임마다 붙는 형식으로 저장
+# mp3 는 비트 저장소(bit reservoir)를 끄면 프레임끼리 데이터를 나눠 쓰지 않아 그대로 이어 붙일 수 있음
+_RAW_ARGS = {
+    AUDIO_FORMAT_M4A: ("aac", [], ["-f", "adts"]),
+    AUDIO_FORMAT_MP3: ("mp3", ["-reservoir", "0"], ["-f", "mp3", "-write_xing", "0", "-id3v2_version", "0"]),
+}
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# 헤더의 버전 비트 -> (MPEG 버전 구분, 샘플레이트 표)
+_MP3_VERSIONS = {
+    3: (1, (44100, 48000, 32000)),
+    2: (2, (22050, 24000, 16000)),
+    0: (2, (11025, 12000, 8000)),
+}
+
+
+def audio_codec(path: str):
+    """
+    첫 번째 음성 스트림의 코덱 이름 (음성이 없으면 None)
+    """
+    for stream in probe_streams(path):
+        if stream[0] == "audio":
+            return stream[1]
+    return None
+
+
+def fragment_name(base_name: str, audio_format: str, profile: str):
+    """
+    분할 영상 하나의 음성 조각 파일 이름 (프로필을 바꾸면 이전 조각을 재사용하지 않도록 프로필 포함)
+    """
+    return f"{base_name}.{profile}.{audio_format}"
+
+
+def _encode_args(video_path: str, audio_format: str, profile: str):
+    """
+    (방식, 음성 인코딩 인자, 컨테이너 인자)
+    """
+    codec = audio_codec(video_path)
+    if codec is None:
+        raise ValueError(f"음성 트랙이 없습니다: {os.path.basename(video_path)}")
+    if audio_format == AUDIO_FORMAT_M4A and profile == AUDIO_PROFILE_COPY:
+        if codec == "aac":
+            method, audio_args = "copy", ["-c:a", "copy"]
+        else:
+            method, audio_args = "aac", ["-c:a", "aac", "-b:a", FALLBACK_AAC_BITRATE]
+    else:
+        method = "aac" if audio_format == AUDIO_FORMAT_M4A else "mp3"
+        audio_args = PROFILE_ARGS[(audio_format, profile)]
+
+    if audio_format == AUDIO_FORMAT_M4A:
+        container_args = ["-movflags", "+faststart", "-f", "mp4"]
+    else:
+        container_args = ["-f", "mp3"]
+    return method, audio_args, container_args
+
+
+def _run_encode(input_args, output_args, output: str):
+    part_path = output + ".part"
+    try:
+        run_ffmpeg(input_args + ["-vn", "-map", "0:a:0"] + output_args + [part_path])
+        os.replace(part_path, output)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+
+def extract_audio(video_path: str, output: str, audio_format: str, profile=DEFAULT_AUDIO_PROFILE):
+    """
+    video_path 의 음성을 audio_format / profile 에 맞게 output 으로 저장
+    사용한 방식("copy", "aac", "mp3") 반환
+    """
+    method, audio_args, container_args = _encode_args(video_path, audio_format, profile)
+    _run_encode(["-i", video_path], audio_args + container_args, output)
+    return method
+
+
+def media_duration(path: str):
+    """
+    재생 시간(초). mp4 는 moov 박스에서 바로 읽고, 아니면 ffmpeg 로 확인
+    """
+    try:
+        return read_duration_us(path) / 1000000
+    except (Mp4StructureError, OSError):
+        return probe_duration(path)
+
+
+def find_silences(path: str, start=0.0, length=None):
+    """
+    음성의 무음 구간 [(시작, 끝)] (음성만 디코딩하므로 영상 길이에 비해 빠름)
+    start/length 를 주면 그 범위만 디코딩 (반환 시각은 파일 기준)
+    """
+    input_args = ["-ss", f"{start:.3f}"] if start > 0 else []
+    if length is not None:
+        input_args += ["-t", f"{length:.3f}"]
+    _code, stderr = run_ffmpeg(input_args + ["-i", path, "-vn", "-af", SILENCE_FILTER, "-f", "null", "-"],
+                               check=False)
+    silences, begin = [], None
+    for kind, value in _SILENCE_RE.findall(stderr):
+        if kind == "start":
+            begin = start + max(0.0, float(value))
+        elif begin is not None:
+            silences.append((begin, start + float(value)))
+            begin = None
+    return silences
+
+
+def split_points(duration: float, chunks: int, silences=()):
+    """
+    [0, duration] 을 chunks 개 구간으로 나누는 경계 목록 (양 끝 제외)
+    각 경계는 원래 위치에서 SILENCE_SEARCH_WINDOW 안에 있는 가장 가까운 무음 구간의 가운데로 옮김
+    """
+    points = []
+    for index in range(1, chunks):
+        nominal = duration * index / chunks
+        best = nominal
+        best_distance = SILENCE_SEARCH_WINDOW
+        for start, end in silences:
+            middle = (start + end) / 2
+            if abs(middle - nominal) <= best_distance:
+                best, best_distance = middle, abs(middle - nominal)
+        if points and best <= points[-1]:
+            best = nominal
+        points.append(best)
+    return points
+
+
+def _sample_rate(video_path: str, audio_args):
+    """
+    인코딩 결과의 샘플레이트 (-ar 이 없으면 원본 그대로)
+    """
+    if "-ar" in audio_args:
+        return int(audio_args[audio_args.index("-ar") + 1])
+    for stream in probe_streams(video_path):
+        if stream[0] == "audio":
+            return int(stream[3].split()[0])
+    raise ValueError(f"음성 트랙이 없습니다: {os.path.basename(video_path)}")
+
+
+def _frame_size(audio_format: str, sample_rate: int):
+    """
+    프레임 하나의 샘플 수 (AAC 1024, MP3 는 MPEG-1 1152 / MPEG-2 이하 576)
+    """
+    if audio_format == AUDIO_FORMAT_M4A:
+        return 1024
+    return 1152 if sample_rate >= 32000 else 576
+
+
+def _adts_frames(data: bytes):
+    pos = 0
+    while pos + 7 <= len(data):
+        if data[pos] != 0xFF or data[pos + 1] & 0xF6 != 0xF0:
+            raise ValueError(f"ADTS 프레임 헤더가 아님 (위치 {pos})")
+        length = ((data[pos + 3] & 0x03) << 11) | (data[pos + 4] << 3) | (data[pos + 5] >> 5)
+        if length < 7:
+            raise ValueError(f"ADTS 프레임 길이가 잘못됨 (위치 {pos})")
+        yield data[pos:pos + length]
+        pos += length
+
+
+def _mp3_frames(data: bytes):
+    pos = 0
+    while pos + 4 <= len(data):
+        header = int.from_bytes(data[pos:pos + 4], "big")
+        version = (header >> 19) & 0x03
+        bitrate_index, rate_index = (header >> 12) & 0x0F, (header >> 10) & 0x03
+        if header >> 21 != 0x7FF or version not in _MP3_VERSIONS or (header >> 17) & 0x03 != 1 \
+                or bitrate_index in (0, 15) or rate_index == 3:
+            raise ValueError(f"MP3 프레임 헤더가 아님 (위치 {pos})")
+        mpeg, rates = _MP3_VERSIONS[version]
+        bitrate = _MP3_BITRATES[mpeg][bitrate_index] * 1000
+        length = (144 if mpeg == 1 else 72) * bitrate // rates[rate_index] + ((header >> 9) & 0x01)
+        yield data[pos:pos + length]
+        pos += length
+
+
+def _read_frames(path: str, audio_format: str):
+    """
+    구간 인코딩 결과(ADTS / 헤더 없는 mp3)를 프레임 목록으로
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    frames = _adts_frames if audio_format == AUDIO_FORMAT_M4A else _mp3_frames
+    return list(frames(data))
+
+
+def parallel_extract_audio(video_path: str, output: str, audio_format: str, profile=DEFAULT_AUDIO_PROFILE,
+                           workers=None, log=None):
+    """
+    긴 강의의 음성을 구간별로 동시에 인코딩한 뒤 이어 붙임
+    스트림 복사 프로필이거나 강의가 짧으면 extract_audio 와 같음
+    반환: (방식, 구간 경계 시각 목록(초, 양 끝 제외. 나누지 않았으면 빈 목록))
+
+    구간 i 는 경계보다 OVERLAP_FRAMES 프레임 앞에서부터, 다음 경계 뒤로 넉넉히 인코딩한 뒤
+    앞쪽 OVERLAP_FRAMES 프레임을 버리고 (다음 경계 - 경계) / 프레임 크기 개만 남김.
+    경계를 프레임 크기의 배수(출력 샘플 기준)에 두므로 남긴 프레임은 한 번에 인코딩했을 때와 같은 시각을 덮음
+    """
+    workers = workers or os.cpu_count() or 1
+    method, audio_args, container_args = _encode_args(video_path, audio_format, profile)
+    duration = media_duration(video_path) if method != "copy" and workers > 1 else 0
+    chunks = min(workers, int(duration // PARALLEL_MIN_CHUNK))
+    if duration < PARALLEL_MIN_DURATION or chunks < 2:
+        _run_encode(["-i", video_path], audio_args + container_args, output)
+        return method, []
+
+    rate = _sample_rate(video_path, audio_args)
+    frame = _frame_size(audio_format, rate)
+    extension, raw_audio_args, raw_container_args = _RAW_ARGS[audio_format]
+    work_dir = output + ".chunks"
+    os.makedirs(work_dir, exist_ok=True)
+    try:
+        with ThreadPoolExecutor(max_workers=chunks) as executor:
+            # 무음은 원래 경계 앞뒤 SILENCE_SEARCH_WINDOW 범위만 디코딩해서 찾음 (경계별로 동시에)
+            windows = [max(0.0, duration * index / chunks - SILENCE_SEARCH_WINDOW) for index in range(1, chunks)]
+            silences = [s for found in executor.map(
+                lambda start: find_silences(video_path, start, 2 * SILENCE_SEARCH_WINDOW), windows) for s in found]
+            # 경계(출력 샘플 번호)를 프레임 크기의 배수로 맞춤
+            bounds = [0]
+            for point in split_points(duration, chunks, silences):
+                sample = round(point * rate / frame) * frame
+                if sample > bounds[-1]:
+                    bounds.append(sample)
+            chunks = len(bounds)
+            chunk_paths = [os.path.join(work_dir, f"{index:03d}.{extension}") for index in range(chunks)]
+
+            def encode(index):
+                overlap = OVERLAP_FRAMES * frame if index else 0
+                input_args = ["-ss", f"{(bounds[index] - overlap) / rate:.6f}"]
+                if index + 1 < chunks:
+                    # 남길 마지막 프레임이 끝 패딩의 영향을 받지 않도록 다음 경계 뒤로 더 인코딩
+                    end = bounds[index + 1] + 2 * OVERLAP_FRAMES * frame
+                    input_args += ["-t", f"{(end - bounds[index] + overlap) / rate:.6f}"]
+                # -ss/-t 를 입력 옵션으로 주면 해당 위치부터 디코딩 (변환 시에는 샘플 단위로 정확)
+                _run_encode(input_args + ["-i", video_path], audio_args + raw_audio_args + raw_container_args,
+                            chunk_paths[index])
+
+            # 구간 하나라도 실패하면 예외가 그대로 전달됨
+            list(executor.map(encode, range(chunks)))
+
+        joined = os.path.join(work_dir, f"joined.{extension}")
+        with open(joined, "wb") as f:
+            for index, path in enumerate(chunk_paths):
+                frames = _read_frames(path, audio_format)
+                skip = OVERLAP_FRAMES if index else 0
+                if index + 1 < chunks:
+                    keep = (bounds[index + 1] - bounds[index]) // frame
+                    if len(frames) < skip + keep:
+                        raise ValueError(f"구간 {index} 인코딩 결과가 짧음: 프레임 {len(frames)}개 < {skip + keep}개")
+                    frames = frames[skip:skip + keep]
+                else:
+                    frames = frames[skip:]
+                f.write(b"".join(frames))
+        _run_encode(["-i", joined], ["-c:a", "copy"] + container_args, output)
+        seams = [sample / rate for sample in bounds[1:]]
+        if log:
+            log(f"구간 {chunks}개 병렬 인코딩 (경계: {', '.join(f'{seam:.1f}초' for seam in seams)})")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return method, seams
+
+
+def concat_audio(fragments, output: str, audio_format: str):
+    """
+    분할 영상별 음성 조각을 순서대로 재인코딩 없이 이어 붙여 output 생성 (조각 파일은 지우지 않음)
+    """
+    if len(fragments) == 1:
+        shutil.copyfile(fragments[0], output)
+        return
+    concat_copy(fragments, output, container="mp4" if audio_format == AUDIO_FORMAT_M4A else "mp3")
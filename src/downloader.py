@@ -1,22 +1,45 @@
 # -*- coding: utf-8 -*-
 import os
 import re
-import time
 import requests
 import tqdm
-from moviepy import VideoFileClip, concatenate_videoclips
-from proglog import ProgressBarLogger
+from transfer import SegmentDownloader, DEFAULT_CONNECTIONS
+from adaptive_stream import StreamDownloader, is_manifest_url
+from mp4box import Mp4StructureError, read_duration_us
+from ffmpeg_util import FFmpegError, probe_duration
+from audio_extract import (
+    AUDIO_FORMAT_M4A, AUDIO_FORMAT_MP3, DEFAULT_AUDIO_FORMAT, DEFAULT_AUDIO_PROFILE, FRAGMENT_DIR_NAME, fragment_name
+)
+from postprocess import PostProcessor, encode_workers_per_job
+from stream_writer import DEFAULT_BLOCK_SIZE
+from http_client import HttpClient, DEFAULT_POOL_MAXSIZE, MEDIA_RETRY_STATUS_FORCELIST
+from segment_cache import SegmentCache, CACHE_DIR_NAME, DEFAULT_CACHE_LIMIT
+from manifest import DownloadManifest
+from storage import StorageManager, DEFAULT_VIDEO_BUDGET
+from progress import ProgressAggregator, STAGE_DOWNLOAD, STAGE_DONE
+from page_wait import PageWaiter, lecture_list_loaded, lecture_signature, video_ready
+from navigation import CourseNavigator
+from page_extract import read_elements, read_lecture_buttons, read_subjects
+from network_capture import KIND_MANIFEST, NetworkCapture, enable_performance_log
+from player_control import PlayerController
 
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.alert import Alert
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.common.exceptions import (
-    NoSuchElementException, TimeoutException, WebDriverException
+    TimeoutException, WebDriverException
+)
+
+# 플레이어 종류별 동영상 요소 위치 (앞쪽 우선)
+VIDEO_XPATHS = (
+    "//*[@id='syncvideo-play']/div/div[1]/div[1]/video",
+    "//*[@id='video-play-video1']/div[1]/video",
 )
 
 # 버전 체크용 상수
@@ -24,37 +47,74 @@ CURRENT_VERSION = "1.1.1"
 VERSION_URL = "https://raw.githubusercontent.com/OneTop4458/e-cyber-downloader/refs/heads/main/version.json"
 
 
-class MP3ProgressLogger(ProgressBarLogger):
-    def __init__(self, progress_callback):
-        super().__init__()
-        self.progress_callback = progress_callback
-
-    def callback(self, **changes):
-        # changes에 progress 키가 있다면 진행률 업데이트 (0~1 범위)
-        if 'progress' in changes and self.progress_callback:
-            percentage = int(changes['progress'] * 100)
-            self.progress_callback(percentage)
-        super().callback(**changes)
-
-
 class ECyberDownloader:
-    def __init__(self, log_callback, download_dir, headless=False, progress_callback=None, school_code="catholic", school_domain="e-cyber.catholic.ac.kr"):
+    def __init__(self, log_callback, download_dir, headless=False, progress=None, school_code="catholic", school_domain="e-cyber.catholic.ac.kr", connections=DEFAULT_CONNECTIONS,
+                 block_size=DEFAULT_BLOCK_SIZE, scheduler=None, cache_limit=DEFAULT_CACHE_LIMIT,
+                 audio_format=DEFAULT_AUDIO_FORMAT, audio_profile=DEFAULT_AUDIO_PROFILE, parallel_encode=True, video_budget=DEFAULT_VIDEO_BUDGET,
+                 postprocessor=None, wait_timeouts=None, network_capture=True):
         """
         log_callback: 로그 출력용 함수
         download_dir: 다운로드 받을 폴더 경로
         headless: Chrome headless 모드 사용 여부
-        progress_callback: 진행률 업데이트 콜백 함수 (예: 0~100 퍼센트)
+        progress: 진행 상황을 모아 GUI로 전달하는 ProgressAggregator (없으면 전달하지 않음)
         school_code: 학교 코드 (기본값: catholic)
         school_domain: 학교 도메인 (기본값: e-cyber.catholic.ac.kr)
+        connections: 분할 mp4 한 개를 받을 때 사용할 동시 연결 수 (Range 지원 서버 한정)
+        block_size: 다운로드 버퍼 블록 크기 시작값 (이후 수신 속도에 맞춰 자동 조정)
+        scheduler: 전체 동시 연결 수/대역폭을 제어하는 DownloadScheduler (없으면 제한 없음)
+        cache_limit: 다운로드 폴더의 분할 영상 캐시(.segment_cache) 최대 용량 (bytes, 0 이면 사용 안 함)
+        audio_format: 음성 출력 형식 ("m4a", "mp3")
+        audio_profile: 음성 인코딩 프로필 ("copy", "speech-small", "archive")
+        parallel_encode: 긴 강의 음성을 구간별로 나눠 모든 코어로 동시에 인코딩할지 여부
+        video_budget: 완료한 강의의 영상 원본(mp4) 전체 최대 크기 (bytes, 0 이면 제한 없음)
+        postprocessor: 병합/음성 추출을 맡길 PostProcessor (없으면 강의마다 바로 순차 처리)
+        wait_timeouts: 페이지 대기 단계별 제한 시간 (page_wait.DEFAULT_WAIT_TIMEOUTS 중 바꿀 항목만)
+        network_capture: 분할 영상 URL 을 video.src 대신 CDP 네트워크 이벤트로 찾을지 여부
         """
         self.log_callback = log_callback
         self.download_dir = download_dir
         self.headless = headless
-        self.progress_callback = progress_callback
+        self.progress = progress or ProgressAggregator()
         self.driver = None
+        self.waiter = None
+        self.navigator = None
+        self.network_capture = network_capture
+        self.capture = None
+        self.player = None
+        self.wait_timeouts = wait_timeouts
         self.auth_confirm_callback = None
         self.school_code = school_code
         self.school_domain = school_domain
+        self.connections = connections
+        self.block_size = block_size
+        self.scheduler = scheduler
+        self.audio_format = audio_format
+        self.audio_profile = audio_profile
+        self.parallel_encode = parallel_encode
+        self.postprocessor = postprocessor or PostProcessor(workers=0, log=self.log)
+        self.segment_cache = None
+        if cache_limit > 0:
+            try:
+                self.segment_cache = SegmentCache(
+                    os.path.join(download_dir, CACHE_DIR_NAME), limit=cache_limit, log=self.log
+                )
+            except Exception as e:
+                self.log(f"세그먼트 캐시 초기화 오류 (캐시 없이 진행): {str(e)}")
+        # 이미 완료한 강의를 건너뛰기 위한 다운로드 기록
+        self.manifest = None
+        try:
+            self.manifest = DownloadManifest.in_directory(download_dir)
+        except Exception as e:
+            self.log(f"다운로드 기록(매니페스트) 초기화 오류: {str(e)}")
+        # 영상 원본 예산 + 다운로드 전 여유 공간 확인 (완료 기록이 있어야 지울 영상을 고를 수 있음)
+        self.storage = None
+        if self.manifest:
+            self.storage = StorageManager(download_dir, self.manifest, budget=video_budget, log=self.log,
+                                          cache=self.segment_cache)
+        # 분할 mp4 다운로드용 Session 풀 (로그인 후 브라우저 쿠키 복사)
+        # (503 은 어댑터에서 재시도하지 않고 스케줄러가 받아 동시 연결 수를 줄임)
+        self.http = HttpClient(pool_maxsize=max(DEFAULT_POOL_MAXSIZE, connections),
+                               status_forcelist=MEDIA_RETRY_STATUS_FORCELIST)
 
     def log(self, message: str):
         """
@@ -132,32 +192,45 @@ class ECyberDownloader:
             if self.headless:
                 chrome_options.add_argument("--headless")
                 chrome_options.add_argument("--disable-gpu")
+            if self.network_capture:
+                enable_performance_log(chrome_options)
             service = Service()
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            self.waiter = PageWaiter(self.driver, self.log, self.wait_timeouts)
+            self.player = PlayerController(
+                self.driver, self.waiter, self.log, VIDEO_XPATHS,
+                f"https://{self.school_domain}/settings/viewer/uniplayer/intro.mp4"
+            )
+            if self.network_capture:
+                self.capture = NetworkCapture(self.driver, self.log, ignore_urls=[self.player.intro_url])
+                if not self.capture.start():
+                    self.capture = None
+            self.navigator = CourseNavigator(self.driver, self.waiter, self.school_domain, self.log, self.add_overlay)
             self.log("Chrome driver 초기화 성공.")
         except WebDriverException as e:
             self.log(f"Chrome driver 초기화 에러: {str(e)}")
             raise
 
     def navigate(self, url: str):
+        if self.navigator:
+            self.navigator.invalidate()
         self.driver.get(url)
         self.add_overlay()
 
     def login(self, username: str, password: str):
+        login_url = f"https://{self.school_domain}/ilos/main/member/login_form.acl"
         try:
-            self.navigate(f"https://{self.school_domain}/ilos/main/member/login_form.acl")
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "usr_id"))
-            )
+            self.navigate(login_url)
+            self.waiter.until("login_form", EC.presence_of_element_located((By.ID, "usr_id")))
             self.driver.find_element(By.ID, "usr_id").send_keys(username)
             self.driver.find_element(By.ID, "usr_pwd").send_keys(password)
             self.driver.find_element(By.ID, "login_btn").click()
             self.log("로그인 시도 중...")
-            time.sleep(0.5)
+            # 로그인 처리 후 다른 페이지로 이동하거나, 실패 시 alert 가 뜰 때까지
+            self.waiter.until("login", EC.any_of(EC.url_changes(login_url), EC.alert_is_present()), required=False)
             self.navigate(f"https://{self.school_domain}/ilos/mp/course_register_list_form.acl")
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "list_tab1"))
-            )
+            self.waiter.until("course_tab", EC.presence_of_element_located((By.ID, "list_tab1")))
+            self.sync_http_session()
         except TimeoutException:
             self.log("로그인 실패: 로그인 정보가 올바른지 확인해 주세요.")
             raise
@@ -165,11 +238,21 @@ class ECyberDownloader:
             self.log(f"로그인 에러: {str(e)}")
             raise
 
+    def sync_http_session(self):
+        """
+        브라우저의 로그인 쿠키와 User-Agent를 HTTP 클라이언트에 복사
+        """
+        try:
+            self.http.load_selenium_cookies(self.driver.get_cookies())
+            user_agent = self.driver.execute_script("return navigator.userAgent;")
+            if user_agent:
+                self.http.set_header("User-Agent", user_agent)
+        except Exception as e:
+            self.log(f"세션 쿠키 동기화 오류: {str(e)}")
+
     def switch_to_regular_subjects_tab(self):
         try:
-            tab_element = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.ID, "list_tab1"))
-            )
+            tab_element = self.waiter.until("course_tab", EC.element_to_be_clickable((By.ID, "list_tab1")))
             tab_element.click()
             self.log("정규 과목 탭으로 전환 완료.")
         except Exception as e:
@@ -179,22 +262,17 @@ class ECyberDownloader:
     def get_subject_info_list(self):
         subject_info_list = []
         try:
-            subjects = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_all_elements_located((By.CLASS_NAME, "content-container"))
-            )
-            for subject in subjects:
-                try:
-                    subject_title = subject.find_element(By.CLASS_NAME, "content-title").text
-                    onclick_attr = subject.find_element(By.TAG_NAME, "a").get_attribute("onclick")
-                    match = re.search(r"eclassRoom\('(.+?)'\)", onclick_attr)
-                    if match:
-                        eclass_room_value = match.group(1)
-                        subject_info_list.append({"과목": subject_title, "eclassRoom": eclass_room_value})
-                        self.log(f"과목: {subject_title}, eclassRoom: {eclass_room_value}")
-                    else:
-                        self.log(f"eclassRoom 값 추출 실패 - 과목: {subject_title}")
-                except Exception:
-                    pass
+            self.waiter.until("subjects", EC.presence_of_all_elements_located((By.CLASS_NAME, "content-container")))
+            # 과목 제목/링크를 스크립트 한 번으로 읽음
+            for subject in read_subjects(self.driver):
+                subject_title = subject["title"]
+                match = re.search(r"eclassRoom\('(.+?)'\)", subject["onclick"])
+                if match:
+                    eclass_room_value = match.group(1)
+                    subject_info_list.append({"과목": subject_title, "eclassRoom": eclass_room_value})
+                    self.log(f"과목: {subject_title}, eclassRoom: {eclass_room_value}")
+                else:
+                    self.log(f"eclassRoom 값 추출 실패 - 과목: {subject_title}")
         except Exception as e:
             self.log(f"과목 정보를 가져오는데 실패: {str(e)}")
             raise
@@ -213,49 +291,37 @@ class ECyberDownloader:
         lectures_map = {}
         try:
             self.log(f"{subject_info['과목']} 강의 목록 로드를 시작합니다.")
-            self.navigate(f"https://{self.school_domain}/ilos/mp/course_register_list_form.acl")
-            time.sleep(0.5)
-            js_command = f"eclassRoom('{subject_info['eclassRoom']}');"
-            self.driver.execute_script(js_command)
-            WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.ID, "menu_lecture_weeks"))
-            ).click()
-            time.sleep(2)
-            self.add_overlay()
-
-            # 모든 주차 DOM
-            week_elements = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_all_elements_located(
-                    (By.XPATH, '//div[@id="chart"]//div[contains(@class, "wb-week")]')
-                )
-            )
+            # 모든 주차 DOM (이미 해당 과목의 주차 페이지면 다시 로드하지 않음)
+            week_elements = self.navigator.open_weeks(subject_info["eclassRoom"])
 
-            for week_element in week_elements:
-                cls = week_element.get_attribute("class").lower()
+            # 주차별 class/텍스트를 스크립트 한 번으로 읽음 (클릭할 요소는 그대로 사용)
+            for week_element, week in zip(week_elements, read_elements(self.driver, week_elements)):
+                cls = week["cls"].lower()
                 if "disabled" in cls or "unavail" in cls:
                     # 사용 불가능한 주차
-                    self.log(f"주차 '{week_element.text}'은(는) 사용 불가. 스킵.")
+                    self.log(f"주차 '{week['text']}'은(는) 사용 불가. 스킵.")
                     continue
 
                 try:
-                    week_num = int(week_element.text.replace("주", ""))
+                    week_num = int(week["text"].replace("주", ""))
                 except ValueError:
                     continue
 
-                # 주차 클릭
+                # 주차 클릭 후 강의 목록이 바뀔 때까지
+                before = lecture_signature(self.driver)
                 week_element.click()
-                time.sleep(1)
+                self.waiter.until("week", lecture_list_loaded(before), required=False)
+                self.navigator.week = week_num
 
-                # 학습하기 스크립트 가져오기
-                lecture_buttons = self.driver.find_elements(By.XPATH, "//*[contains(@onclick, 'viewGo(')]")
+                # 학습하기 스크립트 가져오기 (버튼 전체를 스크립트 한 번으로)
                 collected = []
-                for btn in lecture_buttons:
-                    onclick_value = btn.get_attribute("onclick")
+                for btn in read_lecture_buttons(self.driver):
+                    onclick_value = btn["onclick"]
                     m = re.search(r"viewGo\([^,]+,[^,]+,[^,]+,[^,]+,'(.*?)'\)", onclick_value)
                     if m:
                         param = m.group(1).strip()
                         if param:  # 빈 문자열이 아니라면 학습 가능
-                            title = btn.text.strip()
+                            title = btn["text"]
                             if not title:
                                 title = "강의(제목미상)"
                             collected.append({
@@ -275,165 +341,217 @@ class ECyberDownloader:
 
         return lectures_map
 
+    def lecture_key(self, subject_info: dict, week_num, title: str):
+        """
+        매니페스트에서 강의를 구분하는 키
+        """
+        return (self.school_code, subject_info.get("eclassRoom", ""), int(week_num), title)
+
+    def lecture_dirs(self, subject_name, week_num, lesson_title):
+        """
+        강의별 (기본, mp4, 음성) 디렉터리 경로: 과목/주차/강의제목
+        음성 폴더 이름은 출력 형식과 같음 (mp3, m4a)
+        """
+        base_dir = os.path.join(self.download_dir, subject_name, f"{week_num}주차", lesson_title)
+        return base_dir, os.path.join(base_dir, "mp4"), os.path.join(base_dir, self.audio_format)
+
+    def is_lecture_done(self, subject_info: dict, week_num, title: str):
+        """
+        이전 실행에서 완료했고 결과물이 그대로 남아 있는 강의인지 확인
+        (매니페스트에 기록이 전혀 없는 강의만, 그 전에 받은 음성 파일을 확인해 완료로 등록)
+        """
+        if not self.manifest:
+            return False
+        key = self.lecture_key(subject_info, week_num, title)
+        if self.manifest.is_complete(key):
+            return True
+        if self.manifest.status(key) is not None:
+            # 실패/진행 중이었거나, 완료 기록은 있지만 결과물이 사라졌거나 바뀜 -> 다시 받음
+            # (중단된 실행이 남긴 잘린 음성 파일을 완료로 등록하지 않도록)
+            return False
+        base_dir, _, _ = self.lecture_dirs(subject_info["과목"], week_num, title)
+        for audio_format in (AUDIO_FORMAT_MP3, AUDIO_FORMAT_M4A):
+            audio_dir = os.path.join(base_dir, audio_format)
+            if not os.path.isdir(audio_dir):
+                continue
+            for name in sorted(os.listdir(audio_dir)):
+                path = os.path.join(audio_dir, name)
+                if not name.lower().endswith("." + audio_format) or os.path.getsize(path) == 0:
+                    continue
+                try:
+                    duration = probe_duration(path)
+                except FFmpegError as e:
+                    self.log(f"기존 음성 파일을 읽을 수 없어 완료로 등록하지 않음: {path} ({str(e)})")
+                    continue
+                if duration > 0:
+                    self.manifest.complete_lecture(key, {"audio": path}, duration=duration)
+                    self.log(f"기존 결과물을 다운로드 기록에 등록: {path}")
+                    return True
+        return False
+
     def perform_lectures_actions(self, subject_info: dict, lectures_map: dict):
         """
         ‘lectures_map[week] = [ {title, script} ...]’ 형태로 전달받아,
         주차별로 반복하며, 각 강의를 다운로드
-        (주차/차시마다 페이지 재로딩 + viewGo())
+        (과목/주차 페이지는 CourseNavigator 가 가능한 한 재사용하고, 강의마다 viewGo() 실행)
+        이미 완료된 강의(매니페스트 기준)는 브라우저를 조작하기 전에 건너뜀
         """
         self.log(f"{subject_info['과목']} 다운로드 시작 - 주차 목록: {list(lectures_map.keys())}")
 
+        # 완료된 강의 미리 제외
+        pending_map = {}
+        skipped = 0
         for week_num in sorted(lectures_map.keys()):
-            lectures = lectures_map[week_num]
+            pending = []
+            for lecture_info in lectures_map[week_num]:
+                if self.is_lecture_done(subject_info, week_num, lecture_info["title"]):
+                    self.log(f"[주차 {week_num}] 이미 완료된 강의 건너뜀: {lecture_info['title']}")
+                    self.progress.start_lecture(lecture_info["title"])
+                    self.progress.set_stage(STAGE_DONE)
+                    skipped += 1
+                else:
+                    pending.append(lecture_info)
+            if pending:
+                pending_map[week_num] = pending
+        if skipped:
+            self.log(f"{subject_info['과목']}: 완료된 강의 {skipped}개 건너뜀, 남은 강의 {sum(len(v) for v in pending_map.values())}개")
+
+        for week_num in sorted(pending_map.keys()):
+            lectures = pending_map[week_num]
 
             for lecture_info in lectures:
                 title = lecture_info["title"]
                 script = lecture_info["script"]
 
                 self.log(f"[주차 {week_num}] 강의: {title}")
+                self.progress.start_lecture(title)
 
-                # 1) 과목 메인 페이지 재접속
+                # 1) 해당 과목/주차 강의 목록으로 이동
+                #    (같은 과목이면 현재 페이지나 뒤로 가기를 쓰고, 안 되면 과목 목록부터 다시 로드)
                 try:
-                    self.navigate(f"https://{self.school_domain}/ilos/mp/course_register_list_form.acl")
-                    time.sleep(0.5)
-
-                    # 2) eclassRoom() 실행
-                    js_command = f"eclassRoom('{subject_info['eclassRoom']}');"
-                    self.driver.execute_script(js_command)
-                    self.add_overlay()
-
-                    # 3) 주차 메뉴 클릭
-                    WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.ID, "menu_lecture_weeks"))
-                    ).click()
-                    time.sleep(2)
-
-                    # 4) 특정 주차 클릭
-                    week_xpath = f'//div[@id="chart"]//span[contains(@class, "wb-week") and normalize-space(text())="{week_num}주"]'
-                    week_element = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, week_xpath))
-                    )
-                    week_element.click()
-                    time.sleep(1)
-
+                    self.navigator.open_lecture_list(subject_info["eclassRoom"], week_num, script)
                 except Exception as e:
+                    self.navigator.invalidate()
                     self.log(f"[주차 {week_num}] 페이지 이동 중 오류: {str(e)}")
                     continue
 
-                # 5) 해당 강의(lecture_info["script"]) 실행
+                # 2) 해당 강의(lecture_info["script"]) 실행
                 try:
+                    if self.capture:
+                        # 이전 강의/페이지 이동 중 요청은 버리고 이 강의의 미디어 요청만 기록 (페이지 로딩 중 미리 받는 요청 포함)
+                        self.capture.reset()
+                    self.navigator.lecture_started()
                     self.driver.execute_script(script)
                 except Exception as e:
                     self.log(f"JS 실행 오류: {str(e)}")
                     continue
 
-                # 출석인정기간 관련 alert
+                # 출석인정기간 alert / 2차 본인인증을 처리하며 동영상 재생 페이지로 이동
                 try:
-                    WebDriverWait(self.driver, 3).until(EC.alert_is_present())
-                    alert = self.driver.switch_to.alert
-                    if "출석인정기간이 지나" in alert.text:
-                        self.log("출석인정기간 경고: 자동 확인.")
-                        alert.accept()
-                        time.sleep(1)
+                    self.wait_lecture_view()
+                    self.navigator.viewer_opened()
                 except TimeoutException:
-                    pass
-
-                # 2차 본인인증
-                time.sleep(0.5)
-                try:
-                    auth_dialog = WebDriverWait(self.driver, 3).until(
-                        EC.presence_of_element_located((By.ID, "dialog_secondary_auth"))
-                    )
-                    if auth_dialog.is_displayed():
-                        self.add_overlay()
-                        self.update_overlay_message("본인 인증 진행 해 주세요. (조작 하셔도 됩니다)")
-                        self.log("본인인증 창 표시됨. 사용자 확인 대기...")
-                        if callable(self.auth_confirm_callback):
-                            self.auth_confirm_callback()
-                            self.log("본인인증 완료. 잠시 후 동영상 다운로드 시작.")
-                except TimeoutException:
-                    pass
-
-                self.add_overlay()
-                # 동영상 재생 페이지 로딩
-                try:
-                    WebDriverWait(self.driver, 3).until(EC.alert_is_present())
-                    alert = self.driver.switch_to.alert
-                    alert.accept()
-                    time.sleep(1)
-                except TimeoutException:
-                    pass
+                    self.log(f"[주차 {week_num}] 동영상 페이지로 이동하지 못했습니다. 스킵.")
+                    continue
                 except Exception as e:
                     self.log(f"동영상 페이지 진입 중 오류: {str(e)}")
                     continue
 
-                WebDriverWait(self.driver, 10).until(
-                    EC.url_to_be(f"https://{self.school_domain}/ilos/st/course/online_view_form.acl")
-                )
-
-                # 6) 동영상 다운로드 로직
+                # 3) 동영상 다운로드 로직
+                self.add_overlay()
+                key = self.lecture_key(subject_info, week_num, title)
+                if self.manifest:
+                    self.manifest.begin_lecture(key)
+                submitted = self.handle_video_download(subject_info["과목"], week_num, title, lecture_key=key)
+                if self.manifest and not submitted:
+                    self.manifest.fail_lecture(key)
+
+    def wait_lecture_view(self):
+        """
+        viewGo() 실행 후 동영상 재생 페이지(online_view_form)로 바뀔 때까지 대기
+        그 사이에 뜨는 alert(출석인정기간 경고 등)는 확인하고, 2차 본인인증 창은 사용자 확인을 기다림
+        """
+        view_url = f"https://{self.school_domain}/ilos/st/course/online_view_form.acl"
+        auth_handled = False
+        while True:
+            conditions = [EC.alert_is_present(), EC.url_to_be(view_url)]
+            if not auth_handled:
+                conditions.append(EC.visibility_of_element_located((By.ID, "dialog_secondary_auth")))
+            result = self.waiter.until("lecture_entry", EC.any_of(*conditions))
+            if isinstance(result, Alert):
+                if "출석인정기간이 지나" in result.text:
+                    self.log("출석인정기간 경고: 자동 확인.")
+                result.accept()
+            elif isinstance(result, WebElement):
+                auth_handled = True
+                self.add_overlay()
+                self.update_overlay_message("본인 인증 진행 해 주세요. (조작 하셔도 됩니다)")
+                self.log("본인인증 창 표시됨. 사용자 확인 대기...")
+                if callable(self.auth_confirm_callback):
+                    self.auth_confirm_callback()
+                    self.log("본인인증 완료. 잠시 후 동영상 다운로드 시작.")
+            else:
                 self.add_overlay()
-                self.handle_video_download(subject_info["과목"], week_num, title)
+                return
 
-    def handle_video_download(self, subject_name, week_num, lesson_title):
+    def handle_video_download(self, subject_name, week_num, lesson_title, lecture_key=None):
         """
         iframe 안의 동영상 src를 추출해 분할 mp4 다운로드 후 하나로 합치고,
-        최종 mp4 -> mp3 변환.
+        최종 mp4 -> 음성(m4a 복사 또는 mp3 변환) 추출.
+        lecture_key: 매니페스트에 분할 영상을 기록할 강의 키 (없으면 기록하지 않음)
+        병합/음성 추출은 self.postprocessor 에 넘기며, 끝나면 매니페스트에 완료/실패를 기록
+        반환: 후처리 작업을 넘겼으면 True (다운로드 단계에서 실패하면 False)
         """
+        submitted = False
         try:
             # -----------------------------------------
             # (A) 각 강의별 디렉터리: 과목/주차/강의제목
-            #     내부에 mp4, mp3 하위 폴더를 생성
+            #     내부에 mp4, 음성(mp3/m4a) 하위 폴더를 생성
             # -----------------------------------------
-            base_dir = os.path.join(self.download_dir, subject_name, f"{week_num}주차", lesson_title)
-            mp4_dir = os.path.join(base_dir, "mp4")
-            mp3_dir = os.path.join(base_dir, "mp3")
+            audio_format, audio_profile = self.audio_format, self.audio_profile
+            # 풀의 다른 작업과 코어를 나눠 씀 (풀 크기 x 코어 수만큼 ffmpeg 가 뜨지 않도록)
+            encode_workers = encode_workers_per_job(self.postprocessor.workers) if self.parallel_encode else 1
+            base_dir, mp4_dir, audio_dir = self.lecture_dirs(subject_name, week_num, lesson_title)
             os.makedirs(mp4_dir, exist_ok=True)
-            os.makedirs(mp3_dir, exist_ok=True)
-
-            splitted_files = []
-            viewer = self.driver.find_element(By.ID, "contentViewer")
-            actions = ActionChains(self.driver)
-            actions.move_to_element(viewer).click().send_keys(Keys.SPACE).perform()
-            time.sleep(3)
-            actions.move_to_element(viewer).click()
-            time.sleep(5)  # 인트로 건너 띄기 위함
-
-            iframe = self.driver.find_element(By.TAG_NAME, "iframe")
-            self.driver.switch_to.frame(iframe)
-
-            # 동영상 element 찾기
-            video_element = None
-            try:
-                video_element = self.driver.find_element(
-                    By.XPATH, "//*[@id='syncvideo-play']/div/div[1]/div[1]/video"
-                )
-            except NoSuchElementException:
-                pass
+            os.makedirs(audio_dir, exist_ok=True)
 
-            if not video_element or not video_element.get_attribute("src"):
-                try:
-                    video_element = self.driver.find_element(
-                        By.XPATH, "//*[@id='video-play-video1']/div[1]/video"
-                    )
-                except NoSuchElementException:
-                    self.log("영상 엘리먼트를 찾지 못했습니다. 스킵.")
-                    self.driver.switch_to.default_content()
-                    return
+            # 강의 진입 과정에서 갱신된 쿠키 반영
+            self.sync_http_session()
+            self.progress.set_stage(STAGE_DOWNLOAD)
 
-            # 인트로 영상 확인
-            intro_video_url = f"https://{self.school_domain}/settings/viewer/uniplayer/intro.mp4"
-            if video_element.get_attribute("src") == intro_video_url:
-                self.log("인트로 영상 발견. 다음 영상 찾기 시도 중...")
-                time.sleep(8)  # 인트로 대기
-                try:
-                    video_element = self.driver.find_element(
-                        By.XPATH, "//*[@id='video-play-video1']/div[1]/video"
-                    )
-                except NoSuchElementException:
+            splitted_files = []
+            # 분할 영상을 받을 때마다 바로 뽑는 음성 조각 (경로, 후처리 작업 id) 과 조각별 변환 시간
+            fragments = []
+            fragment_secs = []
+            # 음소거 후 스크립트로 재생 시작 (플레이어가 아직 <video> 를 만들지 않았으면 SPACE 키로 시작)
+            if not self.player.start():
+                self.driver.switch_to.default_content()
+                viewer = self.driver.find_element(By.ID, "contentViewer")
+                ActionChains(self.driver).move_to_element(viewer).click().send_keys(Keys.SPACE).perform()
+                self.waiter.until("frame", EC.frame_to_be_available_and_switch_to_it((By.TAG_NAME, "iframe")))
+
+            # 동영상 element 찾기 (src 가 정해지고 메타데이터를 읽을 때까지)
+            found = self.waiter.until("player", video_ready(VIDEO_XPATHS), required=False)
+            if not found:
+                self.log("영상 엘리먼트를 찾지 못했습니다. 스킵.")
+                self.driver.switch_to.default_content()
+                return submitted
+
+            # 인트로 영상이면 바로 끝내고 본 영상으로 바뀔 때까지 대기 (네트워크 캡처는 인트로 요청만 제외하면 됨)
+            intro_video_url = self.player.intro_url
+            if self.capture:
+                # 본 영상 src 를 알면 같은 호스트의 미디어 요청만 분할 영상으로 봄
+                self.capture.set_player_src(found[1])
+            if found[1] == intro_video_url:
+                self.log("인트로 영상 발견. 인트로를 끝내고 다음 영상 찾기 시도 중...")
+                self.player.advance()
+            if found[1] == intro_video_url and not self.capture:
+                found = self.waiter.until("intro", video_ready(VIDEO_XPATHS, exclude_src=[intro_video_url]),
+                                          required=False)
+                if not found:
                     self.log("인트로 이후 영상 엘리먼트를 찾지 못했습니다. 스킵.")
                     self.driver.switch_to.default_content()
-                    return
+                    return submitted
 
             # 총 길이
             total_video_time = None
@@ -449,13 +567,36 @@ class ECyberDownloader:
             self.log(f"영상 총 길이: {total_video_time}")
 
             previous_url = None
+            seen_urls = set()
             downloaded_duration = 0
             video_count = 1
             continuous_fail_count = 0
+            download_failed = False
 
             while True:
-                video_url = video_element.get_attribute("src")
-                time.sleep(1)
+                # 아직 받지 않은 분할 영상 URL 이 나올 때까지 (제한 시간을 넘으면 아래에서 화살표 키로 탐색)
+                video_url, manifest_url = self.wait_next_segment(previous_url, seen_urls, [intro_video_url])
+                if manifest_url:
+                    # HLS/DASH: 매니페스트 하나에 강의 전체가 있으므로 재생을 기다리지 않고 한 번에 받음
+                    safe_filename = re.sub(r'[\\/*?:"<>|]', '_', f"{lesson_title}_1.mp4")
+                    file_path = os.path.join(mp4_dir, safe_filename)
+                    self.log(f"스트리밍 매니페스트: {manifest_url}")
+                    self.log(f"저장 파일: {file_path}")
+                    self.driver.switch_to.default_content()
+                    segment_info = self.download_stream(manifest_url, file_path)
+                    if not segment_info:
+                        self.log(f"[{subject_name} - {week_num}주 - {lesson_title}] 스트림 다운로드 실패로 강의 처리 중단.")
+                        download_failed = True
+                        break
+                    splitted_files.append(file_path)
+                    downloaded_duration = int(segment_info["duration"])
+                    if self.manifest and lecture_key:
+                        self.manifest.record_segment(
+                            lecture_key, 1, manifest_url, segment_info["size"],
+                            segment_info["duration"], segment_info["sha256"], file_path
+                        )
+                    self.log(f"[{subject_name} - {week_num}주 - {lesson_title}] 전체 다운로드 완료.")
+                    break
                 if video_url and video_url != previous_url:
                     # 분할파일명
                     filename = f"{lesson_title}_{video_count}.mp4"
@@ -465,18 +606,38 @@ class ECyberDownloader:
                     self.log(f"다운로드 링크: {video_url}")
                     self.log(f"저장 파일: {file_path}")
 
+                    # 받는 동안 플레이어가 다음 분할을 요청하도록 이 분할의 끝으로 이동
+                    self.player.advance(video_url)
                     self.driver.switch_to.default_content()
-                    time.sleep(1)
 
                     # 분할 mp4 다운로드
-                    self.download_mp4(video_url, file_path)
+                    segment_info = self.download_mp4(video_url, file_path)
+                    if not segment_info:
+                        # 불완전한 파일로 합치지 않고 중단 (.part는 다음 실행에서 이어 받음)
+                        self.log(f"[{subject_name} - {week_num}주 - {lesson_title}] 분할 영상 다운로드 실패로 강의 처리 중단.")
+                        download_failed = True
+                        break
                     splitted_files.append(file_path)
-
-                    # 다시 iframe 진입
-                    iframe = self.driver.find_element(By.TAG_NAME, "iframe")
-                    self.driver.switch_to.frame(iframe)
+                    fragment_path = os.path.join(
+                        audio_dir, FRAGMENT_DIR_NAME,
+                        fragment_name(os.path.splitext(safe_filename)[0], audio_format, audio_profile)
+                    )
+                    fragments.append((fragment_path, self.postprocessor.submit({
+                        "kind": "fragment",
+                        "title": lesson_title,
+                        "video": file_path,
+                        "audio_path": fragment_path,
+                        "audio_format": audio_format,
+                        "audio_profile": audio_profile,
+                        "encode_workers": encode_workers,
+                    }, lambda job, outcome, error: fragment_secs.append(outcome["audio_sec"] if outcome else 0.0))))
+
+                    # 다시 iframe 진입 (video.src 로 다음 URL 을 찾을 때만)
+                    if not self.capture:
+                        self.waiter.until("frame", EC.frame_to_be_available_and_switch_to_it((By.TAG_NAME, "iframe")))
 
                     previous_url = video_url
+                    seen_urls.add(video_url)
                     video_count += 1
                     continuous_fail_count = 0
 
@@ -484,6 +645,11 @@ class ECyberDownloader:
                     downloaded_video_duration = self.get_video_duration(file_path)
                     downloaded_duration += int(downloaded_video_duration)
                     self.log(f"현재까지 다운로드된 재생 시간: {downloaded_duration}")
+                    if self.manifest and lecture_key:
+                        self.manifest.record_segment(
+                            lecture_key, video_count - 1, video_url, segment_info["size"],
+                            downloaded_video_duration, segment_info.get("sha256"), file_path
+                        )
 
                     if int(downloaded_duration) >= int(total_video_time) - 1:
                         self.log(f"[{subject_name} - {week_num}주 - {lesson_title}] 전체 다운로드 완료.")
@@ -493,117 +659,176 @@ class ECyberDownloader:
                     if continuous_fail_count >= 999:
                         self.log("연속 URL 실패로 인한 강의 다운로드 중단.")
                         break
-                    self.driver.switch_to.default_content()
-                    time.sleep(2)
-                    viewer = self.driver.find_element(By.ID, "contentViewer")
-                    actions = ActionChains(self.driver)
-                    time.sleep(1)
-                    # 화살표 키로 앞부분 탐색
-                    for _ in range(6):
-                        actions.move_to_element(viewer).click().send_keys(Keys.ARROW_RIGHT).perform()
-                    iframe = self.driver.find_element(By.TAG_NAME, "iframe")
-                    self.driver.switch_to.frame(iframe)
-                    time.sleep(1)
-
-            # (B) 분할된 mp4가 여러 개라면 하나로 합치기
-            final_merged_mp4 = None
-            if len(splitted_files) == 0:
+                    # 마지막으로 받은 분할(또는 인트로)을 끝내 다음 분할 요청을 유도
+                    if not self.player.advance(previous_url):
+                        # <video> 를 찾지 못하면 예전처럼 화살표 키로 앞부분 탐색
+                        self.driver.switch_to.default_content()
+                        viewer = self.driver.find_element(By.ID, "contentViewer")
+                        actions = ActionChains(self.driver)
+                        for _ in range(6):
+                            actions.move_to_element(viewer).click().send_keys(Keys.ARROW_RIGHT).perform()
+                        self.waiter.until("frame", EC.frame_to_be_available_and_switch_to_it((By.TAG_NAME, "iframe")))
+
+            if self.capture:
+                self.log(
+                    f"네트워크 캡처: 미디어 요청 {sum(r.requests for r in self.capture.requests.values())}개, "
+                    f"URL {len(self.capture.requests)}개"
+                )
+
+            # (B)/(C) 병합 + 음성 추출은 후처리 풀에 넘기고 바로 다음 강의로 진행
+            if download_failed:
+                self.log("다운로드가 완료되지 않아 합치기/음성 추출을 건너뜁니다. 다시 실행하면 이어 받습니다.")
+            elif len(splitted_files) == 0:
                 self.log("다운로드된 영상 파일이 없습니다.")
-            elif len(splitted_files) == 1:
-                self.log("분할 영상이 아니므로 합치기 과정 없이 mp3로 추출 진행합니다.")
-                final_merged_mp4 = splitted_files[0]
             else:
-                self.log("분할된 영상을 하나로 합치는 중...")
-                merged_filename = f"{lesson_title}_merged.mp4"
-                merged_filename = re.sub(r'[\\/*?:"<>|]', '_', merged_filename)
+                merged_filename = re.sub(r'[\\/*?:"<>|]', '_', f"{lesson_title}_merged.mp4")
                 merged_filepath = os.path.join(mp4_dir, merged_filename)
-
-                try:
-                    valid_clips = []
-                    for f in splitted_files:
-                        try:
-                            clip = VideoFileClip(f)
-                            valid_clips.append(clip)
-                        except Exception as e:
-                            self.log(f"파일 {f} 로드 실패, 건너뛰기: {e}")
-                    if not valid_clips:
-                        raise Exception("유효한 영상 파일이 없습니다.")
-                    final_clip = concatenate_videoclips(valid_clips)
-                    # MoviePy의 내부 로깅을 끄고 진행바가 콘솔에 찍히지 않도록 logger=None 전달
-                    final_clip.write_videofile(merged_filepath, logger=None)
-                    for clip in valid_clips:
-                        clip.close()
-                    final_merged_mp4 = merged_filepath
-                    self.log(f"분할된 영상을 하나로 합쳤습니다: {merged_filepath}")
-                    # 분할 영상들 제거 (원치 않으시면 주석처리)
-                    for f in splitted_files:
-                        if os.path.exists(f):
-                            os.remove(f)
-                except Exception as merge_err:
-                    self.log(f"분할 영상 병합 중 오류: {merge_err}")
-                    final_merged_mp4 = splitted_files[0]
-
-            # (C) 최종 영상 -> mp3 변환
-            if final_merged_mp4:
-                try:
-                    clip = VideoFileClip(final_merged_mp4)
-                    base_name = os.path.splitext(os.path.basename(final_merged_mp4))[0]
-                    mp3_path = os.path.join(mp3_dir, base_name + ".mp3")
-                    self.log(f"MP3 변환 중 (진행률 표시 안됨): {mp3_path}")
-                    # 커스텀 로거 적용
-                    logger = MP3ProgressLogger(self.progress_callback) if self.progress_callback else None
-                    clip.audio.write_audiofile(mp3_path, logger=logger)
-                    clip.close()
-                    self.log(f"MP3 변환 완료: {mp3_path}")
-                except Exception as e:
-                    self.log(f"MP3 변환 오류: {str(e)}")
+                final_mp4 = splitted_files[0] if len(splitted_files) == 1 else merged_filepath
+                base_name = os.path.splitext(os.path.basename(final_mp4))[0]
+                job = {
+                    "title": lesson_title,
+                    "segments": list(splitted_files),
+                    "merged_path": merged_filepath,
+                    "audio_path": os.path.join(audio_dir, f"{base_name}.{audio_format}"),
+                    "audio_format": audio_format,
+                    "audio_profile": audio_profile,
+                    "encode_workers": encode_workers,
+                    "fragments": [path for path, _ in fragments],
+                }
+                if self.storage and len(splitted_files) > 1:
+                    # 병합 결과는 분할 영상 크기의 합만큼 필요
+                    self.storage.ensure_free(sum(os.path.getsize(f) for f in splitted_files), merged_filename)
+                self.postprocessor.submit(
+                    job, lambda job, outcome, error: self._postprocess_done(
+                        lecture_key, downloaded_duration, outcome, sum(fragment_secs)
+                    ),
+                    after=[job_id for _, job_id in fragments]
+                )
+                submitted = True
+                self.progress.set_stage(STAGE_DONE)
 
         except Exception as e:
             self.log(f"동영상 다운로드 처리 중 오류: {str(e)}")
         finally:
             self.driver.switch_to.default_content()
+        return submitted
+
+    def wait_next_segment(self, previous_url, seen_urls, exclude):
+        """
+        아직 받지 않은 다음 분할 영상 URL 과 (HLS/DASH 면) 매니페스트 URL. 제한 시간 안에 없으면 (None, None)
+        네트워크 캡처를 쓰면 플레이어가 요청한 순서대로 받고, 요청 헤더(Referer 등)도 다운로드에 적용
+        아니면 iframe 안 video.src 가 바뀔 때까지 대기
+        """
+        if self.capture:
+            record = self.waiter.until("segment", self.capture.next_request(seen_urls, exclude), required=False)
+            if not record:
+                return None, None
+            if record.kind == KIND_MANIFEST:
+                return record.url, record.url
+            for name, value in record.forward_headers().items():
+                self.http.set_header(name, value)
+            return record.url, None
+        found = self.waiter.until(
+            "segment", video_ready(VIDEO_XPATHS, exclude_src=exclude, previous_src=previous_url), required=False
+        )
+        video_url = found[1] if found else None
+        return video_url, self.find_stream_manifest(video_url)
+
+    def _postprocess_done(self, lecture_key, duration, outcome, fragment_sec=0.0):
+        """
+        후처리 완료 콜백 (후처리 풀 스레드에서 호출)
+        fragment_sec: 다운로드 중에 조각 작업에서 쓴 음성 변환 시간 (강의별 변환 시간에 합산)
+        """
+        if outcome:
+            outcome["encode_sec"] = outcome.get("audio_sec", 0.0) + fragment_sec
+        if not (self.manifest and lecture_key):
+            return
+        if outcome and outcome.get("audio") and outcome.get("merge_ok"):
+            self.manifest.complete_lecture(
+                lecture_key, {"video": outcome["video"], "audio": outcome["audio"]}, duration=duration,
+                audio_stats={"profile": outcome.get("audio_profile"), "encode_sec": round(outcome["encode_sec"], 2)}
+            )
+            if self.storage:
+                self.storage.enforce_budget()
+        else:
+            self.manifest.fail_lecture(lecture_key)
 
     def download_mp4(self, url: str, file_name: str):
         """
         분할 mp4 다운로드
-        ※ 만약 파일 열기나 다운로드 중에 에러가 나면 return으로 빠져나옴.
+        서버가 Range를 지원하면 self.connections 개의 연결로 나눠 받고, 아니면 단일 스트림으로 받음
+        '<파일>.part' 로 받다가 크기 검증 후 최종 파일명으로 변경하며, 끊기면 이어 받기 재시도
+        성공 시 파일 정보(dict: url, size, etag, sha256 ...) 반환, 실패 시 None
+        (실패 시 .part 파일은 다음 실행에서 이어 받도록 남겨 둠)
         """
+        segment_downloader = SegmentDownloader(
+            self.log, progress=self.progress, connections=self.connections,
+            http=self.http, block_size=self.block_size, scheduler=self.scheduler,
+            cache=self.segment_cache, storage=self.storage
+        )
         try:
-            response = requests.get(url, stream=True, timeout=10)
-            response.raise_for_status()  # 4xx/5xx 에러 발생 시 예외
-        except Exception as e:
+            info = segment_downloader.download(url, file_name)
+        except requests.exceptions.RequestException as e:
             self.log(f"HTTP 요청 실패: {str(e)} - {url}")
-            return
+            return None
+        except Exception as e:
+            self.log(f"다운로드 실패: {str(e)} - {file_name}")
+            return None
 
-        total_size = int(response.headers.get("content-length", 0))
-        block_size = 1024
-        downloaded = 0
+        self.log(f"{file_name} 다운로드 완료.")
+        return info
 
+    def find_stream_manifest(self, video_url):
+        """
+        재생 중인 영상이 HLS/DASH 스트림이면 매니페스트 URL 반환, progressive mp4 면 None
+        (hls.js/dash.js 처럼 MSE 로 재생하면 src 가 blob: 이므로 iframe 의 리소스 목록에서 찾음)
+        """
+        if is_manifest_url(video_url):
+            return video_url
+        if not video_url or not video_url.startswith("blob:"):
+            return None
         try:
-            with open(file_name, "wb") as mp4_file:
-                for chunk in response.iter_content(block_size):
-                    if not chunk:
-                        continue
-                    mp4_file.write(chunk)
-                    downloaded += len(chunk)
-                    if total_size > 0 and self.progress_callback:
-                        percentage = int(downloaded * 100 / total_size)
-                        self.progress_callback(percentage)
+            resources = self.driver.execute_script(
+                "return performance.getEntriesByType('resource').map(function (e) { return e.name; });"
+            ) or []
+        except WebDriverException:
+            return None
+        manifests = [url for url in resources if is_manifest_url(url)]
+        # 마스터 재생목록이 먼저 요청되므로 처음 것을 사용 (화질은 직접 선택)
+        return manifests[0] if manifests else None
+
+    def download_stream(self, url: str, file_name: str):
+        """
+        HLS/DASH 매니페스트를 mp4 하나로 다운로드 (세그먼트 병렬, 재인코딩 없음)
+        성공 시 파일 정보(dict, duration 포함) 반환, 실패 시 None (받은 세그먼트는 남겨 둠)
+        """
+        stream_downloader = StreamDownloader(
+            self.log, progress=self.progress, workers=self.connections,
+            http=self.http, scheduler=self.scheduler, storage=self.storage
+        )
+        try:
+            info = stream_downloader.download(url, file_name)
+        except requests.exceptions.RequestException as e:
+            self.log(f"HTTP 요청 실패: {str(e)} - {url}")
+            return None
         except Exception as e:
-            self.log(f"다운로드 실패: {str(e)} - {file_name}")
-            return
+            self.log(f"스트림 다운로드 실패: {str(e)} - {file_name}")
+            return None
 
         self.log(f"{file_name} 다운로드 완료.")
+        return info
 
     def get_video_duration(self, file_path: str):
         """
         mp4 파일 길이(초) 반환
+        moov 박스 헤더만 읽어 계산하고, 해석할 수 없는 파일만 ffprobe(ffmpeg)로 확인
         """
         try:
-            clip = VideoFileClip(file_path)
-            duration = clip.duration
-            clip.close()
-            return duration
+            return read_duration_us(file_path) / 1000000
+        except (Mp4StructureError, OSError) as e:
+            self.log(f"mp4 헤더에서 길이를 읽지 못해 ffprobe 로 확인: {str(e)}")
+        try:
+            return probe_duration(file_path)
         except Exception as e:
             self.log(f"동영상 길이 확인 오류: {str(e)}")
             return 0
@@ -612,6 +837,11 @@ class ECyberDownloader:
         """
         드라이버 종료
         """
+        self.http.close()
+        if self.segment_cache:
+            self.segment_cache.close()
+        if self.manifest:
+            self.manifest.close()
         if self.driver:
             try:
                 self.driver.quit()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+ffmpeg 실행 도우미
+- moviepy 가 함께 설치하는 imageio-ffmpeg 의 ffmpeg 바이너리를 우선 사용하고, 없으면 PATH 의 ffmpeg
+- 재인코딩 없는 컨테이너 작업(remux/병합)에 사용
+"""
+import os
+import re
+import shutil
+import subprocess
+
+_DURATION_RE = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+
+
+class FFmpegError(RuntimeError):
+    """
+    ffmpeg 를 찾지 못했거나 0 이 아닌 종료 코드로 끝난 경우
+    """
+
+
+_ffmpeg_exe = None
+
+
+def ffmpeg_exe():
+    """
+    ffmpeg 실행 파일 경로
+    """
+    global _ffmpeg_exe
+    if _ffmpeg_exe:
+        return _ffmpeg_exe
+    try:
+        import imageio_ffmpeg
+        _ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
+    except (ImportError, RuntimeError):
+        _ffmpeg_exe = shutil.which("ffmpeg")
+    if not _ffmpeg_exe:
+        raise FFmpegError("ffmpeg 실행 파일을 찾을 수 없습니다.")
+    return _ffmpeg_exe
+
+
+def _no_window():
+    # GUI 실행 시 콘솔 창이 뜨지 않도록
+    return {"creationflags": subprocess.CREATE_NO_WINDOW} if os.name == "nt" else {}
+
+
+def run_ffmpeg(args, check=True):
+    """
+    ffmpeg 실행 (콘솔 창 없이). (종료 코드, stderr 문자열) 반환
+    check=True 이면 실패 시 FFmpegError 발생
+    """
+    command = [ffmpeg_exe(), "-hide_banner", "-nostdin", "-y"] + list(args)
+    completed = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, **_no_window())
+    stderr = completed.stderr.decode("utf-8", errors="replace")
+    if check and completed.returncode != 0:
+        tail = "\n".join(stderr.strip().splitlines()[-5:])
+        raise FFmpegError(f"ffmpeg 실패 (종료 코드 {completed.returncode}): {tail}")
+    return completed.returncode, stderr
+
+
+def probe_duration(path: str):
+    """
+    재생 시간(초). PATH 에 ffprobe 가 있으면 사용하고, 없으면 'ffmpeg -i' 출력의 Duration 을 해석
+    """
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe:
+        completed = subprocess.run(
+            [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "default=nw=1:nk=1", path],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, **_no_window()
+        )
+        try:
+            return float(completed.stdout.decode().strip())
+        except ValueError:
+            pass
+    _code, stderr = run_ffmpeg(["-i", path], check=False)
+    m = _DURATION_RE.search(stderr)
+    if not m:
+        raise FFmpegError(f"재생 시간을 알 수 없습니다: {os.path.basename(path)}")
+    return int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3))
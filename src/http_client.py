@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+공용 HTTP 클라이언트
+- 호스트별로 requests.Session 하나를 유지 (keep-alive 연결 재사용 → DNS/TCP/TLS 재협상 생략)
+- 연결 풀 크기와 재시도 어댑터 설정
+- Selenium 로그인 세션의 쿠키를 복사해 브라우저와 같은 세션으로 요청
+"""
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 호스트별 풀 설정 (pool_maxsize 는 동시 연결 수 이상이어야 연결을 버리지 않음)
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+# 연결 실패 / 일시적 서버 오류에 대한 재시도 (스트리밍 도중 끊김은 transfer 쪽에서 처리)
+DEFAULT_RETRIES = 3
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_FORCELIST = (500, 502, 503, 504)
+# 미디어 전송용: 503 은 urllib3 가 흡수하지 않고 스케줄러(AIMD)가 받아 동시 연결 수를 줄이도록 제외
+MEDIA_RETRY_STATUS_FORCELIST = (500, 502, 504)
+
+
+class HttpClient:
+    """
+    호스트별 Session 풀
+    pool_connections: 어댑터가 보관할 연결 풀 수
+    pool_maxsize: 풀 하나당 최대 연결 수
+    retries: 연결/일시적 오류 재시도 횟수
+    status_forcelist: 어댑터에서 바로 재시도할 HTTP 상태 코드
+    """
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 retries=DEFAULT_RETRIES, status_forcelist=RETRY_STATUS_FORCELIST):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.status_forcelist = tuple(status_forcelist)
+        self.headers = {}
+        self._cookies = []
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _new_session(self):
+        session = requests.Session()
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=0,
+            backoff_factor=RETRY_BACKOFF_FACTOR,
+            status_forcelist=self.status_forcelist,
+            allowed_methods=frozenset(["HEAD", "GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(self.headers)
+        for cookie in self._cookies:
+            self._set_cookie(session, cookie)
+        return session
+
+    def session_for(self, url: str):
+        """
+        url 의 호스트에 해당하는 Session 반환 (없으면 생성)
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._new_session()
+                self._sessions[host] = session
+            return session
+
+    def get(self, url: str, **kwargs):
+        return self.session_for(url).get(url, **kwargs)
+
+    def head(self, url: str, **kwargs):
+        return self.session_for(url).head(url, **kwargs)
+
+    def set_header(self, name: str, value: str):
+        """
+        모든 Session 에 공통 헤더 적용 (예: 브라우저와 같은 User-Agent)
+        """
+        with self._lock:
+            self.headers[name] = value
+            for session in self._sessions.values():
+                session.headers[name] = value
+
+    def load_selenium_cookies(self, cookies):
+        """
+        driver.get_cookies() 결과를 모든 Session 에 복사
+        """
+        with self._lock:
+            self._cookies = list(cookies or [])
+            for session in self._sessions.values():
+                for cookie in self._cookies:
+                    self._set_cookie(session, cookie)
+
+    @staticmethod
+    def _set_cookie(session, cookie: dict):
+        session.cookies.set(
+            cookie["name"], cookie["value"],
+            domain=cookie.get("domain", ""),
+            path=cookie.get("path", "/"),
+            secure=cookie.get("secure", False),
+        )
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def default_client():
+    """
+    로그인 쿠키가 필요 없는 요청(버전 체크, 학교 목록, 날씨 등)에 쓰는 프로그램 공용 클라이언트
+    """
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtCore import QStandardPaths, QLockFile
 from mainwindow import MainWindow
@@ -30,4 +31,6 @@ def main():
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
+    # PyInstaller 로 묶은 exe 에서 후처리 프로세스(spawn)가 다시 GUI 를 띄우지 않도록
+    multiprocessing.freeze_support()
     main()
@@ -6,13 +6,21 @@ import json
 import re
 import time
 import random
-import requests
 from PyQt5 import QtWidgets, QtCore, QtGui
 from PyQt5.QtWidgets import QMessageBox
 
 from encryption import fernet
 from worker import DownloaderWorker
 from downloader import CURRENT_VERSION, VERSION_URL
+from http_client import default_client
+from progress import describe, format_bytes, STAGE_LABELS
+from scheduler import DEFAULT_MAX_CONNECTIONS, DEFAULT_PER_HOST_CONNECTIONS
+from segment_cache import DEFAULT_CACHE_LIMIT
+from storage import DEFAULT_VIDEO_BUDGET
+from audio_extract import AUDIO_FORMATS, DEFAULT_AUDIO_FORMAT, AUDIO_PROFILES, DEFAULT_AUDIO_PROFILE
+from postprocess import DEFAULT_POSTPROCESS_WORKERS
+
+GB = 1024 * 1024 * 1024
 
 # 지원 학교 목록
 SCHOOLS_URL = "https://raw.githubusercontent.com/OneTop4458/e-cyber-downloader/refs/heads/main/schools.json"
@@ -31,10 +39,27 @@ class MainWindow(QtWidgets.QMainWindow):
         self.subjects = []
         self.log_level = "DEBUG"
         self.headless = False
+        # 분할 영상 URL 을 CDP 네트워크 이벤트로 찾기 (다음 브라우저 실행부터 적용)
+        self.network_capture = True
         self.school_name = ""
         self.school_code = ""
         self.school_domain = ""
         self.weather_effect_widget = None
+        # 다운로드 연결 설정
+        self.max_connections = DEFAULT_MAX_CONNECTIONS
+        self.per_host_connections = DEFAULT_PER_HOST_CONNECTIONS
+        self.bandwidth_limit_kbps = 0
+        self.cache_limit_gb = DEFAULT_CACHE_LIMIT // GB
+        # 완료한 강의의 영상 원본(mp4) 예산 (0 이면 제한 없음, 넘으면 오래된 영상부터 삭제)
+        self.video_budget_gb = DEFAULT_VIDEO_BUDGET // GB
+        # 음성 출력 형식 (m4a: AAC 복사, mp3: 변환)
+        self.audio_format = DEFAULT_AUDIO_FORMAT
+        # 음성 인코딩 프로필 (copy / speech-small / archive)
+        self.audio_profile = DEFAULT_AUDIO_PROFILE
+        # 긴 강의 음성을 구간별로 나눠 모든 코어로 동시에 인코딩
+        self.parallel_encode = True
+        # 병합/음성 추출 프로세스 수 (0 이면 강의마다 순차 처리)
+        self.postprocess_workers = DEFAULT_POSTPROCESS_WORKERS
 
         # UI 초기화
         self.setup_ui()
@@ -248,6 +273,13 @@ class MainWindow(QtWidgets.QMainWindow):
         self.headless_action.triggered.connect(self.toggle_headless)
         options_menu.addAction(self.headless_action)
 
+        # 네트워크 캡처
+        self.network_capture_action = QtWidgets.QAction("네트워크 캡처로 영상 주소 찾기 (CDP)", self)
+        self.network_capture_action.setCheckable(True)
+        self.network_capture_action.setChecked(self.network_capture)
+        self.network_capture_action.triggered.connect(self.toggle_network_capture)
+        options_menu.addAction(self.network_capture_action)
+
         # 날씨 효과 토글
         self.weather_effect_action = QtWidgets.QAction("날씨 효과", self)
         self.weather_effect_action.setCheckable(True)
@@ -282,6 +314,38 @@ class MainWindow(QtWidgets.QMainWindow):
         log_level_menu.addAction(log_level_info)
         log_level_menu.addAction(log_level_warning)
 
+        # 음성 출력 형식 서브메뉴
+        audio_format_menu = options_menu.addMenu("음성 출력 형식")
+        audio_format_group = QtWidgets.QActionGroup(self)
+        self.audio_format_actions = {}
+        for audio_format, label in AUDIO_FORMATS.items():
+            action = QtWidgets.QAction(label, self, checkable=True)
+            action.setChecked(audio_format == self.audio_format)
+            action.triggered.connect(lambda checked, f=audio_format: self.set_audio_format(f))
+            audio_format_group.addAction(action)
+            audio_format_menu.addAction(action)
+            self.audio_format_actions[audio_format] = action
+
+        # 음성 프로필 서브메뉴
+        audio_profile_menu = options_menu.addMenu("음성 프로필")
+        audio_profile_group = QtWidgets.QActionGroup(self)
+        self.audio_profile_actions = {}
+        for audio_profile, label in AUDIO_PROFILES.items():
+            action = QtWidgets.QAction(label, self, checkable=True)
+            action.setChecked(audio_profile == self.audio_profile)
+            action.triggered.connect(lambda checked, p=audio_profile: self.set_audio_profile(p))
+            audio_profile_group.addAction(action)
+            audio_profile_menu.addAction(action)
+            self.audio_profile_actions[audio_profile] = action
+
+        # 긴 강의 병렬 인코딩
+        self.parallel_encode_action = QtWidgets.QAction("긴 강의 음성 병렬 인코딩", self)
+        self.parallel_encode_action.setCheckable(True)
+        self.parallel_encode_action.setChecked(self.parallel_encode)
+        self.parallel_encode_action.triggered.connect(self.toggle_parallel_encode)
+        audio_profile_menu.addSeparator()
+        audio_profile_menu.addAction(self.parallel_encode_action)
+
         # Help 메뉴
         help_menu = menubar.addMenu("Help")
 
@@ -300,6 +364,11 @@ class MainWindow(QtWidgets.QMainWindow):
         school_settings_action.triggered.connect(self.open_school_settings)
         options_menu.addAction(school_settings_action)
 
+        # 다운로드 설정 (동시 연결 수, 대역폭 제한)
+        download_settings_action = QtWidgets.QAction("다운로드 설정", self)
+        download_settings_action.triggered.connect(self.open_download_settings)
+        options_menu.addAction(download_settings_action)
+
         # 상태바 초기화
         self.statusBar().showMessage("준비됨")
 
@@ -373,6 +442,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self.progress_bar.setValue(0)
         main_layout.addWidget(self.progress_bar)
 
+        # 진행 상황 요약 (강의 k/n, 단계, 속도, 남은 시간)
+        self.progress_label = QtWidgets.QLabel("")
+        main_layout.addWidget(self.progress_label)
+
         # 다운로드 시작 버튼
         self.start_download_button = QtWidgets.QPushButton("다운로드 시작")
         self.start_download_button.clicked.connect(self.start_download)
@@ -385,7 +458,7 @@ class MainWindow(QtWidgets.QMainWindow):
         """
         license_url = "https://raw.githubusercontent.com/OneTop4458/e-cyber-downloader/refs/heads/main/LICENSE"
         try:
-            response = requests.get(license_url, timeout=10)
+            response = default_client().get(license_url, timeout=10)
             if response.status_code == 200:
                 license_text = response.text
             else:
@@ -422,10 +495,78 @@ class MainWindow(QtWidgets.QMainWindow):
             self.append_log(f"[INFO] 학교 설정 변경: {self.school_name} ({self.school_code}, {self.school_domain})")
             self.save_config()
 
+    def open_download_settings(self):
+        """
+        다운로드 설정 표시 (실행 중인 Worker가 있으면 즉시 반영)
+        """
+        dlg = DownloadSettingsDialog(self, max_connections=self.max_connections,
+                                     per_host_connections=self.per_host_connections,
+                                     bandwidth_limit_kbps=self.bandwidth_limit_kbps,
+                                     cache_limit_gb=self.cache_limit_gb,
+                                     postprocess_workers=self.postprocess_workers,
+                                     video_budget_gb=self.video_budget_gb)
+        if dlg.exec_() == QtWidgets.QDialog.Accepted:
+            (self.max_connections, self.per_host_connections, self.bandwidth_limit_kbps,
+             self.cache_limit_gb, self.postprocess_workers, self.video_budget_gb) = dlg.get_values()
+            if self.downloader_worker is not None:
+                self.downloader_worker.scheduler.configure(
+                    max_connections=self.max_connections,
+                    per_host=self.per_host_connections,
+                    bandwidth_limit=self.bandwidth_limit_kbps * 1024
+                )
+                self.downloader_worker.video_budget = self.video_budget_gb * GB
+                downloader = self.downloader_worker.downloader
+                if downloader is not None and downloader.storage is not None:
+                    downloader.storage.budget = self.video_budget_gb * GB
+            limit_text = f"{self.bandwidth_limit_kbps} KB/s" if self.bandwidth_limit_kbps else "제한 없음"
+            self.append_log(
+                f"[INFO] 다운로드 설정 변경: 전체 연결 {self.max_connections}, "
+                f"호스트별 연결 {self.per_host_connections}, 대역폭 {limit_text}, "
+                f"캐시 {self.cache_limit_gb} GB, 후처리 프로세스 {self.postprocess_workers}, "
+                f"영상 원본 예산 {f'{self.video_budget_gb} GB' if self.video_budget_gb else '제한 없음'} "
+                f"(캐시 용량/후처리 프로세스 수는 다음 로그인부터 적용)"
+            )
+            self.save_config()
+
     def set_log_level(self, level):
         self.log_level = level
         self.append_log(f"[INFO] 로그 레벨이 {level}(으)로 설정되었습니다.")
 
+    def set_audio_format(self, audio_format):
+        self.audio_format = audio_format
+        # 실행 중이면 다음 강의부터 적용
+        if self.downloader_worker is not None:
+            self.downloader_worker.audio_format = audio_format
+            if self.downloader_worker.downloader is not None:
+                self.downloader_worker.downloader.audio_format = audio_format
+        self.append_log(f"[INFO] 음성 출력 형식: {AUDIO_FORMATS[audio_format]}")
+        self.save_config()
+
+    def set_audio_profile(self, audio_profile):
+        self.audio_profile = audio_profile
+        # 실행 중이면 다음 강의부터 적용
+        if self.downloader_worker is not None:
+            self.downloader_worker.audio_profile = audio_profile
+            if self.downloader_worker.downloader is not None:
+                self.downloader_worker.downloader.audio_profile = audio_profile
+        self.append_log(f"[INFO] 음성 프로필: {AUDIO_PROFILES[audio_profile]}")
+        self.save_config()
+
+    def toggle_parallel_encode(self, checked):
+        self.parallel_encode = checked
+        # 실행 중이면 다음 강의부터 적용
+        if self.downloader_worker is not None:
+            self.downloader_worker.parallel_encode = checked
+            if self.downloader_worker.downloader is not None:
+                self.downloader_worker.downloader.parallel_encode = checked
+        self.append_log(f"[INFO] 긴 강의 음성 병렬 인코딩 {'사용' if checked else '해제'}됨.")
+        self.save_config()
+
+    def toggle_network_capture(self, checked):
+        self.network_capture = checked
+        self.append_log(f"[INFO] 네트워크 캡처 {'사용' if checked else '해제'}됨. (다음 브라우저 실행부터 적용)")
+        self.save_config()
+
     def toggle_headless(self, checked):
         self.headless = checked
         self.append_log(f"[INFO] Headless Mode {'사용' if checked else '해제'}됨.")
@@ -553,6 +694,26 @@ class MainWindow(QtWidgets.QMainWindow):
                 # 날씨 효과 옵션
                 weather_effects = data.get("weather_effects", True)
                 self.weather_effect_action.setChecked(weather_effects)
+                # 다운로드 연결 설정
+                self.max_connections = data.get("max_connections", DEFAULT_MAX_CONNECTIONS)
+                self.per_host_connections = data.get("per_host_connections", DEFAULT_PER_HOST_CONNECTIONS)
+                self.bandwidth_limit_kbps = data.get("bandwidth_limit_kbps", 0)
+                self.cache_limit_gb = data.get("cache_limit_gb", DEFAULT_CACHE_LIMIT // GB)
+                self.postprocess_workers = data.get("postprocess_workers", DEFAULT_POSTPROCESS_WORKERS)
+                self.video_budget_gb = data.get("video_budget_gb", DEFAULT_VIDEO_BUDGET // GB)
+                # 음성 출력 형식
+                audio_format = data.get("audio_format", DEFAULT_AUDIO_FORMAT)
+                if audio_format in AUDIO_FORMATS:
+                    self.audio_format = audio_format
+                    self.audio_format_actions[audio_format].setChecked(True)
+                audio_profile = data.get("audio_profile", DEFAULT_AUDIO_PROFILE)
+                if audio_profile in AUDIO_PROFILES:
+                    self.audio_profile = audio_profile
+                    self.audio_profile_actions[audio_profile].setChecked(True)
+                self.parallel_encode = data.get("parallel_encode", True)
+                self.parallel_encode_action.setChecked(self.parallel_encode)
+                self.network_capture = data.get("network_capture", True)
+                self.network_capture_action.setChecked(self.network_capture)
             except Exception as e:
                 self.append_log(f"[WARNING] 설정 로드 에러: {str(e)}")
 
@@ -569,7 +730,17 @@ class MainWindow(QtWidgets.QMainWindow):
             "school_name": self.school_name,
             "school_code": self.school_code,
             "school_domain": self.school_domain,
-            "weather_effects": self.weather_effect_action.isChecked()
+            "weather_effects": self.weather_effect_action.isChecked(),
+            "max_connections": self.max_connections,
+            "per_host_connections": self.per_host_connections,
+            "bandwidth_limit_kbps": self.bandwidth_limit_kbps,
+            "cache_limit_gb": self.cache_limit_gb,
+            "postprocess_workers": self.postprocess_workers,
+            "video_budget_gb": self.video_budget_gb,
+            "audio_format": self.audio_format,
+            "audio_profile": self.audio_profile,
+            "parallel_encode": self.parallel_encode,
+            "network_capture": self.network_capture
         }
         try:
             with open(config_file, "w", encoding="utf-8") as f:
@@ -642,10 +813,22 @@ class MainWindow(QtWidgets.QMainWindow):
                 self.download_dir,
                 headless=self.headless,
                 school_code=self.school_code,
-                school_domain=self.school_domain
+                school_domain=self.school_domain,
+                max_connections=self.max_connections,
+                per_host_connections=self.per_host_connections,
+                bandwidth_limit=self.bandwidth_limit_kbps * 1024,
+                cache_limit=self.cache_limit_gb * GB,
+                audio_format=self.audio_format,
+                audio_profile=self.audio_profile,
+                parallel_encode=self.parallel_encode,
+                video_budget=self.video_budget_gb * GB,
+                postprocess_workers=self.postprocess_workers,
+                network_capture=self.network_capture
             )
             self.downloader_worker.moveToThread(self.worker_thread)
-            self.downloader_worker.progress_update_signal.connect(self.progress_bar.setValue)
+            self.downloader_worker.progress_signal.connect(self.update_progress)
+            self.downloader_worker.job_progress_signal.connect(self.update_job_progress)
+            self.downloader_worker.job_finished_signal.connect(self.on_job_finished)
 
             # 시그널 연결
             self.downloader_worker.log_signal.connect(self.append_log)
@@ -769,6 +952,33 @@ class MainWindow(QtWidgets.QMainWindow):
             QtCore.Q_ARG(int, start_week)
         )
 
+    def update_progress(self, snapshot):
+        """
+        Worker가 주기적으로 보내는 진행 상황 스냅샷을 진행바/요약 라벨에 표시
+        """
+        self.progress_bar.setValue(snapshot.get("overall_percent", 0))
+        self.progress_label.setText(describe(snapshot))
+
+    def update_job_progress(self, info):
+        """
+        백그라운드 후처리(병합/음성 추출) 진행률을 상태 표시줄에 표시
+        """
+        stage = STAGE_LABELS.get(info["stage"], info["stage"])
+        self.statusBar().showMessage(f"[후처리] {info['title']} - {stage} {info['percent']}%", 3000)
+
+    def on_job_finished(self, info):
+        """
+        강의 하나의 후처리가 끝났을 때
+        """
+        if info["ok"]:
+            self.append_log(
+                f"[INFO] 후처리 완료: {info['title']} (병합 {info['merge_sec']:.1f}초, "
+                f"음성 {info['audio_profile']} 변환 {info['encode_sec']:.1f}초, {format_bytes(info['audio_size'])})"
+            )
+        else:
+            reason = f": {info['error']}" if info["error"] else ""
+            self.append_log(f"[WARNING] 후처리 실패: {info['title']}{reason}")
+
     def on_download_finished(self):
         """
         모든 다운로드가 끝났을 때 버튼을 다시 활성화
@@ -828,7 +1038,7 @@ class MainWindow(QtWidgets.QMainWindow):
         새 버전이 있으면 현재 실행 파일(자기 자신)을 업데이트 파일로 교체합니다.
         """
         try:
-            response = requests.get(VERSION_URL, timeout=10)
+            response = default_client().get(VERSION_URL, timeout=10)
             if response.status_code == 200:
                 version_info = response.json()
                 latest_version = version_info.get("version")
@@ -873,7 +1083,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 progress_dialog.set_progress(value)
 
             progress_dialog.append_log("업데이트 파일 다운로드 중...")
-            response = requests.get(download_url, stream=True, timeout=30)
+            response = default_client().get(download_url, stream=True, timeout=30)
             response.raise_for_status()
 
             import sys
@@ -950,6 +1160,65 @@ class UpdateProgressDialog(QtWidgets.QDialog):
         QtWidgets.QApplication.processEvents()
 
 
+class DownloadSettingsDialog(QtWidgets.QDialog):
+    def __init__(self, parent=None, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 per_host_connections=DEFAULT_PER_HOST_CONNECTIONS, bandwidth_limit_kbps=0,
+                 cache_limit_gb=DEFAULT_CACHE_LIMIT // GB, postprocess_workers=DEFAULT_POSTPROCESS_WORKERS,
+                 video_budget_gb=DEFAULT_VIDEO_BUDGET // GB):
+        super().__init__(parent)
+        self.setWindowTitle("다운로드 설정")
+        layout = QtWidgets.QFormLayout(self)
+
+        self.max_connections_spin = QtWidgets.QSpinBox()
+        self.max_connections_spin.setRange(1, 32)
+        self.max_connections_spin.setValue(max_connections)
+        layout.addRow("전체 동시 연결 수 (상한):", self.max_connections_spin)
+
+        self.per_host_spin = QtWidgets.QSpinBox()
+        self.per_host_spin.setRange(1, 16)
+        self.per_host_spin.setValue(per_host_connections)
+        layout.addRow("서버별 동시 연결 수:", self.per_host_spin)
+
+        self.bandwidth_spin = QtWidgets.QSpinBox()
+        self.bandwidth_spin.setRange(0, 1024 * 1024)
+        self.bandwidth_spin.setSingleStep(512)
+        self.bandwidth_spin.setSuffix(" KB/s")
+        self.bandwidth_spin.setSpecialValueText("제한 없음")
+        self.bandwidth_spin.setValue(bandwidth_limit_kbps)
+        layout.addRow("대역폭 제한:", self.bandwidth_spin)
+
+        self.cache_spin = QtWidgets.QSpinBox()
+        self.cache_spin.setRange(0, 1024)
+        self.cache_spin.setSuffix(" GB")
+        self.cache_spin.setSpecialValueText("사용 안 함")
+        self.cache_spin.setValue(cache_limit_gb)
+        layout.addRow("분할 영상 캐시 용량:", self.cache_spin)
+
+        self.postprocess_spin = QtWidgets.QSpinBox()
+        self.postprocess_spin.setRange(0, 16)
+        self.postprocess_spin.setSpecialValueText("순차 처리")
+        self.postprocess_spin.setValue(postprocess_workers)
+        layout.addRow("병합/음성 추출 프로세스 수:", self.postprocess_spin)
+
+        self.video_budget_spin = QtWidgets.QSpinBox()
+        self.video_budget_spin.setRange(0, 100 * 1024)
+        self.video_budget_spin.setSuffix(" GB")
+        self.video_budget_spin.setSpecialValueText("제한 없음")
+        self.video_budget_spin.setValue(video_budget_gb)
+        self.video_budget_spin.setToolTip("넘으면 음성 파일이 남아 있는 강의의 mp4 를 오래 쓰지 않은 순서로 삭제합니다.")
+        layout.addRow("영상 원본(mp4) 보관 용량:", self.video_budget_spin)
+
+        button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        layout.addRow(button_box)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+
+    def get_values(self):
+        return (self.max_connections_spin.value(), self.per_host_spin.value(),
+                self.bandwidth_spin.value(), self.cache_spin.value(), self.postprocess_spin.value(),
+                self.video_budget_spin.value())
+
+
 class SchoolSelectionDialog(QtWidgets.QDialog):
     def __init__(self, parent=None, current_school_name="", current_school_code="", current_school_domain=""):
         super().__init__(parent)
@@ -985,7 +1254,7 @@ class SchoolSelectionDialog(QtWidgets.QDialog):
 
     def load_schools(self):
         try:
-            response = requests.get(SCHOOLS_URL, timeout=10)
+            response = default_client().get(SCHOOLS_URL, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 self.schools = data.get("schools", [])
@@ -1061,7 +1330,7 @@ class WeatherEffectWidget(QtWidgets.QWidget):
         month = now.month
         try:
             url = "http://wttr.in/%EC%84%B1%EB%82%A8%EC%8B%9C?format=j1"
-            response = requests.get(url, timeout=5)
+            response = default_client().get(url, timeout=5)
             data = response.json()
             desc = data["current_condition"][0]["weatherDesc"][0]["value"]
             desc_lower = desc.lower()
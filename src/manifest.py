@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+다운로드 매니페스트 (다운로드 폴더의 SQLite DB)
+- (학교, eclassRoom, 주차, 강의 제목) 별로 분할 영상 URL/크기/재생 시간/해시와 최종 결과물 경로를 기록
+- 다음 실행에서 결과물이 그대로 남아 있는 강의는 브라우저를 건드리기 전에 건너뜀
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+MANIFEST_FILE_NAME = ".download_manifest.sqlite"
+
+STATUS_IN_PROGRESS = "in_progress"
+STATUS_COMPLETE = "complete"
+STATUS_FAILED = "failed"
+
+
+def output_record(path: str):
+    """
+    결과물 경로 -> 검증용 기록 (크기, 수정 시각)
+    """
+    stat = os.stat(path)
+    return {"path": path, "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def output_is_valid(record: dict):
+    """
+    기록한 결과물이 그대로 남아 있는지 (존재 + 크기 일치)
+    """
+    path = record.get("path")
+    if not path or not os.path.exists(path):
+        return False
+    size = os.path.getsize(path)
+    return size > 0 and size == record.get("size")
+
+
+class DownloadManifest:
+    """
+    path: SQLite 파일 경로
+    lecture key: (school, eclass_room, week, title) 튜플
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS lectures ("
+                " school TEXT NOT NULL, eclass_room TEXT NOT NULL, week INTEGER NOT NULL, title TEXT NOT NULL,"
+                " status TEXT NOT NULL, duration REAL, outputs TEXT, updated_at REAL NOT NULL,"
+                " PRIMARY KEY (school, eclass_room, week, title))"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS segments ("
+                " school TEXT NOT NULL, eclass_room TEXT NOT NULL, week INTEGER NOT NULL, title TEXT NOT NULL,"
+                " idx INTEGER NOT NULL, url TEXT, size INTEGER, duration REAL, sha256 TEXT, path TEXT,"
+                " PRIMARY KEY (school, eclass_room, week, title, idx))"
+            )
+
+    @classmethod
+    def in_directory(cls, download_dir: str):
+        return cls(os.path.join(download_dir, MANIFEST_FILE_NAME))
+
+    # ------------------------------------------------------------------
+    # 기록
+    # ------------------------------------------------------------------
+    def begin_lecture(self, key):
+        """
+        강의 다운로드 시작: 이전 분할 기록을 지우고 진행 중으로 표시
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM segments WHERE school = ? AND eclass_room = ? AND week = ? AND title = ?", key
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO lectures (school, eclass_room, week, title, status, duration, outputs, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, NULL, NULL, ?)",
+                (*key, STATUS_IN_PROGRESS, time.time())
+            )
+
+    def record_segment(self, key, idx: int, url: str, size: int, duration: float, sha256: str, path: str):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO segments (school, eclass_room, week, title, idx, url, size, duration, sha256, path)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (*key, idx, url, size, duration, sha256, path)
+            )
+
+    def complete_lecture(self, key, outputs: dict, duration=None, audio_stats=None):
+        """
+        outputs: {"video": 경로, "audio": 경로} (없는 항목은 생략)
+        audio_stats: 음성 결과물 기록에 덧붙일 정보 (예: {"profile": "speech-small", "encode_sec": 12.3})
+        """
+        records = {kind: output_record(path) for kind, path in outputs.items() if path and os.path.exists(path)}
+        if audio_stats and "audio" in records:
+            records["audio"].update(audio_stats)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO lectures (school, eclass_room, week, title, status, duration, outputs, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (*key, STATUS_COMPLETE, duration, json.dumps(records, ensure_ascii=False), time.time())
+            )
+
+    def drop_output(self, key, kind: str):
+        """
+        완료 기록에서 결과물 하나를 뺌 (예: 용량 관리로 영상 원본을 지운 경우)
+        """
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT outputs FROM lectures WHERE school = ? AND eclass_room = ? AND week = ? AND title = ?", key
+            ).fetchone()
+            if not row or not row[0]:
+                return
+            records = json.loads(row[0])
+            if records.pop(kind, None) is None:
+                return
+            self._db.execute(
+                "UPDATE lectures SET outputs = ?"
+                " WHERE school = ? AND eclass_room = ? AND week = ? AND title = ?",
+                (json.dumps(records, ensure_ascii=False), *key)
+            )
+
+    def fail_lecture(self, key):
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE lectures SET status = ?, updated_at = ?"
+                " WHERE school = ? AND eclass_room = ? AND week = ? AND title = ?",
+                (STATUS_FAILED, time.time(), *key)
+            )
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def status(self, key):
+        """
+        강의 상태 (STATUS_*). 기록이 없으면 None
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status FROM lectures WHERE school = ? AND eclass_room = ? AND week = ? AND title = ?", key
+            ).fetchone()
+        return row[0] if row else None
+
+    def outputs(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, outputs FROM lectures"
+                " WHERE school = ? AND eclass_room = ? AND week = ? AND title = ?", key
+            ).fetchone()
+        if not row or row[0] != STATUS_COMPLETE or not row[1]:
+            return None
+        return json.loads(row[1])
+
+    def completed_outputs(self):
+        """
+        완료한 모든 강의의 [(key, outputs)]
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT school, eclass_room, week, title, outputs FROM lectures WHERE status = ? AND outputs IS NOT NULL",
+                (STATUS_COMPLETE,)
+            ).fetchall()
+        return [((r[0], r[1], r[2], r[3]), json.loads(r[4])) for r in rows]
+
+    def is_complete(self, key, required=("audio",)):
+        """
+        완료 기록이 있고 required 결과물이 모두 그대로 남아 있으면 True
+        """
+        outputs = self.outputs(key)
+        if not outputs:
+            return False
+        return all(kind in outputs and output_is_valid(outputs[kind]) for kind in required)
+
+    def segments(self, key):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT idx, url, size, duration, sha256, path FROM segments"
+                " WHERE school = ? AND eclass_room = ? AND week = ? AND title = ? ORDER BY idx", key
+            ).fetchall()
+        return [
+            {"idx": r[0], "url": r[1], "size": r[2], "duration": r[3], "sha256": r[4], "path": r[5]}
+            for r in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+분할 mp4 무손실 병합
+- 모든 분할의 코덱 파라미터(코덱/프로파일/픽셀 형식/해상도, 음성 샘플레이트/채널)가 같으면
+  ffmpeg concat demuxer 로 컨테이너 수준에서 이어 붙임 (-c copy, 디코딩/재인코딩 없음)
+- 파라미터가 다르면 재인코딩 병합 (transcode_concat): 분할마다 ffmpeg 하나씩 순서대로 같은 파라미터로
+  정규화한 뒤 이어 붙이므로, 분할 수와 관계없이 동시에 열린 디코더/프로세스는 하나뿐
+"""
+import os
+import re
+import shutil
+
+from ffmpeg_util import run_ffmpeg
+from mp4box import check_structure
+
+_STREAM_RE = re.compile(r"Stream #\d+:\d+[^:]*: (Video|Audio): (.*)")
+_RESOLUTION_RE = re.compile(r"\b(\d{2,5})x(\d{2,5})\b")
+_FPS_RE = re.compile(r"([\d.]+) fps")
+
+# 재인코딩 병합 시 모든 분할을 맞출 코덱 파라미터
+NORMALIZE_VIDEO_ARGS = ["-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-pix_fmt", "yuv420p"]
+NORMALIZE_AUDIO_ARGS = ["-c:a", "aac", "-b:a", "128k", "-ar", "44100", "-ac", "2"]
+
+
+def _split_fields(text: str):
+    """
+    ffmpeg 스트림 설명을 괄호 안 쉼표는 무시하고 ', ' 로 분리
+    """
+    fields, depth, current = [], 0, ""
+    for ch in text:
+        if ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        if ch == "," and depth == 0:
+            fields.append(current.strip())
+            current = ""
+        else:
+            current += ch
+    if current.strip():
+        fields.append(current.strip())
+    return fields
+
+
+def _codec(field: str):
+    """
+    'h264 (High) (avc1 / 0x31637661)' -> ('h264', 'High')
+    """
+    name = field.split(" ", 1)[0]
+    profile = ""
+    for part in re.findall(r"\(([^)]*)\)", field):
+        if "/" not in part:
+            profile = part
+            break
+    return name, profile
+
+
+def parse_stream_info(stderr: str):
+    """
+    'ffmpeg -i' 출력 -> 스트림별 코덱 파라미터 튜플 목록
+    """
+    streams = []
+    for kind, description in _STREAM_RE.findall(stderr):
+        fields = _split_fields(description)
+        codec, profile = _codec(fields[0])
+        if kind == "Video":
+            pix_fmt = fields[1].split("(", 1)[0] if len(fields) > 1 else ""
+            m = _RESOLUTION_RE.search(description)
+            resolution = f"{m.group(1)}x{m.group(2)}" if m else ""
+            streams.append(("video", codec, profile, pix_fmt, resolution))
+        else:
+            sample_rate = fields[1] if len(fields) > 1 else ""
+            channels = fields[2] if len(fields) > 2 else ""
+            streams.append(("audio", codec, profile, sample_rate, channels))
+    return streams
+
+
+def probe_streams(path: str):
+    """
+    파일의 스트림 코덱 파라미터 (출력 파일 없이 'ffmpeg -i' 의 stderr 를 해석)
+    """
+    _code, stderr = run_ffmpeg(["-i", path], check=False)
+    return parse_stream_info(stderr)
+
+
+def video_format(path: str):
+    """
+    첫 번째 영상 스트림의 (가로, 세로, 프레임레이트 문자열 또는 None). 영상이 없으면 None
+    """
+    _code, stderr = run_ffmpeg(["-i", path], check=False)
+    for kind, description in _STREAM_RE.findall(stderr):
+        if kind != "Video":
+            continue
+        m = _RESOLUTION_RE.search(description)
+        if not m:
+            return None
+        fps = _FPS_RE.search(description)
+        return int(m.group(1)), int(m.group(2)), fps.group(1) if fps else None
+    return None
+
+
+def incompatible_reason(paths):
+    """
+    stream copy 로 이어 붙일 수 없는 이유 (모두 같은 파라미터면 None)
+    """
+    first = probe_streams(paths[0])
+    if not first:
+        return f"스트림 정보를 읽지 못함: {os.path.basename(paths[0])}"
+    for path in paths[1:]:
+        streams = probe_streams(path)
+        if streams != first:
+            return f"코덱 파라미터 불일치: {os.path.basename(path)} {streams} != {first}"
+    return None
+
+
+def _concat_line(path: str):
+    # concat 목록 파일 문법: 작은따옴표는 '\'' 로 이스케이프
+    return "file '" + os.path.abspath(path).replace("'", "'\\''") + "'\n"
+
+
+def concat_copy(paths, output: str, container="mp4"):
+    """
+    paths 를 순서대로 재인코딩 없이 이어 붙여 output 생성
+    container: 출력 형식 ("mp4" 는 m4a 음성에도 사용, "mp3")
+    """
+    list_path = output + ".concat.txt"
+    part_path = output + ".part"
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.writelines(_concat_line(path) for path in paths)
+    try:
+        run_ffmpeg([
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-map", "0:v?", "-map", "0:a?", "-c", "copy",
+        ] + (["-movflags", "+faststart"] if container == "mp4" else []) + ["-f", container, part_path])
+        if container == "mp4":
+            check_structure(part_path)
+        os.replace(part_path, output)
+    finally:
+        for path in (list_path, part_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def transcode_concat(paths, output: str, on_part=None):
+    """
+    코덱 파라미터가 다른 분할들을 재인코딩해 output(mp4) 생성
+    1) 분할을 하나씩 첫 분할의 해상도/프레임레이트와 NORMALIZE_*_ARGS 로 정규화 (임시 폴더, ffmpeg 1개씩 순서대로)
+    2) 정규화된 분할을 concat_copy 로 이어 붙임
+    on_part(완료한 분할 수, 전체 분할 수): 진행률 보고용
+    """
+    target_format = video_format(paths[0])
+    if target_format is None:
+        raise ValueError(f"영상 스트림 정보를 읽지 못함: {os.path.basename(paths[0])}")
+    width, height, fps = target_format
+    # 해상도가 다른 분할은 비율을 유지해 축소 후 여백으로 채움
+    video_filter = (f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                    f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1")
+    work_dir = output + ".normalized"
+    os.makedirs(work_dir, exist_ok=True)
+    try:
+        normalized = []
+        for index, path in enumerate(paths, 1):
+            target = os.path.join(work_dir, f"{index:04d}.mp4")
+            has_audio = any(stream[0] == "audio" for stream in probe_streams(path))
+            args = ["-i", path]
+            if not has_audio:
+                # 음성 없는 분할은 무음으로 채워 모든 분할의 스트림 구성을 맞춤
+                args += ["-f", "lavfi", "-i", "anullsrc=channel_layout=stereo:sample_rate=44100", "-shortest"]
+            args += ["-map", "0:v:0", "-map", "0:a:0" if has_audio else "1:a:0", "-vf", video_filter]
+            if fps:
+                args += ["-r", fps]
+            run_ffmpeg(args + NORMALIZE_VIDEO_ARGS + NORMALIZE_AUDIO_ARGS
+                       + ["-movflags", "+faststart", "-f", "mp4", target])
+            normalized.append(target)
+            if on_part:
+                on_part(index, len(paths))
+        concat_copy(normalized, output)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+MP4(ISO BMFF) 박스 구조 확인
+- 파일 전체를 디코딩하지 않고 최상위 박스 헤더(크기 + 종류)만 읽어
+  ftyp / moov / mdat 이 있는지, 박스 크기가 파일 크기와 맞는지(잘린 파일이 아닌지) 확인
+- moov 박스만 읽어 재생 시간 계산 (mvhd, 없으면 mehd / 트랙별 mdhd)
+"""
+import io
+import os
+import struct
+
+# 반드시 있어야 하는 최상위 박스
+REQUIRED_BOXES = ("ftyp", "moov", "mdat")
+
+
+class Mp4StructureError(ValueError):
+    """
+    박스 구조가 깨진 (잘렸거나 mp4 가 아닌) 파일
+    """
+
+
+def iter_boxes(f, start: int, end: int):
+    """
+    f 의 [start, end) 구간에 있는 박스를 (종류, 시작 위치, 전체 크기, 헤더 크기) 로 차례로 반환
+    """
+    offset = start
+    while offset < end:
+        if end - offset < 8:
+            raise Mp4StructureError(f"박스 헤더가 잘림 (위치 {offset}, 남은 {end - offset} bytes)")
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            raise Mp4StructureError(f"박스 헤더를 읽을 수 없음 (위치 {offset})")
+        size, box_type = struct.unpack(">I4s", header)
+        box_type = box_type.decode("latin-1")
+        header_size = 8
+        if size == 1:
+            # 64bit 크기
+            large = f.read(8)
+            if len(large) < 8:
+                raise Mp4StructureError(f"{box_type} 박스의 64bit 크기가 잘림 (위치 {offset})")
+            size = struct.unpack(">Q", large)[0]
+            header_size = 16
+        elif size == 0:
+            # 파일 끝까지
+            size = end - offset
+        if size < header_size:
+            raise Mp4StructureError(f"{box_type} 박스 크기가 잘못됨 ({size} bytes, 위치 {offset})")
+        if offset + size > end:
+            raise Mp4StructureError(
+                f"{box_type} 박스가 파일 끝을 넘음 ({offset + size - end} bytes 부족, 잘린 파일)"
+            )
+        yield box_type, offset, size, header_size
+        offset += size
+
+
+def check_structure(path: str):
+    """
+    최상위 박스 구조 확인. 정상이면 최상위 박스 종류 목록 반환, 아니면 Mp4StructureError 발생
+    """
+    file_size = os.path.getsize(path)
+    if file_size == 0:
+        raise Mp4StructureError("빈 파일")
+    with open(path, "rb") as f:
+        boxes = []
+        for box_type, _offset, size, header_size in iter_boxes(f, 0, file_size):
+            if box_type == "mdat" and size == header_size:
+                raise Mp4StructureError("mdat 박스에 데이터가 없음")
+            boxes.append(box_type)
+    if not boxes or boxes[0] != "ftyp":
+        raise Mp4StructureError(f"첫 박스가 ftyp 가 아님 ({boxes[0] if boxes else '없음'})")
+    missing = [name for name in REQUIRED_BOXES if name not in boxes]
+    if missing:
+        raise Mp4StructureError(f"필수 박스 없음: {', '.join(missing)}")
+    return boxes
+
+
+def _find(f, start: int, end: int, box_type: str):
+    """
+    [start, end) 구간에서 box_type 박스의 (내용 시작, 내용 끝) 반환 (없으면 None)
+    """
+    for found, offset, size, header_size in iter_boxes(f, start, end):
+        if found == box_type:
+            return offset + header_size, offset + size
+    return None
+
+
+def _full_box_duration(data: bytes):
+    """
+    mvhd / mdhd 내용 -> (timescale, duration)
+    version 0: 생성/수정 시각 4바이트씩, version 1: 8바이트씩
+    """
+    version = data[0]
+    if version == 1:
+        timescale, duration = struct.unpack(">IQ", data[20:32])
+    else:
+        timescale, duration = struct.unpack(">II", data[12:20])
+    return timescale, duration
+
+
+def _read(f, span):
+    f.seek(span[0])
+    return f.read(span[1] - span[0])
+
+
+def read_duration_us(path: str):
+    """
+    moov 박스만 읽어 재생 시간(마이크로초) 반환. 해석할 수 없으면 Mp4StructureError 발생
+    """
+    try:
+        return _read_duration_us(path)
+    except struct.error as e:
+        raise Mp4StructureError(f"박스 내용이 잘림: {e}")
+
+
+def _read_duration_us(path: str):
+    """
+    mvhd 의 duration 이 0 이면(조각난 mp4 등) mvex/mehd, 그래도 없으면 트랙별 mdhd 중 가장 긴 값 사용
+    """
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        span = _find(f, 0, file_size, "moov")
+        if span is None:
+            raise Mp4StructureError("moov 박스 없음")
+        # moov 는 보통 수십 KB~수 MB 라 한 번에 읽어 메모리에서 해석
+        moov = io.BytesIO(_read(f, span))
+    end = span[1] - span[0]
+
+    mvhd = _find(moov, 0, end, "mvhd")
+    if mvhd is None:
+        raise Mp4StructureError("mvhd 박스 없음")
+    timescale, duration = _full_box_duration(_read(moov, mvhd))
+
+    if duration == 0 or duration in (0xFFFFFFFF, 0xFFFFFFFFFFFFFFFF):
+        duration = 0
+        mvex = _find(moov, 0, end, "mvex")
+        mehd = _find(moov, mvex[0], mvex[1], "mehd") if mvex else None
+        if mehd:
+            data = _read(moov, mehd)
+            duration = struct.unpack(">Q", data[4:12])[0] if data[0] == 1 else struct.unpack(">I", data[4:8])[0]
+
+    if duration == 0:
+        # 트랙별 mdhd (트랙 timescale 기준) 중 가장 긴 값
+        best = 0.0
+        for box_type, offset, size, header_size in iter_boxes(moov, 0, end):
+            if box_type != "trak":
+                continue
+            mdia = _find(moov, offset + header_size, offset + size, "mdia")
+            mdhd = _find(moov, mdia[0], mdia[1], "mdhd") if mdia else None
+            if mdhd:
+                track_scale, track_duration = _full_box_duration(_read(moov, mdhd))
+                if track_scale:
+                    best = max(best, track_duration / track_scale)
+                continue
+            # mdhd 가 없으면 tkhd (movie timescale 기준)
+            tkhd = _find(moov, offset + header_size, offset + size, "tkhd")
+            if tkhd and timescale:
+                data = _read(moov, tkhd)
+                track_duration = struct.unpack(">Q", data[28:36])[0] if data[0] == 1 \
+                    else struct.unpack(">I", data[20:24])[0]
+                best = max(best, track_duration / timescale)
+        if best <= 0:
+            raise Mp4StructureError("재생 시간 정보 없음")
+        return int(round(best * 1000000))
+
+    if not timescale:
+        raise Mp4StructureError("mvhd timescale 이 0")
+    return duration * 1000000 // timescale
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+과목/주차 페이지 이동 상태 관리
+- 브라우저가 지금 어느 과목의 주차 페이지(또는 동영상 페이지)에 있는지 기억
+- 강의마다 과목 목록부터 다시 로드하지 않고, 현재 페이지를 그대로 쓰거나 뒤로 가기로 주차 페이지에 복귀
+- 기록한 상태와 실제 페이지가 다르거나 재사용에 실패하면 그때만 처음부터 다시 로드
+"""
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+from page_wait import document_ready, onclick_present, script_function_ready
+
+PAGE_WEEKS = "weeks"    # 과목의 주차 메뉴 페이지
+PAGE_VIEWER = "viewer"  # 동영상 재생 페이지 (online_view_form)
+
+# 이동 방식 -> 로그 표시용
+METHOD_LABELS = {
+    "current": "현재 페이지 재사용",
+    "back": "뒤로 가기",
+    "reload": "다시 로드",
+}
+
+WEEKS_XPATH = '//div[@id="chart"]//div[contains(@class, "wb-week")]'
+
+
+def week_xpath(week_num):
+    return f'//div[@id="chart"]//span[contains(@class, "wb-week") and normalize-space(text())="{week_num}주"]'
+
+
+def weeks_loaded(driver):
+    """
+    주차 메뉴 페이지 로딩이 끝나고 주차 목록이 있으면 주차 요소 목록
+    """
+    return document_ready(driver) and driver.find_elements(By.XPATH, WEEKS_XPATH)
+
+
+class CourseNavigator:
+    """
+    driver: Selenium WebDriver
+    waiter: 단계별 대기에 사용할 PageWaiter
+    school_domain: 학교 도메인
+    log: 로그 출력 함수
+    on_page_load: 새 문서가 열릴 때마다 호출 (오버레이 삽입)
+    """
+
+    def __init__(self, driver, waiter, school_domain: str, log, on_page_load=None):
+        self.driver = driver
+        self.waiter = waiter
+        self.school_domain = school_domain
+        self.log = log
+        self.on_page_load = on_page_load or (lambda: None)
+        self.course_list_url = f"https://{school_domain}/ilos/mp/course_register_list_form.acl"
+        self.viewer_url = f"https://{school_domain}/ilos/st/course/online_view_form.acl"
+        # 이동 방식별 횟수 (현재 페이지 / 뒤로 가기 / 다시 로드)
+        self.counts = {"current": 0, "back": 0, "reload": 0}
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        현재 페이지를 알 수 없음 (다른 곳으로 이동했거나 이동 중 오류)
+        """
+        self.page = None
+        self.course = None
+        self.week = None
+        self.weeks_url = None
+
+    def _current_url(self):
+        try:
+            return self.driver.current_url
+        except WebDriverException:
+            return None
+
+    def _reuse(self, course: str):
+        """
+        같은 과목의 주차 페이지를 새로 로드하지 않고 쓸 수 있으면 방식("current", "back"), 아니면 None
+        """
+        if self.page is None or self.course != course:
+            return None
+        if self.page == PAGE_VIEWER:
+            if self._current_url() != self.viewer_url:
+                return None
+            self.driver.back()
+            if not self.waiter.until("back", weeks_loaded, required=False) or self._current_url() != self.weeks_url:
+                return None
+            self.on_page_load()
+            # 뒤로 가기 후 어느 주차가 표시되는지는 페이지에 따라 다름
+            self.page, self.week = PAGE_WEEKS, None
+            return "back"
+        if self._current_url() != self.weeks_url or not weeks_loaded(self.driver):
+            return None
+        return "current"
+
+    def _reload(self, course: str):
+        """
+        과목 목록 -> eclassRoom() -> 주차 메뉴 순서로 처음부터 이동. 주차 요소 목록 반환
+        """
+        self.invalidate()
+        self.driver.get(self.course_list_url)
+        self.on_page_load()
+        self.waiter.until("page", script_function_ready("eclassRoom"))
+        self.driver.execute_script(f"eclassRoom('{course}');")
+        self.on_page_load()
+        self.waiter.until("course_menu", EC.element_to_be_clickable((By.ID, "menu_lecture_weeks"))).click()
+        week_elements = self.waiter.until("weeks_menu", weeks_loaded)
+        self.on_page_load()
+        self.page, self.course, self.weeks_url = PAGE_WEEKS, course, self._current_url()
+        return week_elements
+
+    def _open(self, course: str):
+        method = None
+        try:
+            method = self._reuse(course)
+        except (TimeoutException, WebDriverException) as e:
+            self.log(f"[이동] 현재 페이지를 쓸 수 없습니다: {str(e)}")
+        if method:
+            self.counts[method] += 1
+            return method, self.driver.find_elements(By.XPATH, WEEKS_XPATH)
+        self.counts["reload"] += 1
+        return "reload", self._reload(course)
+
+    def open_weeks(self, course: str):
+        """
+        course(eclassRoom 키) 과목의 주차 메뉴 페이지로 이동. 주차 요소 목록 반환
+        """
+        return self._open(course)[1]
+
+    def _show_week(self, week_num, script: str):
+        # 해당 강의가 이미 목록에 있으면 주차를 다시 누르지 않음
+        if not onclick_present(script)(self.driver):
+            self.waiter.until("weeks_menu", EC.element_to_be_clickable((By.XPATH, week_xpath(week_num)))).click()
+            self.waiter.until("week", onclick_present(script))
+        self.week = week_num
+
+    def open_lecture_list(self, course: str, week_num, script: str):
+        """
+        course 과목 week_num 주차의 강의 목록을 표시해 script(viewGo) 를 실행할 수 있게 함
+        현재 페이지 재사용이 실패하면 한 번 처음부터 다시 로드
+        """
+        method, _ = self._open(course)
+        try:
+            self._show_week(week_num, script)
+        except (TimeoutException, WebDriverException) as e:
+            if method == "reload":
+                self.invalidate()
+                raise
+            self.log(f"[이동] 기존 페이지에서 {week_num}주를 열지 못해 다시 로드합니다: {str(e)}")
+            self.counts["reload"] += 1
+            method = "reload"
+            self._reload(course)
+            self._show_week(week_num, script)
+        self.log(f"[이동] {week_num}주 강의 목록: {METHOD_LABELS[method]}")
+
+    def lecture_started(self):
+        """
+        강의 스크립트 실행 직후 (동영상 페이지로 이동 중)
+        """
+        self.page = None
+
+    def viewer_opened(self):
+        """
+        동영상 재생 페이지에 도착 (주차 페이지에서 뒤로 가기로 돌아갈 수 있음)
+        """
+        self.page = PAGE_VIEWER
+
+    def log_stats(self):
+        total = sum(self.counts.values())
+        if total:
+            self.log(
+                f"[이동 통계] 강의 목록 이동 {total}회: "
+                + ", ".join(f"{METHOD_LABELS[method]} {count}회" for method, count in self.counts.items())
+            )
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Chrome DevTools(CDP) 네트워크 이벤트로 플레이어의 미디어 요청 수집
+- goog:loggingPrefs 의 performance 로그로 Network.requestWillBeSent / responseReceived 이벤트를 받음
+- 플레이어가 분할 mp4(또는 HLS/DASH 매니페스트)를 요청하는 순간 URL 과 요청 헤더를 기록하므로
+  video.src 를 주기적으로 읽거나 iframe 을 오갈 필요가 없음 (iframe 은 재생 조작에만 사용)
+- 탭 안의 모든 프레임 요청이 한 로그에 모임
+- 인트로 영상 요청은 기록하지 않고, <video> src 를 알면 그 호스트의 미디어 요청만 분할 영상으로 봄
+  (광고/미리보기 등 다른 곳의 영상 요청을 받지 않도록)
+"""
+import json
+import time
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import WebDriverException
+
+from adaptive_stream import is_manifest_url
+
+MEDIA_MIME_PREFIXES = ("video/", "audio/")
+MEDIA_EXTENSIONS = (".mp4", ".m4v", ".webm")
+# 다운로드 요청에 그대로 옮겨 쓸 헤더 (쿠키/User-Agent 는 sync_http_session 에서 복사)
+FORWARD_HEADERS = ("Referer", "Origin")
+
+KIND_MEDIA = "media"
+KIND_MANIFEST = "manifest"
+
+
+def enable_performance_log(options):
+    """
+    Chrome Options 에 네트워크 이벤트만 담는 performance 로그 설정 추가
+    """
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+
+def _is_media_url(url: str):
+    return urlparse(url).path.lower().endswith(MEDIA_EXTENSIONS)
+
+
+def _media_key(url: str):
+    """
+    같은 미디어인지 비교할 키 (호스트 + 경로, 쿼리/프래그먼트 무시)
+    """
+    parsed = urlparse(url)
+    return parsed.netloc.lower() + parsed.path
+
+
+class MediaRequest:
+    """
+    URL 하나에 대한 첫 요청 기록 (같은 URL 의 Range 요청은 하나로 묶음)
+    """
+
+    def __init__(self, url: str, kind: str, headers: dict, resource_type: str):
+        self.url = url
+        self.kind = kind
+        self.headers = dict(headers or {})
+        self.resource_type = resource_type
+        self.requested_at = time.time()
+        self.requests = 1
+        self.mime_type = ""
+
+    def forward_headers(self):
+        """
+        다운로드에 옮겨 쓸 헤더 {이름: 값} (대소문자 무시)
+        """
+        lowered = {name.lower(): value for name, value in self.headers.items()}
+        return {name: lowered[name.lower()] for name in FORWARD_HEADERS if name.lower() in lowered}
+
+
+class NetworkCapture:
+    """
+    driver: enable_performance_log 를 적용해 만든 Chrome WebDriver
+    log: 로그 출력 함수
+    ignore_urls: 기록하지 않을 미디어 주소 (인트로 영상 등, 쿼리는 무시하고 비교)
+    """
+
+    def __init__(self, driver, log, ignore_urls=()):
+        self.driver = driver
+        self.log = log
+        self.enabled = False
+        self._ignored = {_media_key(url) for url in ignore_urls}
+        # 플레이어 <video> src 의 호스트 (알게 되면 이 호스트의 미디어 요청만 분할 영상으로 봄)
+        self.media_host = None
+        # URL -> MediaRequest (요청 순서 유지)
+        self.requests = {}
+        # CDP requestId -> URL (추가 헤더 / 응답 이벤트 연결용)
+        self._ids = {}
+
+    def start(self):
+        """
+        Network 도메인 활성화. 실패하면(다른 브라우저 등) False
+        """
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.get_log("performance")
+            self.enabled = True
+        except (WebDriverException, AttributeError, ValueError) as e:
+            self.log(f"네트워크 캡처를 사용할 수 없어 video.src 확인으로 진행: {str(e)}")
+            self.enabled = False
+        return self.enabled
+
+    def reset(self):
+        """
+        쌓인 이벤트를 버리고 기록 초기화 (강의마다 호출)
+        """
+        self.poll()
+        self.requests.clear()
+        self._ids.clear()
+        self.media_host = None
+
+    def set_player_src(self, src: str):
+        """
+        플레이어 <video> 의 src 로 본 영상 호스트 지정 (blob: 등 http 주소가 아니거나 인트로면 무시)
+        """
+        parsed = urlparse(src or "")
+        if parsed.scheme in ("http", "https") and _media_key(src) not in self._ignored:
+            self.media_host = parsed.netloc.lower()
+
+    def _add(self, request_id, url, kind, headers, resource_type):
+        if _media_key(url) in self._ignored:
+            return
+        self._ids[request_id] = url
+        record = self.requests.get(url)
+        if record:
+            record.requests += 1
+            return
+        self.requests[url] = MediaRequest(url, kind, headers, resource_type)
+
+    def _handle(self, method, params):
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            request = params.get("request", {})
+            url = request.get("url", "")
+            resource_type = params.get("type", "")
+            if is_manifest_url(url):
+                self._add(request_id, url, KIND_MANIFEST, request.get("headers"), resource_type)
+            elif resource_type == "Media" or _is_media_url(url):
+                self._add(request_id, url, KIND_MEDIA, request.get("headers"), resource_type)
+        elif method == "Network.requestWillBeSentExtraInfo":
+            # 실제로 보낸 헤더 (Referer 등이 requestWillBeSent 보다 정확)
+            url = self._ids.get(request_id)
+            if url in self.requests:
+                self.requests[url].headers.update(params.get("headers", {}))
+        elif method == "Network.responseReceived":
+            response = params.get("response", {})
+            url = response.get("url", "")
+            mime_type = response.get("mimeType", "")
+            if url not in self.requests and mime_type.startswith(MEDIA_MIME_PREFIXES):
+                # XHR/fetch 로 받은 미디어
+                self._add(request_id, url, KIND_MEDIA, response.get("requestHeaders"), params.get("type", ""))
+            if url in self.requests:
+                self.requests[url].mime_type = mime_type
+
+    def poll(self):
+        """
+        쌓인 performance 로그를 읽어 미디어 요청 기록. 새로 기록한 URL 수 반환
+        """
+        if not self.enabled:
+            return 0
+        before = len(self.requests)
+        try:
+            entries = self.driver.get_log("performance")
+        except WebDriverException as e:
+            self.log(f"네트워크 로그 읽기 오류: {str(e)}")
+            return 0
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            self._handle(message.get("method", ""), message.get("params", {}))
+        return len(self.requests) - before
+
+    def next_request(self, seen=(), exclude=()):
+        """
+        대기 조건: 아직 받지 않은(seen/exclude 에 없는) 첫 미디어 요청. 매니페스트가 있으면 우선
+        media_host 를 알면 다른 호스트의 미디어 요청은 건너뜀. 없으면 False
+        """
+        seen = set(seen)
+        excluded = {_media_key(url) for url in exclude if url}
+
+        def from_player(record):
+            return record.kind == KIND_MANIFEST or self.media_host is None \
+                or urlparse(record.url).netloc.lower() == self.media_host
+
+        def condition(driver):
+            self.poll()
+            pending = [
+                r for r in self.requests.values()
+                if r.url not in seen and _media_key(r.url) not in excluded and from_player(r)
+            ]
+            for record in pending:
+                if record.kind == KIND_MANIFEST:
+                    return record
+            return pending[0] if pending else False
+        return condition
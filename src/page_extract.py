@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+과목/주차/강의 목록 일괄 추출
+- 요소마다 find_element / .text / get_attribute 를 부르면 호출 하나가 WebDriver HTTP 왕복 하나
+- 페이지에 스크립트 하나를 넣어 목록 전체를 JSON(딕셔너리 목록)으로 한 번에 받아옴
+- eclassRoom('...') / viewGo(...) 해석은 기존처럼 Python 정규식으로 처리 (downloader)
+"""
+
+_SUBJECTS_JS = """
+return Array.prototype.map.call(document.getElementsByClassName('content-container'), function (container) {
+    var title = container.getElementsByClassName('content-title')[0];
+    var link = container.getElementsByTagName('a')[0];
+    return {
+        title: title ? title.innerText.trim() : null,
+        onclick: link ? link.getAttribute('onclick') : null
+    };
+});
+"""
+
+_ELEMENTS_JS = """
+return Array.prototype.map.call(arguments[0], function (e) {
+    return {cls: e.getAttribute('class') || '', text: e.innerText.trim()};
+});
+"""
+
+_LECTURE_BUTTONS_JS = """
+return Array.prototype.map.call(document.querySelectorAll("[onclick*='viewGo(']"), function (e) {
+    return {onclick: e.getAttribute('onclick'), text: e.innerText.trim()};
+});
+"""
+
+
+def read_subjects(driver):
+    """
+    과목 목록(.content-container)의 [{"title", "onclick"}] (제목이나 링크가 없는 항목은 제외)
+    """
+    return [
+        item for item in driver.execute_script(_SUBJECTS_JS) or []
+        if item["title"] is not None and item["onclick"] is not None
+    ]
+
+
+def read_elements(driver, elements):
+    """
+    이미 찾은 요소들의 [{"cls", "text"}] (요소 순서 유지)
+    """
+    if not elements:
+        return []
+    return driver.execute_script(_ELEMENTS_JS, elements) or []
+
+
+def read_lecture_buttons(driver):
+    """
+    현재 표시된 학습하기 버튼(onclick 에 viewGo( 포함)의 [{"onclick", "text"}]
+    """
+    return driver.execute_script(_LECTURE_BUTTONS_JS) or []
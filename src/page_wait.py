@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Selenium 페이지 대기
+- 고정 time.sleep 대신 조건(DOM 준비, 요소 상태, video.readyState, URL 변경)이 맞는 즉시 진행
+- 단계(step)마다 제한 시간을 따로 두고, 실제로 기다린 시간을 로그로 남김
+- 단계별 대기 횟수/평균/최대/시간 초과 통계를 모아 제한 시간 조정에 사용
+"""
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+# 단계 -> 제한 시간 (초)
+DEFAULT_WAIT_TIMEOUTS = {
+    "login_form": 10,     # 로그인 페이지 입력란 표시
+    "login": 10,          # 로그인 버튼 클릭 후 페이지 이동
+    "course_tab": 10,     # 수강 과목 목록의 정규 과목 탭 표시
+    "subjects": 10,       # 수강 과목 목록 표시
+    "page": 10,           # 과목 목록 페이지 스크립트 준비
+    "course_menu": 10,    # 과목 강의실 진입 후 주차 메뉴 버튼 표시
+    "back": 10,           # 동영상 페이지에서 뒤로 가기로 주차 페이지 복귀
+    "weeks_menu": 10,     # 주차 메뉴 클릭 후 주차 목록 표시
+    "week": 10,           # 주차 클릭 후 강의 목록 표시
+    "lecture_entry": 15,  # 강의 실행 후 동영상 페이지 진입 (alert / 본인인증 창 포함)
+    "frame": 10,          # 플레이어 iframe 준비
+    "player": 20,         # 동영상 요소 준비 (src + 메타데이터)
+    "intro": 15,          # 인트로 영상을 끝낸 뒤 본 영상으로 바뀔 때까지
+    "segment": 5,         # 다음 분할 영상 URL 로 바뀔 때까지 (넘으면 화살표 키로 탐색)
+}
+
+# 단계 -> 로그 표시용
+STEP_LABELS = {
+    "login_form": "로그인 화면",
+    "login": "로그인",
+    "course_tab": "정규 과목 탭",
+    "subjects": "수강 과목 목록",
+    "page": "과목 목록 페이지",
+    "course_menu": "강의실 메뉴",
+    "back": "뒤로 가기",
+    "weeks_menu": "주차 메뉴",
+    "week": "주차 강의 목록",
+    "lecture_entry": "동영상 페이지 진입",
+    "frame": "플레이어 iframe",
+    "player": "동영상 준비",
+    "intro": "인트로 종료",
+    "segment": "다음 분할 영상",
+}
+
+POLL_INTERVAL = 0.1
+# 내용이 바뀌지 않는 경우 AJAX 요청 없이 이만큼 유지되면 로딩이 끝난 것으로 봄 (초)
+QUIET_PERIOD = 0.3
+
+# HTMLMediaElement.readyState: HAVE_METADATA 이상이면 길이/해상도를 알 수 있음
+HAVE_METADATA = 1
+
+_PAGE_STATE_JS = """
+return [document.readyState, (window.jQuery && window.jQuery.active) || 0];
+"""
+
+_LECTURE_SIGNATURE_JS = """
+return Array.prototype.map.call(
+    document.querySelectorAll("[onclick*='viewGo(']"),
+    function(e) { return e.getAttribute('onclick'); }
+).join('\\n');
+"""
+
+_ONCLICK_PRESENT_JS = """
+var nodes = document.querySelectorAll('[onclick]');
+for (var i = 0; i < nodes.length; i++) {
+    if (nodes[i].getAttribute('onclick') === arguments[0]) return true;
+}
+return false;
+"""
+
+
+def document_ready(driver):
+    """
+    문서 로딩이 끝나고 진행 중인 jQuery AJAX 요청이 없음
+    """
+    ready_state, active = driver.execute_script(_PAGE_STATE_JS)
+    return ready_state == "complete" and not active
+
+
+def script_function_ready(name: str):
+    """
+    문서 로딩이 끝나고 페이지 스크립트의 전역 함수 name 이 정의됨
+    """
+    def condition(driver):
+        return document_ready(driver) and driver.execute_script(f"return typeof window.{name} === 'function';")
+    return condition
+
+
+def onclick_present(script: str):
+    """
+    onclick 속성이 script 와 같은 요소가 있음 (강의 목록에 해당 강의가 표시됨)
+    """
+    def condition(driver):
+        return driver.execute_script(_ONCLICK_PRESENT_JS, script)
+    return condition
+
+
+def lecture_signature(driver):
+    """
+    현재 표시된 강의 목록(viewGo onclick) 요약. 주차를 바꾼 뒤 목록이 바뀌었는지 비교하는 데 사용
+    """
+    return driver.execute_script(_LECTURE_SIGNATURE_JS)
+
+
+class lecture_list_loaded:
+    """
+    주차 클릭 후 강의 목록이 before 와 달라지고 AJAX 요청이 끝나면 완료
+    목록이 그대로인 주차(예: 강의 없음)는 AJAX 없이 QUIET_PERIOD 동안 유지되면 완료
+    """
+
+    def __init__(self, before: str, quiet=QUIET_PERIOD):
+        self.before = before
+        self.quiet = quiet
+        self._idle_since = None
+
+    def __call__(self, driver):
+        if not document_ready(driver):
+            self._idle_since = None
+            return False
+        if lecture_signature(driver) != self.before:
+            return True
+        now = time.monotonic()
+        if self._idle_since is None:
+            self._idle_since = now
+        return now - self._idle_since >= self.quiet
+
+
+def _find_videos(driver, xpaths):
+    for xpath in xpaths:
+        for element in driver.find_elements(By.XPATH, xpath):
+            yield element
+
+
+class video_ready:
+    """
+    xpaths 중 src 가 있고 메타데이터를 읽은(readyState >= HAVE_METADATA) video 요소
+    exclude_src 의 주소(인트로 등)나 previous_src 와 같은 주소는 제외. 찾으면 (요소, src) 반환
+    """
+
+    def __init__(self, xpaths, exclude_src=(), previous_src=None):
+        self.xpaths = xpaths
+        self.exclude_src = set(exclude_src)
+        self.previous_src = previous_src
+
+    def __call__(self, driver):
+        for element in _find_videos(driver, self.xpaths):
+            try:
+                src = element.get_attribute("src")
+                if not src or src in self.exclude_src or src == self.previous_src:
+                    continue
+                if int(element.get_attribute("readyState") or 0) >= HAVE_METADATA:
+                    return element, src
+            except WebDriverException:
+                # 플레이어가 요소를 바꾸는 중 (stale)
+                continue
+        return False
+
+
+class PageWaiter:
+    """
+    driver: Selenium WebDriver
+    log: 로그 출력 함수
+    timeouts: 단계별 제한 시간 (DEFAULT_WAIT_TIMEOUTS 중 바꿀 항목만)
+    """
+
+    def __init__(self, driver, log, timeouts=None, poll=POLL_INTERVAL):
+        self.driver = driver
+        self.log = log
+        self.poll = poll
+        self.timeouts = dict(DEFAULT_WAIT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+        # 단계 -> [횟수, 합계, 최대, 시간 초과 횟수]
+        self.stats = {}
+
+    def _record(self, step, elapsed, timed_out):
+        stats = self.stats.setdefault(step, [0, 0.0, 0.0, 0])
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] = max(stats[2], elapsed)
+        stats[3] += 1 if timed_out else 0
+
+    def until(self, step: str, condition, required=True, timeout=None):
+        """
+        condition(driver) 이 참이 될 때까지 대기하고 그 값을 반환
+        제한 시간을 넘으면 required=True 일 때 TimeoutException, 아니면 None
+        """
+        timeout = self.timeouts[step] if timeout is None else timeout
+        label = STEP_LABELS.get(step, step)
+        started = time.monotonic()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=self.poll).until(condition)
+        except TimeoutException:
+            elapsed = time.monotonic() - started
+            self._record(step, elapsed, True)
+            self.log(f"[대기] {label}: {elapsed:.2f}초, 제한 시간({timeout}초) 초과")
+            if required:
+                raise
+            return None
+        elapsed = time.monotonic() - started
+        self._record(step, elapsed, False)
+        self.log(f"[대기] {label}: {elapsed:.2f}초")
+        return result
+
+    def log_stats(self):
+        """
+        단계별 대기 시간 요약 (제한 시간 조정용)
+        """
+        for step, (count, total, longest, timeouts) in self.stats.items():
+            self.log(
+                f"[대기 통계] {STEP_LABELS.get(step, step)}: {count}회, 평균 {total / count:.2f}초, "
+                f"최대 {longest:.2f}초, 시간 초과 {timeouts}회 (제한 {self.timeouts[step]}초)"
+            )
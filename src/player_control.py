@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+플레이어 iframe 안 <video> 를 스크립트로 직접 조작
+- 키 입력(SPACE / 화살표) 대신 음소거 후 play(), 인트로는 끝 직전으로 옮겨 바로 끝나게 함
+- 분할 영상 URL 을 찾으면 해당 분할의 끝 직전으로 이동 + 재생 속도를 올려 플레이어가 곧바로 다음 분할을 요청하게 함
+- 분할이 바뀌면 브라우저가 재생 속도를 기본값으로 되돌리므로, 다음 분할은 다시 이동시키기 전까지 보통 속도로 재생
+- 플레이어가 이미 다른 분할로 넘어갔으면(expected 와 다름) 건너뛰지 않도록 이동하지 않음
+"""
+import os
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+# 분할 끝에서 이만큼 앞(초)으로 이동
+SEEK_MARGIN = 1.5
+# 끝 부분 재생 속도 (브라우저 최대 16)
+PLAYBACK_RATE = 8.0
+
+_CONTROL_JS = """
+var xpaths = arguments[0], intro = arguments[1], expected = arguments[2];
+var margin = arguments[3], rate = arguments[4], seek = arguments[5];
+var video = null;
+for (var i = 0; i < xpaths.length && !video; i++) {
+    video = document.evaluate(xpaths[i], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+video = video || document.querySelector('video');
+if (!video) return null;
+var src = video.currentSrc || video.src || '';
+var duration = video.duration;
+var state = {src: src, duration: isFinite(duration) ? duration : 0, time: video.currentTime, action: 'play'};
+video.muted = true;
+if (seek) {
+    var target = null;
+    if (src === intro) {
+        state.action = 'intro';
+        target = duration - 0.1;
+    } else if (!expected || src === expected) {
+        state.action = 'seek';
+        target = duration - margin;
+    } else {
+        state.action = 'moved';
+    }
+    if (target !== null) {
+        if (isFinite(duration) && duration > 0) {
+            if (video.currentTime < target) video.currentTime = Math.max(0, target);
+            video.playbackRate = rate;
+        } else {
+            // 메타데이터를 아직 읽지 못함: 재생만 시작하고 다음 호출에서 이동
+            state.action = 'wait';
+        }
+    }
+}
+if (video.paused) {
+    var played = video.play();
+    if (played && played.catch) played.catch(function () {});
+}
+return state;
+"""
+
+# 동작 -> 로그 표시용
+ACTION_LABELS = {
+    "play": "재생",
+    "intro": "인트로 건너뜀",
+    "seek": "분할 끝으로 이동",
+    "moved": "이미 다음 분할 재생 중",
+    "wait": "메타데이터 대기",
+}
+
+
+class PlayerController:
+    """
+    driver: Selenium WebDriver
+    waiter: iframe 진입 대기에 사용할 PageWaiter
+    log: 로그 출력 함수
+    xpaths: 플레이어 종류별 <video> 위치 (앞쪽 우선, 없으면 첫 번째 video)
+    intro_url: 인트로 영상 주소
+    메서드를 호출하면 driver 는 플레이어 iframe 안에 남음
+    """
+
+    def __init__(self, driver, waiter, log, xpaths, intro_url: str, rate=PLAYBACK_RATE, margin=SEEK_MARGIN):
+        self.driver = driver
+        self.waiter = waiter
+        self.log = log
+        self.xpaths = list(xpaths)
+        self.intro_url = intro_url
+        self.rate = rate
+        self.margin = margin
+
+    def _execute(self, expected, seek):
+        try:
+            return self.driver.execute_script(
+                _CONTROL_JS, self.xpaths, self.intro_url, expected, self.margin, self.rate, seek
+            )
+        except WebDriverException as e:
+            self.log(f"[플레이어] 스크립트 실행 오류: {str(e)}")
+            return None
+
+    def _report(self, state):
+        if state:
+            name = os.path.basename(urlparse(state["src"]).path) or "?"
+            self.log(
+                f"[플레이어] {ACTION_LABELS.get(state['action'], state['action'])}: {name} "
+                f"({state['time']:.0f}/{state['duration']:.0f}초)"
+            )
+        return state
+
+    def _enter(self):
+        self.driver.switch_to.default_content()
+        self.waiter.until("frame", EC.frame_to_be_available_and_switch_to_it((By.TAG_NAME, "iframe")))
+
+    def start(self):
+        """
+        음소거 후 재생 시작. <video> 가 없으면(플레이어가 아직 만들어지지 않음) None
+        """
+        self._enter()
+        return self._report(self._execute(None, False))
+
+    def advance(self, expected=None):
+        """
+        인트로면 끝내고, 현재 분할이 expected(없으면 무엇이든)면 끝 직전으로 이동해 빠르게 재생
+        메타데이터를 아직 읽지 못했으면 읽을 때까지 기다렸다가 이동. <video> 가 없으면 None
+        """
+        self._enter()
+        state = self._execute(expected, True)
+        if state and state["action"] == "wait":
+            def moved(driver):
+                current = self._execute(expected, True)
+                return current if current and current["action"] != "wait" else False
+            state = self.waiter.until("player", moved, required=False) or state
+        return self._report(state)
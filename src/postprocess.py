@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+"""
+강의 후처리 (분할 영상 병합 + 음성 추출)
+- 분할 mp4 가 모두 디스크에 저장되면 후처리 작업을 ProcessPoolExecutor 로 넘기고,
+  Selenium 쪽은 기다리지 않고 바로 다음 강의로 넘어감
+- 자식 프로세스의 로그/진행률은 multiprocessing.Queue 로 부모에게 전달되어 리스너 스레드가 콜백 호출
+- workers=0 이면 풀 없이 호출한 스레드에서 바로 처리 (기존 순차 방식)
+- 분할 영상은 받는 즉시 조각 작업(fragment)으로 음성을 뽑고, 강의 작업은 조각 작업이 끝난 뒤(after) 실행
+"""
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from audio_extract import DEFAULT_AUDIO_PROFILE, METHOD_LABELS, concat_audio, parallel_extract_audio
+from media_merge import concat_copy, incompatible_reason, transcode_concat
+from progress import STAGE_AUDIO, STAGE_MERGE, format_bytes
+from transfer import remove_verification
+
+# 기본 후처리 프로세스 수 (브라우저/다운로드용 코어는 남겨 둠)
+DEFAULT_POSTPROCESS_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+
+
+def encode_workers_per_job(pool_workers: int):
+    """
+    후처리 작업 하나가 음성 병렬 인코딩에 쓸 ffmpeg 프로세스 수
+    풀의 작업들이 동시에 인코딩해도 전체 ffmpeg 수가 코어 수를 넘지 않도록 코어를 나눠 가짐
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, pool_workers))
+
+
+# 자식 프로세스에서 부모로 보내는 이벤트 큐 (풀 initializer 에서 설정)
+_events = None
+
+
+def _init_worker(events):
+    global _events
+    _events = events
+
+
+def _run_in_worker(job: dict):
+    """
+    자식 프로세스 진입점: 로그/진행률을 이벤트 큐로 보냄
+    """
+    def report(kind, *payload):
+        _events.put((kind, job["id"]) + payload)
+    try:
+        return run_job(job, report)
+    finally:
+        # 마지막 로그까지 부모가 받은 뒤에 완료 처리되도록
+        report("done")
+
+
+def run_job(job: dict, report):
+    if job.get("kind") == "fragment":
+        return run_fragment(job, report)
+    return run_postprocess(job, report)
+
+
+def _extract(job: dict, video: str, audio_path: str, log):
+    """
+    job 의 형식/프로필로 음성 추출. encode_workers > 1 이면 긴 강의는 구간별 병렬 인코딩
+    반환: 로그 표시용 방식 문자열
+    """
+    method, seams = parallel_extract_audio(
+        video, audio_path, job["audio_format"], job.get("audio_profile", DEFAULT_AUDIO_PROFILE),
+        workers=job.get("encode_workers", 1), log=log
+    )
+    label = METHOD_LABELS.get(method, method)
+    return f"{label}, 구간 {len(seams) + 1}개 병렬" if seams else label
+
+
+def run_fragment(job: dict, report):
+    """
+    분할 영상 하나의 음성 조각 추출
+    job: {"kind": "fragment", "id", "title", "video", "audio_path", "audio_format", "audio_profile",
+          "encode_workers"}
+    반환: {"audio": 조각 경로 (실패 시 None), "audio_sec"}
+    """
+    video, audio_path = job["video"], job["audio_path"]
+    result = {"audio": None, "audio_sec": 0.0}
+    if os.path.exists(audio_path) and os.path.getmtime(audio_path) >= os.path.getmtime(video):
+        # 이전 실행에서 뽑아 둔 조각
+        result["audio"] = audio_path
+        return result
+    started = time.monotonic()
+    try:
+        os.makedirs(os.path.dirname(audio_path), exist_ok=True)
+        _extract(job, video, audio_path, lambda message: report("log", message))
+        result["audio"] = audio_path
+        result["audio_sec"] = time.monotonic() - started
+        report("log", f"음성 조각 추출 [{result['audio_sec']:.1f}초]: {os.path.basename(audio_path)}")
+    except Exception as e:
+        report("log", f"음성 조각 추출 오류 (마지막에 전체 추출): {os.path.basename(video)}: {e}")
+    return result
+
+
+def _concat_fragments(job: dict, log):
+    """
+    분할 영상마다 미리 뽑아 둔 음성 조각을 이어 붙임. 조각이 모자라거나 실패하면 False
+    """
+    fragments = job.get("fragments") or []
+    if len(fragments) != len(job["segments"]) or not all(os.path.exists(f) for f in fragments):
+        return False
+    try:
+        concat_audio(fragments, job["audio_path"], job["audio_format"])
+        return True
+    except Exception as e:
+        log(f"음성 조각 이어 붙이기 실패, 전체 영상에서 다시 추출합니다: {e}")
+        return False
+
+
+def run_postprocess(job: dict, report):
+    """
+    job: {"id", "title", "segments": [분할 mp4 경로], "merged_path", "audio_path", "audio_format",
+          "audio_profile", "encode_workers": 음성 병렬 인코딩 프로세스 수 (1 이면 사용 안 함),
+          "fragments": [분할 영상별 음성 조각 경로] (선택)}
+    report(kind, *payload): ("log", 메시지) 또는 ("progress", 단계, 퍼센트)
+    반환: {"video", "audio", "merge_ok", "merge_method", "merge_sec",
+          "audio_method", "audio_profile", "audio_sec", "audio_size"}
+    """
+    def log(message):
+        report("log", message)
+
+    segments = job["segments"]
+    profile = job.get("audio_profile", DEFAULT_AUDIO_PROFILE)
+    result = {"video": None, "audio": None, "merge_ok": True, "merge_method": None,
+              "merge_sec": 0.0, "audio_method": None, "audio_profile": profile, "audio_sec": 0.0, "audio_size": 0}
+
+    # (B) 분할된 mp4가 여러 개라면 하나로 합치기
+    if len(segments) == 1:
+        log("분할 영상이 아니므로 합치기 과정 없이 음성 추출을 진행합니다.")
+        video = segments[0]
+    else:
+        report("progress", STAGE_MERGE, 0)
+        merged_path = job["merged_path"]
+        started = time.monotonic()
+        try:
+            reason = incompatible_reason(segments)
+            if reason is None:
+                concat_copy(segments, merged_path)
+                result["merge_method"] = "스트림 복사(무손실)"
+            else:
+                log(f"{reason} -> 재인코딩으로 병합합니다.")
+        except Exception as copy_err:
+            log(f"스트림 복사 병합 실패, 재인코딩으로 병합합니다: {copy_err}")
+
+        try:
+            if result["merge_method"] is None:
+                # 분할마다 ffmpeg 하나씩 순서대로 재인코딩 (분할 수와 관계없이 메모리 사용량 일정)
+                transcode_concat(
+                    segments, merged_path,
+                    on_part=lambda done, total: report("progress", STAGE_MERGE, done * 100 // total)
+                )
+                result["merge_method"] = "재인코딩(분할별 순차)"
+            video = merged_path
+            result["merge_sec"] = time.monotonic() - started
+            log(f"분할된 영상을 하나로 합쳤습니다 [{result['merge_method']}, {result['merge_sec']:.1f}초]: {merged_path}")
+            # 분할 영상들 제거 (원치 않으시면 주석처리)
+            for f in segments:
+                if os.path.exists(f):
+                    os.remove(f)
+                remove_verification(f)
+        except Exception as merge_err:
+            log(f"분할 영상 병합 중 오류: {merge_err}")
+            video = segments[0]
+            # 첫 분할만으로 만든 결과물은 완료로 기록하지 않음
+            result["merge_ok"] = False
+        report("progress", STAGE_MERGE, 100)
+    result["video"] = video
+
+    # (C) 최종 영상 -> 음성 추출
+    report("progress", STAGE_AUDIO, 0)
+    audio_path = job["audio_path"]
+    started = time.monotonic()
+    try:
+        if _concat_fragments(job, log):
+            # 다운로드 중에 뽑아 둔 조각만 이어 붙임
+            result["audio_method"] = f"조각 {len(job['fragments'])}개 이어 붙이기"
+        else:
+            log(f"{job['audio_format'].upper()} 추출 중 ({profile}): {audio_path}")
+            result["audio_method"] = _extract(job, video, audio_path, log)
+        result["audio_sec"] = time.monotonic() - started
+        result["audio"] = audio_path
+        result["audio_size"] = os.path.getsize(audio_path)
+        log(f"음성 추출 완료 [{result['audio_method']}, {profile}, {result['audio_sec']:.1f}초, "
+            f"{format_bytes(result['audio_size'])}]: {audio_path}")
+        if job.get("fragments"):
+            shutil.rmtree(os.path.dirname(job["fragments"][0]), ignore_errors=True)
+    except Exception as e:
+        log(f"{job['audio_format'].upper()} 추출 오류: {str(e)}")
+    report("progress", STAGE_AUDIO, 100)
+    return result
+
+
+class PostProcessor:
+    """
+    workers: 후처리 프로세스 수 (0 이면 submit 한 스레드에서 바로 처리)
+    log: 로그 출력 함수
+    on_progress(info): 작업별 진행 {"id", "title", "stage", "percent"}
+    on_pending(n): 아직 끝나지 않은 작업 수가 바뀔 때
+    on_finished(job, result, error): 작업마다 submit 의 on_done 다음에 호출 (조각 작업 포함)
+    """
+
+    def __init__(self, workers=DEFAULT_POSTPROCESS_WORKERS, log=None, on_progress=None, on_pending=None,
+                 on_finished=None):
+        self.workers = max(0, workers)
+        self.log = log or (lambda message: None)
+        self.on_progress = on_progress
+        self.on_pending = on_pending
+        self.on_finished = on_finished
+        self._cond = threading.Condition()
+        self._jobs = {}
+        self._titles = {}
+        # 풀 작업: 결과(future)와 자식의 "done" 이벤트가 모두 도착해야 완료 처리
+        self._arrivals = {}
+        # 선행 작업(after)을 기다리는 작업: id -> (job, on_done, 남은 선행 작업 id 집합)
+        self._deferred = {}
+        self._next_id = 0
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._events = None
+        self._listener = None
+
+    def _start(self):
+        # Selenium/Qt 스레드가 있는 프로세스를 fork 하지 않도록 항상 spawn (Windows 와 동일)
+        context = multiprocessing.get_context("spawn")
+        self._events = context.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context,
+            initializer=_init_worker, initargs=(self._events,)
+        )
+        self._listener = threading.Thread(target=self._listen, args=(self._events,), daemon=True)
+        self._listener.start()
+
+    def _drop_executor(self, executor):
+        """
+        고장 난 풀(자식 프로세스가 강제 종료됨 등)을 버림. 다음 작업은 새 풀에서 실행
+        """
+        with self._executor_lock:
+            if executor is None or self._executor is not executor:
+                # 다른 스레드가 이미 새 풀로 바꿈
+                return
+            self._executor = None
+            # 강제 종료된 자식이 이벤트 큐 잠금을 쥐고 있을 수 있으므로 큐/리스너도 새로 만듦
+            # (이전 리스너는 데몬 스레드로 남겨 둠. 종료 신호를 넣으면 잠금 때문에 멈출 수 있음)
+            self._events = None
+            self._listener = None
+        self.log("[후처리] 작업 프로세스 풀이 중단되어 다음 작업부터 새 풀을 사용합니다.")
+        # 남은 future 는 풀이 BrokenProcessPool 로 끝내므로 취소하지 않음 (취소하면 완료 처리가 빠짐)
+        executor.shutdown(wait=False)
+
+    def _listen(self, events):
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            try:
+                self._handle(*event)
+            except Exception as e:
+                # 콜백 오류로 리스너가 멈추면 이후 작업이 끝나지 않으므로 로그만 남김
+                self.log(f"[후처리] 이벤트 처리 오류: {e}")
+
+    def _handle(self, kind, job_id, *payload):
+        with self._cond:
+            title = self._titles.get(job_id, str(job_id))
+        if kind == "done":
+            self._arrive(job_id, None)
+        elif kind == "log":
+            self.log(f"[후처리] {title}: {payload[0]}")
+        elif kind == "progress" and self.on_progress:
+            stage, percent = payload
+            self.on_progress({"id": job_id, "title": title, "stage": stage, "percent": int(percent)})
+
+    def pending(self):
+        with self._cond:
+            return len(self._jobs)
+
+    def _set_pending(self):
+        if self.on_pending:
+            self.on_pending(self.pending())
+
+    def submit(self, job: dict, on_done=None, after=()):
+        """
+        job 을 후처리 대기열에 추가하고 작업 id 반환. 끝나면 on_done(job, result, error) 호출 (풀 스레드에서)
+        after: 먼저 끝나야 하는 작업 id 목록 (예: 강의 작업은 그 강의의 조각 작업 뒤에 실행)
+        """
+        with self._cond:
+            self._next_id += 1
+            job = dict(job, id=self._next_id)
+            self._jobs[job["id"]] = job
+            self._titles[job["id"]] = job["title"]
+            waiting_for = {job_id for job_id in after if job_id in self._jobs}
+            if waiting_for:
+                self._deferred[job["id"]] = (job, on_done, waiting_for)
+        self._set_pending()
+        if not waiting_for:
+            self._dispatch(job, on_done)
+        return job["id"]
+
+    def _dispatch(self, job, on_done):
+        if self.workers == 0:
+            result, error = None, None
+            try:
+                result = run_job(job, lambda kind, *payload: self._handle(kind, job["id"], *payload))
+            except Exception as e:
+                error = e
+            self._finish(job, on_done, result, error)
+            return
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._start()
+            executor = self._executor
+        if job.get("kind") != "fragment":
+            self.log(f"[후처리] 대기열에 추가: {job['title']} (대기 {self.pending()}개)")
+        with self._cond:
+            self._arrivals[job["id"]] = {"job": job, "on_done": on_done, "outcome": None}
+        try:
+            future = executor.submit(_run_in_worker, job)
+        except Exception as e:
+            # BrokenProcessPool 등: 작업을 실패로 끝내야 wait() 가 멈추지 않음
+            with self._cond:
+                self._arrivals.pop(job["id"], None)
+            self._drop_executor(executor)
+            self._finish(job, on_done, None, e)
+            return
+        future.add_done_callback(lambda f: self._arrive(job["id"], self._outcome(f), executor))
+
+    @staticmethod
+    def _outcome(future):
+        try:
+            return future.result(), None
+        except Exception as e:
+            return None, e
+
+    def _arrive(self, job_id, outcome, executor=None):
+        """
+        outcome 이 None 이면 자식의 "done" 이벤트, 아니면 (결과, 오류)
+        """
+        if outcome is not None and isinstance(outcome[1], BrokenProcessPool):
+            self._drop_executor(executor)
+        with self._cond:
+            entry = self._arrivals.get(job_id)
+            if entry is None:
+                return
+            if outcome is not None:
+                entry["outcome"] = outcome
+                # 자식 프로세스가 죽었으면 "done" 이벤트가 오지 않음
+                entry["events_done"] = entry.get("events_done") or isinstance(outcome[1], BrokenProcessPool)
+            else:
+                entry["events_done"] = True
+            if entry["outcome"] is None or not entry.get("events_done"):
+                return
+            del self._arrivals[job_id]
+        self._finish(entry["job"], entry["on_done"], *entry["outcome"])
+
+    def _finish(self, job, on_done, result, error):
+        if error is not None:
+            self.log(f"[후처리] {job['title']} 실패: {error}")
+            self.log("".join(traceback.format_exception(type(error), error, error.__traceback__)).strip())
+        try:
+            if on_done:
+                on_done(job, result, error)
+            if self.on_finished:
+                self.on_finished(job, result, error)
+        finally:
+            ready = []
+            with self._cond:
+                self._jobs.pop(job["id"], None)
+                for job_id, (deferred, deferred_done, waiting_for) in list(self._deferred.items()):
+                    waiting_for.discard(job["id"])
+                    if not waiting_for:
+                        del self._deferred[job_id]
+                        ready.append((deferred, deferred_done))
+                self._cond.notify_all()
+            self._set_pending()
+            for deferred, deferred_done in ready:
+                self._dispatch(deferred, deferred_done)
+
+    def wait(self):
+        """
+        대기 중인 모든 후처리가 끝날 때까지 대기
+        """
+        with self._cond:
+            while self._jobs:
+                self._cond.wait()
+
+    def shutdown(self, wait=True):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+            events, self._events = self._events, None
+            listener, self._listener = self._listener, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+        if events is not None:
+            events.put(None)
+            listener.join(timeout=5)
+            events.close()
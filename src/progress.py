@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+진행 상황 집계
+- 다운로드/병합/MP3 변환 단계에서 올라오는 잦은 진행 보고를 모아 두었다가
+  일정 주기(기본 10Hz)로만 스냅샷(dict)을 GUI 에 전달
+- 수신 속도(bytes/sec), 남은 시간, 전체 실행 기준 위치(강의 k/n, 받은 바이트/예정 바이트) 계산
+"""
+import threading
+import time
+from collections import deque
+
+DEFAULT_INTERVAL = 0.1
+# 수신 속도 계산에 쓰는 최근 구간 (초)
+RATE_WINDOW = 5.0
+
+STAGE_IDLE = "idle"
+STAGE_DOWNLOAD = "download"
+STAGE_MERGE = "merge"
+STAGE_AUDIO = "audio"
+STAGE_DONE = "done"
+
+STAGE_LABELS = {
+    STAGE_IDLE: "대기",
+    STAGE_DOWNLOAD: "다운로드",
+    STAGE_MERGE: "병합",
+    STAGE_AUDIO: "오디오 변환",
+    STAGE_DONE: "완료",
+}
+
+# 강의 하나 안에서 각 단계가 차지하는 비율 (전체 진행률 계산용): (시작, 폭)
+STAGE_WEIGHTS = {
+    STAGE_IDLE: (0.0, 0.0),
+    STAGE_DOWNLOAD: (0.0, 0.7),
+    STAGE_MERGE: (0.7, 0.1),
+    STAGE_AUDIO: (0.8, 0.2),
+    STAGE_DONE: (1.0, 0.0),
+}
+
+
+def format_seconds(seconds):
+    """
+    초 -> 'HH:MM:SS' (모르면 '--:--')
+    """
+    if seconds is None or seconds < 0:
+        return "--:--"
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h:02d}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
+
+
+def format_bytes(size):
+    size = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+
+
+class ProgressAggregator:
+    """
+    emit: 스냅샷(dict)을 받는 함수 (예: pyqtSignal(dict).emit). 최대 1/interval 회/초 호출
+    interval: 최소 전달 간격 (초)
+    stats_provider: 스냅샷에 덧붙일 추가 상태(dict)를 반환하는 함수 (예: DownloadScheduler.stats)
+    여러 스레드에서 동시에 호출해도 됨
+    """
+
+    def __init__(self, emit=None, interval=DEFAULT_INTERVAL, stats_provider=None):
+        self.emit = emit
+        self.interval = interval
+        self.stats_provider = stats_provider
+        self._lock = threading.Lock()
+        self._last_emit = 0.0
+        self._samples = deque()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._run_started = time.monotonic()
+            self._lecture_total = 0
+            self._lecture_index = 0
+            self._lecture_title = ""
+            self._stage = STAGE_IDLE
+            self._stage_percent = 0.0
+            self._bytes_done = 0
+            self._bytes_planned = 0
+            self._stage_bytes_done = 0
+            self._stage_bytes_planned = 0
+            self._postprocess_pending = 0
+            self._samples.clear()
+
+    # ------------------------------------------------------------------
+    # 실행 / 강의 / 단계
+    # ------------------------------------------------------------------
+    def start_run(self, lecture_total: int):
+        self.reset()
+        with self._lock:
+            self._lecture_total = lecture_total
+        self._emit(force=True)
+
+    def start_lecture(self, title: str):
+        with self._lock:
+            self._lecture_index += 1
+            self._lecture_title = title
+            self._stage = STAGE_IDLE
+            self._stage_percent = 0.0
+            self._stage_bytes_done = 0
+            self._stage_bytes_planned = 0
+        self._emit(force=True)
+
+    def set_stage(self, stage: str):
+        with self._lock:
+            self._stage = stage
+            self._stage_percent = 0.0
+            self._stage_bytes_done = 0
+            self._stage_bytes_planned = 0
+        self._emit(force=True)
+
+    def finish_run(self):
+        with self._lock:
+            self._stage = STAGE_DONE
+            self._stage_percent = 100.0
+        self._emit(force=True)
+
+    # ------------------------------------------------------------------
+    # 진행 보고
+    # ------------------------------------------------------------------
+    def add_planned_bytes(self, size: int):
+        """
+        다운로드 예정 바이트 추가 (분할 mp4 크기를 알게 될 때마다)
+        """
+        with self._lock:
+            self._bytes_planned += size
+            self._stage_bytes_planned += size
+        self._emit()
+
+    def add_bytes(self, size: int, transferred=True):
+        """
+        받은 바이트 추가. transferred=False 는 이어받기로 이미 있던 바이트 (속도 계산에서 제외)
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._bytes_done += size
+            self._stage_bytes_done += size
+            if self._stage_bytes_planned > 0:
+                self._stage_percent = min(100.0, self._stage_bytes_done * 100.0 / self._stage_bytes_planned)
+            if transferred:
+                self._samples.append((now, size))
+        self._emit()
+
+    def set_postprocess_pending(self, count: int):
+        """
+        백그라운드 후처리(병합/음성 추출) 대기 중인 강의 수
+        """
+        with self._lock:
+            self._postprocess_pending = count
+        self._emit(force=True)
+
+    def set_stage_percent(self, percentage):
+        """
+        병합/변환처럼 바이트 단위가 아닌 단계의 진행률 (0~100)
+        """
+        with self._lock:
+            self._stage_percent = max(0.0, min(100.0, float(percentage)))
+        self._emit()
+
+    # ------------------------------------------------------------------
+    # 스냅샷
+    # ------------------------------------------------------------------
+    def _rate(self, now):
+        while self._samples and now - self._samples[0][0] > RATE_WINDOW:
+            self._samples.popleft()
+        if not self._samples:
+            return 0.0
+        elapsed = max(now - self._samples[0][0], 0.5)
+        return sum(size for _, size in self._samples) / elapsed
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            rate = self._rate(now)
+            start, width = STAGE_WEIGHTS.get(self._stage, (0.0, 0.0))
+            lecture_fraction = start + width * self._stage_percent / 100.0
+            if self._lecture_total > 0:
+                done_lectures = max(self._lecture_index - 1, 0)
+                overall = (done_lectures + lecture_fraction) / self._lecture_total
+            else:
+                overall = lecture_fraction
+            overall = max(0.0, min(1.0, overall))
+
+            eta = None
+            remaining = self._stage_bytes_planned - self._stage_bytes_done
+            if self._stage == STAGE_DOWNLOAD and rate > 0 and remaining > 0:
+                eta = remaining / rate
+            elapsed = now - self._run_started
+            run_eta = elapsed * (1 - overall) / overall if overall > 0.01 else None
+
+            snapshot = {
+                "stage": self._stage,
+                "stage_label": STAGE_LABELS.get(self._stage, self._stage),
+                "stage_percent": int(self._stage_percent),
+                "lecture_index": self._lecture_index,
+                "lecture_total": self._lecture_total,
+                "lecture_title": self._lecture_title,
+                "bytes_done": self._bytes_done,
+                "bytes_planned": self._bytes_planned,
+                "bytes_per_sec": rate,
+                "eta_sec": eta,
+                "run_eta_sec": run_eta,
+                "overall_percent": int(overall * 100),
+                "postprocess_pending": self._postprocess_pending,
+            }
+        if self.stats_provider:
+            snapshot.update(self.stats_provider())
+        return snapshot
+
+    def _emit(self, force=False):
+        if not self.emit:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_emit < self.interval:
+                return
+            self._last_emit = now
+        self.emit(self.snapshot())
+
+
+def describe(snapshot: dict):
+    """
+    스냅샷 -> 상태 표시용 한 줄 문자열
+    """
+    parts = []
+    if snapshot.get("lecture_total"):
+        parts.append(f"강의 {snapshot['lecture_index']}/{snapshot['lecture_total']}")
+    parts.append(f"{snapshot.get('stage_label', '')} {snapshot.get('stage_percent', 0)}%")
+    if snapshot.get("stage") == STAGE_DOWNLOAD:
+        parts.append(f"{format_bytes(snapshot.get('bytes_per_sec', 0))}/s")
+        parts.append(f"남은 시간 {format_seconds(snapshot.get('eta_sec'))}")
+        if "connection_limit" in snapshot:
+            parts.append(f"연결 {snapshot['active_connections']}/{snapshot['connection_limit']}")
+    if snapshot.get("bytes_planned"):
+        parts.append(f"{format_bytes(snapshot['bytes_done'])} / {format_bytes(snapshot['bytes_planned'])}")
+    if snapshot.get("postprocess_pending"):
+        parts.append(f"후처리 대기 {snapshot['postprocess_pending']}")
+    if snapshot.get("run_eta_sec") is not None and snapshot.get("stage") != STAGE_DONE:
+        parts.append(f"전체 남은 시간 {format_seconds(snapshot['run_eta_sec'])}")
+    return " · ".join(parts)
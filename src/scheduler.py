@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+다운로드 스케줄러
+- 프로그램 전체 동시 연결 수 상한 / 호스트별 상한 / (선택) 대역폭 상한
+- AIMD 제어: 처리량이 늘어나는 동안은 동시 연결 수를 1씩 늘리고,
+  429/503/타임아웃이 나면 절반으로, 그 밖의 전송 오류는 2/3 로 줄임
+"""
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+
+DEFAULT_MAX_CONNECTIONS = 8
+DEFAULT_PER_HOST_CONNECTIONS = 4
+INITIAL_CONCURRENCY = 2
+MIN_CONCURRENCY = 1
+
+# 처리량 측정 / 동시 연결 수 조정 주기 (초)
+ADJUST_INTERVAL = 2.0
+# 이만큼 이상 처리량이 늘어야 "개선"으로 봄
+IMPROVE_THRESHOLD = 0.05
+# 동시에 여러 연결에서 오류가 나도 한 번만 줄이도록 하는 간격 (초)
+DECREASE_COOLDOWN = 2.0
+
+
+def is_throttle_error(error):
+    """
+    서버가 속도 제한/과부하를 알리는 오류인지 (429, 503, 타임아웃)
+    """
+    if isinstance(error, requests.exceptions.Timeout):
+        return True
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code in (429, 503)
+
+
+class DownloadScheduler:
+    """
+    max_connections: 전체 동시 연결 상한
+    per_host: 호스트별 동시 연결 상한
+    bandwidth_limit: 전체 수신 속도 상한 (bytes/sec, 0 이면 제한 없음)
+    """
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS, per_host=DEFAULT_PER_HOST_CONNECTIONS,
+                 bandwidth_limit=0):
+        self.max_connections = max(MIN_CONCURRENCY, max_connections)
+        self.per_host = max(1, per_host)
+        self.bandwidth_limit = max(0, bandwidth_limit)
+        self._cond = threading.Condition()
+        self._limit = min(INITIAL_CONCURRENCY, self.max_connections)
+        self._active = 0
+        self._host_active = {}
+
+        # 처리량 측정 구간
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._last_rate = 0.0
+        self._throughput = 0.0
+        self._last_decrease = 0.0
+        self._errors = 0
+
+        # 대역폭 상한용 토큰 버킷
+        self._tokens = float(self.bandwidth_limit)
+        self._tokens_at = time.monotonic()
+
+    def configure(self, max_connections=None, per_host=None, bandwidth_limit=None):
+        """
+        실행 중 설정 변경 (GUI 설정 대화상자에서 호출)
+        """
+        with self._cond:
+            if max_connections is not None:
+                self.max_connections = max(MIN_CONCURRENCY, max_connections)
+                self._limit = min(self._limit, self.max_connections)
+            if per_host is not None:
+                self.per_host = max(1, per_host)
+            if bandwidth_limit is not None:
+                self.bandwidth_limit = max(0, bandwidth_limit)
+                self._tokens = float(self.bandwidth_limit)
+                self._tokens_at = time.monotonic()
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # 연결 슬롯
+    # ------------------------------------------------------------------
+    @contextmanager
+    def slot(self, url: str):
+        """
+        전송 하나가 진행되는 동안 슬롯 점유 (전체/호스트 상한에 걸리면 빌 때까지 대기)
+        """
+        host = urlparse(url).netloc
+        with self._cond:
+            while self._active >= self._limit or self._host_active.get(host, 0) >= self.per_host:
+                self._cond.wait()
+            self._active += 1
+            self._host_active[host] = self._host_active.get(host, 0) + 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._host_active[host] -= 1
+                self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # 보고
+    # ------------------------------------------------------------------
+    def report_bytes(self, nbytes: int):
+        """
+        수신한 바이트 보고. 대역폭 상한을 넘으면 호출한 (수신) 스레드를 잠시 재움
+        """
+        now = time.monotonic()
+        delay = 0.0
+        with self._cond:
+            self._window_bytes += nbytes
+            self._adjust(now)
+            if self.bandwidth_limit > 0:
+                rate = float(self.bandwidth_limit)
+                self._tokens = min(rate, self._tokens + (now - self._tokens_at) * rate) - nbytes
+                self._tokens_at = now
+                if self._tokens < 0:
+                    delay = -self._tokens / rate
+        if delay > 0:
+            time.sleep(delay)
+
+    def report_error(self, error):
+        """
+        전송 오류 보고: 곱셈 감소
+        """
+        now = time.monotonic()
+        with self._cond:
+            self._errors += 1
+            if now - self._last_decrease < DECREASE_COOLDOWN:
+                return
+            self._last_decrease = now
+            factor = 2 if is_throttle_error(error) else 1.5
+            self._limit = max(MIN_CONCURRENCY, int(self._limit / factor))
+            # 감소 직후 구간은 비교 기준에서 제외
+            self._window_start = now
+            self._window_bytes = 0
+            self._last_rate = 0.0
+
+    def _adjust(self, now):
+        """
+        ADJUST_INTERVAL 마다 처리량을 비교해 덧셈 증가 (lock 안에서 호출)
+        """
+        elapsed = now - self._window_start
+        if elapsed < ADJUST_INTERVAL:
+            return
+        rate = self._window_bytes / elapsed
+        self._throughput = rate
+        saturated = self._active >= self._limit
+        if saturated and rate > self._last_rate * (1 + IMPROVE_THRESHOLD) \
+                and now - self._last_decrease >= DECREASE_COOLDOWN:
+            if self._limit < self.max_connections:
+                self._limit += 1
+                self._cond.notify_all()
+        self._last_rate = rate
+        self._window_start = now
+        self._window_bytes = 0
+
+    def stats(self):
+        """
+        GUI 표시용 현재 상태
+        """
+        with self._cond:
+            return {
+                "active_connections": self._active,
+                "connection_limit": self._limit,
+                "max_connections": self.max_connections,
+                "throughput": self._throughput,
+                "transfer_errors": self._errors,
+            }
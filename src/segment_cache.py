@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+분할 mp4 내용 주소 저장소 (content-addressed store)
+- 받은 분할 파일을 sha256 해시 이름으로 보관하고
+  URL / (호스트 + ETag + 크기) / (호스트 + Last-Modified + 크기) 키로 찾을 수 있게 색인
+- 같은 영상이 다른 과목/분반에 있거나 실패 후 다시 실행할 때는 받지 않고
+  하드링크(불가하면 reflink, 그것도 안 되면 복사)로 새 위치에 만들어 줌
+- 전체 용량 상한을 넘으면 가장 오래 쓰지 않은 객체부터 삭제 (LRU)
+"""
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+CACHE_DIR_NAME = ".segment_cache"
+DEFAULT_CACHE_LIMIT = 10 * 1024 * 1024 * 1024
+HASH_READ_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(HASH_READ_SIZE)
+            if not data:
+                break
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def _reflink(src: str, dst: str):
+    """
+    Linux(btrfs/xfs) FICLONE ioctl 로 블록을 공유하는 복사본 생성
+    """
+    import fcntl
+    ficlone = 0x40049409
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        fcntl.ioctl(d.fileno(), ficlone, s.fileno())
+
+
+def link_or_copy(src: str, dst: str):
+    """
+    src 를 dst 로 하드링크 -> reflink -> 복사 순으로 시도. 사용한 방식 반환
+    """
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except (OSError, AttributeError):
+        pass
+    try:
+        _reflink(src, dst)
+        return "reflink"
+    except Exception:
+        if os.path.exists(dst):
+            os.remove(dst)
+    shutil.copyfile(src, dst)
+    return "copy"
+
+
+def lookup_keys(url: str, size: int, etag="", last_modified=""):
+    """
+    원격 파일 정보로 만든 조회 키 목록 (신뢰도 높은 순)
+    """
+    host = urlparse(url).netloc
+    keys = []
+    if etag and size:
+        keys.append(f"etag:{host}|{etag}|{size}")
+    if last_modified and size:
+        keys.append(f"lm:{host}|{last_modified}|{size}")
+    if size:
+        keys.append(f"url:{url}|{size}")
+    return keys
+
+
+class SegmentCache:
+    """
+    root: 저장소 폴더 (objects/ 와 index.sqlite 생성)
+    limit: 저장소 최대 크기 (bytes)
+    """
+
+    def __init__(self, root: str, limit=DEFAULT_CACHE_LIMIT, log=None):
+        self.root = root
+        self.limit = limit
+        self.log = log or (lambda message: None)
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(root, "index.sqlite"), check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS objects ("
+                " hash TEXT PRIMARY KEY, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS keys ("
+                " key TEXT PRIMARY KEY, hash TEXT NOT NULL REFERENCES objects(hash) ON DELETE CASCADE)"
+            )
+
+    def _object_path(self, digest: str):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _touch(self, digest: str):
+        self._db.execute("UPDATE objects SET last_access = ? WHERE hash = ?", (time.time(), digest))
+
+    def _forget(self, digest: str):
+        self._db.execute("DELETE FROM keys WHERE hash = ?", (digest,))
+        self._db.execute("DELETE FROM objects WHERE hash = ?", (digest,))
+
+    def fetch(self, keys, size: int, dest: str):
+        """
+        keys 중 하나로 저장된 객체가 있으면 dest 에 링크하고 그 sha256 반환 (없으면 None)
+        """
+        with self._lock:
+            for key in keys:
+                row = self._db.execute(
+                    "SELECT o.hash, o.size FROM keys k JOIN objects o ON o.hash = k.hash WHERE k.key = ?",
+                    (key,)
+                ).fetchone()
+                if not row:
+                    continue
+                digest, obj_size = row
+                path = self._object_path(digest)
+                if obj_size != size or not os.path.exists(path) or os.path.getsize(path) != size:
+                    # 객체가 사라졌거나 손상됨
+                    with self._db:
+                        self._forget(digest)
+                    continue
+                method = link_or_copy(path, dest)
+                with self._db:
+                    self._touch(digest)
+                self.log(f"캐시 적중 ({method}): {os.path.basename(dest)}")
+                return digest
+        return None
+
+    def store(self, path: str, keys, digest=None):
+        """
+        다운로드가 끝난 path 를 저장소에 등록 (이미 같은 내용이 있으면 키만 추가)
+        digest: 미리 계산한 sha256 (없으면 파일을 읽어 계산)
+        등록한 객체의 sha256 반환 (등록하지 않았으면 None)
+        """
+        if self.limit <= 0:
+            return None
+        size = os.path.getsize(path)
+        if size > self.limit:
+            return None
+        digest = digest or file_sha256(path)
+        obj_path = self._object_path(digest)
+        with self._lock:
+            if not os.path.exists(obj_path):
+                os.makedirs(os.path.dirname(obj_path), exist_ok=True)
+                link_or_copy(path, obj_path)
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO objects (hash, size, last_access) VALUES (?, ?, ?)",
+                    (digest, size, time.time())
+                )
+                for key in keys:
+                    self._db.execute("INSERT OR REPLACE INTO keys (key, hash) VALUES (?, ?)", (key, digest))
+            self._evict()
+        return digest
+
+    def _evict(self):
+        """
+        용량 상한을 넘으면 last_access 가 오래된 객체부터 삭제 (lock 안에서 호출)
+        """
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        if total <= self.limit:
+            return
+        rows = self._db.execute("SELECT hash, size FROM objects ORDER BY last_access ASC").fetchall()
+        with self._db:
+            for digest, size in rows:
+                if total <= self.limit:
+                    break
+                path = self._object_path(digest)
+                if os.path.exists(path):
+                    os.remove(path)
+                self._forget(digest)
+                total -= size
+                self.log(f"캐시 용량 초과로 삭제: {digest[:12]} ({size} bytes)")
+
+    def linked_objects(self):
+        """
+        {(st_dev, st_ino): sha256} 저장소 객체의 파일 식별자 (하드링크로 같은 파일인 결과물 찾기용)
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT hash FROM objects").fetchall()
+        inodes = {}
+        for (digest,) in rows:
+            try:
+                stat = os.stat(self._object_path(digest))
+            except OSError:
+                continue
+            inodes[(stat.st_dev, stat.st_ino)] = digest
+        return inodes
+
+    def discard(self, digest: str):
+        """
+        객체 하나를 저장소에서 삭제 (하드링크된 결과물을 지울 때 실제로 공간이 비도록)
+        """
+        with self._lock:
+            path = self._object_path(digest)
+            if os.path.exists(path):
+                os.remove(path)
+            with self._db:
+                self._forget(digest)
+
+    def _unshared(self):
+        """
+        다른 파일과 하드링크로 공유하지 않는(지우면 공간이 비는) 객체 [(sha256, 크기)], 오래된 순 (lock 안에서 호출)
+        """
+        objects = []
+        for digest, size in self._db.execute("SELECT hash, size FROM objects ORDER BY last_access ASC").fetchall():
+            try:
+                if os.stat(self._object_path(digest)).st_nlink == 1:
+                    objects.append((digest, size))
+            except OSError:
+                continue
+        return objects
+
+    def releasable(self):
+        """
+        release 로 확보할 수 있는 바이트 수
+        """
+        with self._lock:
+            return sum(size for _, size in self._unshared())
+
+    def release(self, enough):
+        """
+        디스크 공간 확보용: enough() 가 참이 될 때까지 공유하지 않는 객체를 오래된 순으로 삭제
+        삭제한 바이트 수 반환
+        """
+        freed = 0
+        with self._lock:
+            for digest, size in self._unshared():
+                if enough():
+                    break
+                path = self._object_path(digest)
+                if os.path.exists(path):
+                    os.remove(path)
+                with self._db:
+                    self._forget(digest)
+                freed += size
+                self.log(f"디스크 공간 확보를 위해 캐시 삭제: {digest[:12]} ({size} bytes)")
+        return freed
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+다운로드 폴더 용량 관리
+- 완료한 강의의 최종 mp4(영상 원본) 전체 크기를 예산(budget) 안으로 유지:
+  넘으면 음성 결과물이 남아 있고 검증되는(매니페스트 기록과 크기 일치) 강의의 mp4 부터,
+  가장 오래 쓰지 않은 순서(LRU, 파일 접근/수정 시각)로 삭제
+- 다운로드/병합 전에 남은 디스크 공간 확인: 모자라면 분할 영상 캐시(LRU) -> mp4 순으로 지워 확보하고,
+  그래도 모자라면 공간이 생길 때까지 기다림 (500MB 분할을 받다가 중간에 실패하지 않도록)
+- 분할이 하나인 강의의 mp4 는 캐시 객체와 하드링크로 같은 파일이므로, 지울 때 캐시 객체도 함께 지워야 공간이 빔
+"""
+import os
+import shutil
+import threading
+import time
+
+from manifest import output_is_valid
+from transfer import remove_verification
+
+GB = 1024 * 1024 * 1024
+# 영상 원본 예산 기본값 (0 이면 제한 없음)
+DEFAULT_VIDEO_BUDGET = 0
+# 다운로드 후에도 남겨 둘 최소 여유 공간
+MIN_FREE_SPACE = 512 * 1024 * 1024
+# 공간이 모자랄 때 다시 확인하는 간격 / 최대 대기 시간 (초)
+SPACE_POLL_INTERVAL = 5
+SPACE_WAIT_TIMEOUT = 30 * 60
+
+
+class InsufficientSpace(IOError):
+    """
+    영상 원본을 지우고 기다려도 필요한 디스크 공간을 확보하지 못함
+    """
+
+
+def _last_used(path: str):
+    stat = os.stat(path)
+    return max(stat.st_atime, stat.st_mtime)
+
+
+class StorageManager:
+    """
+    download_dir: 다운로드 폴더 (여유 공간 확인 대상)
+    manifest: 완료한 강의와 결과물 경로를 기록한 DownloadManifest
+    budget: 영상 원본(mp4) 전체 최대 크기 (bytes, 0 이면 제한 없음)
+    min_free: 항상 남겨 둘 여유 공간 (bytes)
+    log: 로그 출력 함수
+    cache: 다운로드 폴더의 SegmentCache (없으면 캐시는 건드리지 않음)
+    여러 스레드에서 동시에 호출해도 됨
+    """
+
+    def __init__(self, download_dir: str, manifest, budget=DEFAULT_VIDEO_BUDGET, min_free=MIN_FREE_SPACE, log=None,
+                 wait_timeout=SPACE_WAIT_TIMEOUT, cache=None):
+        self.download_dir = download_dir
+        self.manifest = manifest
+        self.cache = cache
+        self.budget = budget
+        self.min_free = min_free
+        self.wait_timeout = wait_timeout
+        self.log = log or (lambda message: None)
+        self._lock = threading.Lock()
+
+    def free_space(self):
+        return shutil.disk_usage(self.download_dir).free
+
+    def _videos(self):
+        """
+        완료한 강의의 영상 원본 [(마지막 사용 시각, 크기, 경로, 강의 키, 삭제 가능 여부, 캐시 객체, 실제로 비는 크기)]
+        삭제 가능: 음성 결과물이 기록과 일치하게 남아 있음
+        캐시 객체: 같은 파일(하드링크)인 분할 영상 캐시 객체의 sha256 (삭제할 때 함께 지움)
+        실제로 비는 크기: 캐시 밖의 다른 하드링크가 남아 있으면 0
+        """
+        inodes = self.cache.linked_objects() if self.cache else {}
+        videos = []
+        for key, outputs in self.manifest.completed_outputs():
+            record = outputs.get("video")
+            if not record or not os.path.exists(record.get("path", "")):
+                continue
+            path = record["path"]
+            audio = outputs.get("audio")
+            evictable = bool(audio) and output_is_valid(audio) and audio.get("path") != path
+            stat = os.stat(path)
+            digest = inodes.get((stat.st_dev, stat.st_ino))
+            links = stat.st_nlink - (1 if digest else 0)
+            reclaim = stat.st_size if links <= 1 else 0
+            videos.append((_last_used(path), stat.st_size, path, key, evictable, digest, reclaim))
+        return videos
+
+    def video_usage(self):
+        return sum(video[1] for video in self._videos())
+
+    def _evict(self, size, path, key, digest):
+        os.remove(path)
+        remove_verification(path)
+        if digest:
+            # 하드링크로 남은 캐시 객체도 지워야 디스크 공간이 빔
+            self.cache.discard(digest)
+        self.manifest.drop_output(key, "video")
+        self.log(f"[용량 관리] 영상 원본 삭제 ({size / GB:.2f} GB, 음성은 유지): {path}")
+
+    def enforce_budget(self):
+        """
+        영상 원본 전체 크기가 예산을 넘으면 LRU 순으로 삭제. 확보한 바이트 수 반환
+        """
+        if self.budget <= 0:
+            return 0
+        freed = 0
+        with self._lock:
+            videos = self._videos()
+            usage = sum(video[1] for video in videos)
+            for _, size, path, key, evictable, digest, _ in sorted(videos, key=lambda video: video[0]):
+                if usage <= self.budget:
+                    break
+                if not evictable:
+                    continue
+                try:
+                    self._evict(size, path, key, digest)
+                except OSError as e:
+                    self.log(f"[용량 관리] 영상 원본 삭제 실패: {path}: {e}")
+                    continue
+                usage -= size
+                freed += size
+        if usage > self.budget:
+            self.log(f"[용량 관리] 지울 수 있는 영상 원본이 없어 예산 초과 ({usage / GB:.2f} / {self.budget / GB:.2f} GB)")
+        return freed
+
+    def _make_room(self, needed: int):
+        """
+        여유 공간이 needed 이상이 될 때까지 분할 영상 캐시(LRU), 영상 원본(LRU) 순으로 삭제. 확보했으면 True
+        """
+        with self._lock:
+            free = self.free_space()
+            if free >= needed:
+                return True
+            videos = self._videos()
+            cached = self.cache.releasable() if self.cache else 0
+            if free + cached + sum(video[6] for video in videos if video[4]) < needed:
+                # 다 지워도 모자라면 지우지 않고 기다림
+                return False
+            if cached and self.cache.release(lambda: self.free_space() >= needed):
+                if self.free_space() >= needed:
+                    return True
+            for _, size, path, key, evictable, digest, reclaim in sorted(videos, key=lambda video: video[0]):
+                if not evictable or not reclaim:
+                    # 다른 하드링크가 남아 지워도 공간이 비지 않음
+                    continue
+                try:
+                    self._evict(size, path, key, digest)
+                except OSError as e:
+                    self.log(f"[용량 관리] 영상 원본 삭제 실패: {path}: {e}")
+                    continue
+                if self.free_space() >= needed:
+                    return True
+        return False
+
+    def ensure_free(self, size: int, label=""):
+        """
+        size bytes 를 쓰기 전에 호출. 여유 공간(size + min_free)이 모자라면 영상 원본을 지우고,
+        그래도 모자라면 공간이 생길 때까지 대기. wait_timeout 안에 확보하지 못하면 InsufficientSpace 발생
+        """
+        needed = max(0, size) + self.min_free
+        if self._make_room(needed):
+            return
+        deadline = time.monotonic() + self.wait_timeout
+        self.log(
+            f"[용량 관리] 디스크 공간 부족{f' ({label})' if label else ''}: "
+            f"{needed / GB:.2f} GB 필요, {self.free_space() / GB:.2f} GB 남음. 공간이 생길 때까지 대기합니다."
+        )
+        while time.monotonic() < deadline:
+            time.sleep(SPACE_POLL_INTERVAL)
+            if self._make_room(needed):
+                self.log("[용량 관리] 디스크 공간 확보, 계속 진행합니다.")
+                return
+        raise InsufficientSpace(
+            f"디스크 공간 부족: {needed / GB:.2f} GB 필요, {self.free_space() / GB:.2f} GB 남음"
+        )
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+다운로드 스트리밍 엔진
+- 네트워크 쪽은 재사용하는 큰 bytearray 버퍼에 readinto 로 직접 채우고
+- 별도 writer 스레드가 채워진 버퍼를 디스크에 기록 (읽기/쓰기 겹치기 = 더블 버퍼링)
+- 블록 크기는 측정한 수신 속도에 맞춰 조정
+"""
+import os
+import queue
+import threading
+import time
+
+# 블록 크기 (버퍼 하나에 채울 최대 바이트)
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+MIN_BLOCK_SIZE = 256 * 1024
+MAX_BLOCK_SIZE = 4 * 1024 * 1024
+BLOCK_ALIGN = 64 * 1024
+# 블록 하나를 채우는 데 걸리기를 원하는 시간 (초)
+TARGET_BLOCK_TIME = 0.25
+
+
+def preallocate(file_obj, size: int):
+    """
+    파일을 size 바이트로 미리 확보 (posix_fallocate 지원 시 실제 블록 할당, 아니면 truncate)
+    """
+    if size <= 0:
+        return
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(file_obj.fileno(), 0, size)
+            return
+        except OSError:
+            pass
+    file_obj.truncate(size)
+
+
+class AdaptiveBlockSize:
+    """
+    최근 수신 속도 * TARGET_BLOCK_TIME 에 가깝게 블록 크기를 조정
+    adaptive=False 이면 항상 처음 지정한 크기 사용
+    """
+
+    def __init__(self, block_size=DEFAULT_BLOCK_SIZE, adaptive=True):
+        self.size = self._clamp(block_size)
+        self.adaptive = adaptive
+        self._throughput = 0.0
+
+    @staticmethod
+    def _clamp(size):
+        size = max(MIN_BLOCK_SIZE, min(MAX_BLOCK_SIZE, int(size)))
+        return max(BLOCK_ALIGN, size - size % BLOCK_ALIGN)
+
+    def update(self, nbytes: int, elapsed: float):
+        if not self.adaptive or elapsed <= 0 or nbytes <= 0:
+            return
+        rate = nbytes / elapsed
+        # 지수 이동 평균으로 순간적인 출렁임 완화
+        self._throughput = rate if self._throughput == 0 else self._throughput * 0.7 + rate * 0.3
+        self.size = self._clamp(self._throughput * TARGET_BLOCK_TIME)
+
+
+class BufferedFileWriter:
+    """
+    채워진 버퍼를 (offset, length) 위치에 기록하는 writer 스레드
+    buffer_count 개의 버퍼를 돌려 쓰므로 메모리 사용량은 buffer_count * MAX_BLOCK_SIZE 로 고정
+    on_written(tag, nbytes) 는 실제로 디스크에 기록된 뒤 writer 스레드에서 호출
+    hasher: 기록한 순서대로 내용을 넣을 hashlib 객체 (앞에서부터 차례로 기록하는 단일 스트림에서만 의미 있음)
+    """
+
+    def __init__(self, path: str, buffer_count=2, on_written=None, hasher=None):
+        self.path = path
+        self.on_written = on_written
+        self.hasher = hasher
+        self.error = None
+        self._file = open(path, "r+b", buffering=0)
+        self._free = queue.Queue()
+        self._filled = queue.Queue()
+        self._allocated = 0
+        self._buffer_count = max(2, buffer_count)
+        self._alloc_lock = threading.Lock()
+        # tag 별 아직 기록되지 않은 버퍼 수
+        self._pending = {}
+        self._pending_cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def acquire(self):
+        """
+        비어 있는 버퍼 반환 (필요할 때만 새로 할당, 개수 상한 도달 시 반납될 때까지 대기)
+        """
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            pass
+        with self._alloc_lock:
+            if self._allocated < self._buffer_count:
+                self._allocated += 1
+                return bytearray(MAX_BLOCK_SIZE)
+        return self._free.get()
+
+    def release(self, buf):
+        self._free.put(buf)
+
+    def submit(self, buf, length: int, offset: int, tag=None):
+        """
+        buf[:length] 를 offset 위치에 기록하도록 예약 (기록 후 버퍼는 자동 반납)
+        """
+        if self.error:
+            self.release(buf)
+            raise self.error
+        with self._pending_cond:
+            self._pending[id(tag)] = self._pending.get(id(tag), 0) + 1
+        self._filled.put((buf, length, offset, tag))
+
+    def flush(self, tag=None):
+        """
+        tag 로 예약한 기록이 모두 끝날 때까지 대기
+        """
+        with self._pending_cond:
+            while self._pending.get(id(tag), 0) > 0:
+                self._pending_cond.wait()
+        if self.error:
+            raise self.error
+
+    def close(self):
+        self._filled.put(None)
+        self._thread.join()
+        self._file.close()
+        if self.error:
+            raise self.error
+
+    def _run(self):
+        while True:
+            item = self._filled.get()
+            try:
+                if item is None:
+                    return
+                buf, length, offset, tag = item
+                try:
+                    if self.error is None:
+                        view = memoryview(buf)[:length]
+                        self._file.seek(offset)
+                        written = 0
+                        while written < length:
+                            written += self._file.write(view[written:])
+                        if self.hasher is not None:
+                            self.hasher.update(view)
+                        if self.on_written:
+                            self.on_written(tag, length)
+                except Exception as e:
+                    # 이후 버퍼는 기록하지 않고 반납만 해서 reader 가 멈추지 않게 함
+                    self.error = e
+                finally:
+                    self.release(buf)
+                    with self._pending_cond:
+                        self._pending[id(tag)] -= 1
+                        self._pending_cond.notify_all()
+            finally:
+                self._filled.task_done()
+
+
+def stream_response(raw, writer: BufferedFileWriter, offset: int, length: int, block: AdaptiveBlockSize,
+                    tag=None, on_read=None):
+    """
+    raw(urllib3 응답)에서 최대 length 바이트(-1 이면 끝까지)를 읽어 offset 부터 기록 예약
+    on_read(nbytes): 블록 하나를 읽을 때마다 수신 스레드에서 호출 (대역폭 제한 등)
+    읽은 바이트 수 반환
+    """
+    received = 0
+    while length < 0 or received < length:
+        buf = writer.acquire()
+        view = memoryview(buf)
+        want = block.size if length < 0 else min(block.size, length - received)
+        filled = 0
+        started = time.monotonic()
+        try:
+            while filled < want:
+                n = raw.readinto(view[filled:want])
+                if not n:
+                    break
+                filled += n
+        except Exception:
+            view.release()
+            writer.release(buf)
+            raise
+        view.release()
+        if filled == 0:
+            writer.release(buf)
+            break
+        block.update(filled, time.monotonic() - started)
+        writer.submit(buf, filled, offset + received, tag)
+        received += filled
+        if on_read:
+            on_read(filled)
+        if filled < want:
+            # 서버가 연결을 닫음
+            break
+    return received
@@ -0,0 +1,546 @@
+# -*- coding: utf-8 -*-
+"""
+분할 mp4 HTTP 전송 로직
+- 서버가 Range 요청을 지원하면 파일을 N개 구간으로 나눠 각각 별도 연결로 받음
+- 지원하지 않으면 기존과 같이 단일 스트림으로 받음
+- 받는 동안은 '<파일>.part' 에 기록하고, 옆의 '<파일>.part.json' 에 URL/전체 크기/ETag/구간별 진행 상황을 저장
+  → 연결이 끊기거나 프로그램이 종료돼도 다음 실행 때 마지막 바이트부터 이어 받음
+- 크기/mp4 구조 검증이 끝난 뒤에만 최종 파일명으로 변경하고, 검증 결과를 '<파일>.verify.json' 에 기록
+  → 다음 실행에서는 파일을 다시 읽거나 디코딩하지 않고 기록만 보고 신뢰
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+import requests
+import urllib3
+
+from http_client import default_client
+from mp4box import Mp4StructureError, check_structure
+from segment_cache import file_sha256, lookup_keys
+from stream_writer import (
+    AdaptiveBlockSize, BufferedFileWriter, DEFAULT_BLOCK_SIZE, preallocate, stream_response
+)
+
+# 기본 동시 연결 수
+DEFAULT_CONNECTIONS = 4
+# 이 크기보다 작은 파일은 나누지 않고 단일 연결로 받음
+MIN_SPLIT_SIZE = 8 * 1024 * 1024
+# 압축 없이 원본 바이트 그대로 받아야 Range 오프셋과 content-length 가 일치
+MEDIA_HEADERS = {"Accept-Encoding": "identity"}
+
+PART_SUFFIX = ".part"
+STATE_SUFFIX = ".json"
+# 구간별 진행 상황을 사이드카 파일에 기록하는 간격
+STATE_SAVE_INTERVAL = 4 * 1024 * 1024
+VERIFY_SUFFIX = ".verify.json"
+# 검증에 실패한 파일을 바로 다시 받는 최대 횟수
+VERIFY_RETRIES = 2
+
+# 재시도 (지수 백오프, 상한 있음)
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+RETRYABLE_ERRORS = (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, IOError)
+
+
+class RangeNotSupported(Exception):
+    """
+    Range 요청에 206 대신 다른 응답이 온 경우
+    """
+
+
+class IncompleteDownload(IOError):
+    """
+    받은 바이트 수가 기대한 크기와 다른 경우
+    """
+
+
+class CorruptSegment(IOError):
+    """
+    다시 받아도 크기/구조 검증을 통과하지 못한 경우
+    """
+
+
+def save_verification(path: str, size: int, digest: str, etag="", duration=None):
+    """
+    검증을 통과한 파일의 크기/수정 시각/sha256 (알면 재생 시간) 을 '<파일>.verify.json' 에 기록
+    """
+    record = {
+        "size": size,
+        "mtime": os.path.getmtime(path),
+        "sha256": digest,
+        "etag": etag,
+        "verified_at": time.time(),
+    }
+    if duration is not None:
+        record["duration"] = duration
+    tmp_path = path + VERIFY_SUFFIX + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f)
+    os.replace(tmp_path, path + VERIFY_SUFFIX)
+
+
+def load_verification(path: str):
+    """
+    파일이 검증 당시와 그대로(크기 + 수정 시각)이면 검증 기록 반환, 아니면 None
+    """
+    record_path = path + VERIFY_SUFFIX
+    if not (os.path.exists(path) and os.path.exists(record_path)):
+        return None
+    try:
+        with open(record_path, "r", encoding="utf-8") as f:
+            record = json.load(f)
+        stat = os.stat(path)
+        if record["size"] == stat.st_size and record["mtime"] == stat.st_mtime and record.get("sha256"):
+            return record
+    except Exception:
+        pass
+    return None
+
+
+def remove_verification(path: str):
+    record_path = path + VERIFY_SUFFIX
+    if os.path.exists(record_path):
+        os.remove(record_path)
+
+
+def probe_range_support(http, url: str, timeout=10):
+    """
+    HEAD 요청으로 (전체 크기, Range 지원 여부, ETag, Last-Modified) 반환
+    """
+    response = http.head(url, headers=MEDIA_HEADERS, allow_redirects=True, timeout=timeout)
+    response.raise_for_status()
+    total_size = int(response.headers.get("content-length", 0))
+    accept_ranges = response.headers.get("accept-ranges", "").lower()
+    etag = response.headers.get("etag", "")
+    last_modified = response.headers.get("last-modified", "")
+    return total_size, (accept_ranges == "bytes" and total_size > 0), etag, last_modified
+
+
+def split_ranges(total_size: int, connections: int):
+    """
+    [0, total_size) 를 connections 개의 (start, end) 구간(end 포함)으로 분할
+    """
+    connections = max(1, min(connections, total_size))
+    part_size = total_size // connections
+    ranges = []
+    start = 0
+    for i in range(connections):
+        end = total_size - 1 if i == connections - 1 else start + part_size - 1
+        ranges.append((start, end))
+        start = end + 1
+    return ranges
+
+
+def backoff_delay(attempt: int):
+    """
+    attempt(1부터) 번째 재시도 전 대기 시간
+    """
+    return min(BACKOFF_BASE * (2 ** (attempt - 1)), BACKOFF_MAX)
+
+
+class SegmentDownloader:
+    """
+    분할 mp4 한 개를 받는 전송기
+    log: 로그 출력 함수
+    progress: 받은 바이트를 보고할 ProgressAggregator (없으면 보고하지 않음)
+    connections: Range 분할 시 동시 연결 수 (1이면 항상 단일 스트림)
+    max_retries: 구간(또는 단일 스트림)별 최대 재시도 횟수
+    http: 요청에 사용할 HttpClient (없으면 공용 클라이언트)
+    block_size: 버퍼 하나에 채울 바이트 수 (adaptive_block=True 면 시작값)
+    adaptive_block: 측정한 수신 속도에 맞춰 블록 크기 조정 여부
+    scheduler: 동시 연결 수/대역폭을 제어하는 DownloadScheduler (없으면 제한 없음)
+    cache: 이미 받은 적 있는 분할 파일을 재사용할 SegmentCache (없으면 항상 받음)
+    storage: 받기 전에 디스크 여유 공간을 확인할 StorageManager (없으면 확인하지 않음)
+    """
+
+    def __init__(self, log, progress=None, connections=DEFAULT_CONNECTIONS, timeout=10,
+                 max_retries=MAX_RETRIES, http=None, block_size=DEFAULT_BLOCK_SIZE, adaptive_block=True, scheduler=None,
+                 cache=None, storage=None):
+        self.log = log
+        self.storage = storage
+        self.scheduler = scheduler
+        self.cache = cache
+        self.block_size = block_size
+        self.adaptive_block = adaptive_block
+        self.http = http or default_client()
+        self.progress = progress
+        self.connections = connections
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+
+    def _plan(self, size: int):
+        if self.progress and size > 0:
+            self.progress.add_planned_bytes(size)
+
+    def _add_progress(self, size: int, transferred=True):
+        if self.progress:
+            self.progress.add_bytes(size, transferred=transferred)
+
+    def _slot(self, url: str):
+        return self.scheduler.slot(url) if self.scheduler else nullcontext()
+
+    def _on_read(self):
+        return self.scheduler.report_bytes if self.scheduler else None
+
+    def _report_error(self, error):
+        if self.scheduler:
+            self.scheduler.report_error(error)
+
+    def download(self, url: str, file_name: str):
+        """
+        url을 file_name으로 저장. 재시도 후에도 실패하면 예외 발생 (.part 파일은 남겨 둠)
+        받은 파일은 크기/해시/mp4 구조를 확인하고, 이상하면 URL 이 유효할 때 바로 다시 받음
+        반환: {"url", "size", "etag", "last_modified", "sha256", "cached", "verified"}
+        """
+        part_path = file_name + PART_SUFFIX
+        state_path = part_path + STATE_SUFFIX
+
+        total_size, ranges_ok, etag, last_modified = 0, False, "", ""
+        try:
+            total_size, ranges_ok, etag, last_modified = probe_range_support(self.http, url, self.timeout)
+        except Exception as e:
+            self.log(f"HEAD 요청 실패, 이어받기 정보가 있으면 이어서, 없으면 단일 연결로 진행: {str(e)}")
+
+        # 이전 실행에서 받아 검증까지 끝난 파일이면 다시 받지 않음
+        record = load_verification(file_name)
+        if record and (total_size <= 0 or record["size"] == total_size) \
+                and (not etag or not record.get("etag") or record["etag"] == etag):
+            self.log(f"검증된 파일이 있어 다운로드 생략: {os.path.basename(file_name)}")
+            self._discard(part_path, state_path)
+            self._plan(record["size"])
+            self._add_progress(record["size"], transferred=False)
+            return {"url": url, "size": record["size"], "etag": etag, "last_modified": last_modified,
+                    "sha256": record["sha256"], "cached": True, "verified": True}
+
+        keys = lookup_keys(url, total_size, etag, last_modified)
+        use_cache = self.cache is not None and total_size > 0
+        failures = 0
+        while True:
+            cached = False
+            digest = None
+            # 같은 내용을 이미 받은 적이 있으면 저장소에서 링크
+            if use_cache:
+                digest = self.cache.fetch(keys, total_size, file_name)
+            if digest:
+                cached = True
+                self._discard(part_path, state_path)
+                size = total_size
+                self._plan(size)
+                self._add_progress(size, transferred=False)
+                check_path = file_name
+            else:
+                if self.storage:
+                    # 이어 받는 .part 는 이미 전체 크기만큼 확보되어 있을 수 있음
+                    existing = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+                    self.storage.ensure_free(total_size - existing, os.path.basename(file_name))
+                total_size, digest = self._transfer(url, part_path, state_path, total_size, ranges_ok, etag)
+                size = os.path.getsize(part_path)
+                check_path = part_path
+
+            problem = self._verify(check_path, total_size, None if cached else state_path)
+            if problem is None:
+                break
+            # 잘못 받은 파일: 보고한 진행량을 되돌리고 저장소를 거치지 않고 바로 다시 받음
+            self._unplan(size)
+            if cached:
+                os.remove(file_name)
+            else:
+                self._discard(part_path, state_path)
+            self._report_error(IncompleteDownload(problem))
+            use_cache = False
+            failures += 1
+            if failures > VERIFY_RETRIES:
+                raise CorruptSegment(f"{os.path.basename(file_name)} 검증 실패: {problem}")
+            self.log(f"받은 파일 검증 실패, 다시 받습니다 ({failures}/{VERIFY_RETRIES}): {problem}")
+
+        if not cached:
+            # 검증이 끝난 뒤에만 최종 파일명으로 승격
+            if digest is None:
+                digest = file_sha256(part_path)
+            os.replace(part_path, file_name)
+            if os.path.exists(state_path):
+                os.remove(state_path)
+            if self.cache:
+                try:
+                    self.cache.store(file_name, lookup_keys(url, size, etag, last_modified), digest=digest)
+                except Exception as e:
+                    self.log(f"세그먼트 캐시 저장 오류: {str(e)}")
+        save_verification(file_name, size, digest, etag)
+        return {"url": url, "size": size, "etag": etag, "last_modified": last_modified,
+                "sha256": digest, "cached": cached, "verified": True}
+
+    def _transfer(self, url, part_path, state_path, total_size, ranges_ok, etag):
+        """
+        url 을 part_path 로 받음. (기대 크기, 받으면서 계산한 sha256 또는 None) 반환
+        """
+        state = None
+        if ranges_ok or os.path.exists(state_path):
+            # HEAD 가 실패했거나 Range 를 광고하지 않아도 이전 진행 상황이 있으면 Range/If-Range 로 이어 받기를 시도
+            # (서버가 200 전체 응답을 주면 그때 처음부터 받음)
+            state = self._load_state(state_path, part_path, url, total_size, etag)
+        if state is None and ranges_ok:
+            connections = self.connections if total_size >= MIN_SPLIT_SIZE else 1
+            state = self._new_state(url, total_size, etag, connections)
+            # 전체 크기만큼 파일을 미리 확보해 두고 각 구간을 자기 위치에 기록
+            with open(part_path, "wb") as f:
+                preallocate(f, total_size)
+            self._save_state(state_path, state)
+        if state is not None:
+            try:
+                self._download_ranges(part_path, state_path, state)
+                # 구간이 순서 없이 기록되므로 해시는 다 받은 뒤 계산 (방금 기록해 페이지 캐시에 있음)
+                return state["total_size"], None
+            except RangeNotSupported:
+                self.log("서버가 Range 요청을 처리하지 않아 처음부터 단일 연결로 다시 받습니다.")
+                self._unplan(state["total_size"], sum(r["done"] for r in state["ranges"]))
+                self._discard(part_path, state_path)
+                return self._download_single(url, part_path)
+        self._discard(part_path, state_path)
+        return self._download_single(url, part_path)
+
+    def _verify(self, path: str, expected_size: int, state_path=None):
+        """
+        받은 파일 확인: content-length 와 크기 비교 + mp4 박스 구조. 문제 설명 반환 (정상이면 None)
+        state_path: Range 로 받은 경우의 사이드카. .part 는 미리 전체 크기로 확보되므로 구간별로 받은 바이트 합과 비교
+        """
+        actual_size = os.path.getsize(path)
+        if state_path and os.path.exists(state_path):
+            try:
+                with open(state_path, "r", encoding="utf-8") as f:
+                    actual_size = sum(r["done"] for r in json.load(f)["ranges"])
+            except Exception as e:
+                return f"이어받기 정보 읽기 실패: {str(e)}"
+        if expected_size > 0 and actual_size != expected_size:
+            return f"파일 크기 불일치: {actual_size} / {expected_size} bytes"
+        try:
+            check_structure(path)
+        except Mp4StructureError as e:
+            return str(e)
+        return None
+
+    def _unplan(self, planned: int, done=None):
+        """
+        다시 받게 된 파일의 예정/받은 바이트를 진행 상황에서 되돌림
+        """
+        if self.progress:
+            self.progress.add_planned_bytes(-planned)
+            self._add_progress(-(planned if done is None else done), transferred=False)
+
+    # ------------------------------------------------------------------
+    # 사이드카(.part.json) 관리
+    # ------------------------------------------------------------------
+    def _new_state(self, url, total_size, etag, connections):
+        return {
+            "url": url,
+            "total_size": total_size,
+            "etag": etag,
+            "ranges": [
+                {"start": start, "end": end, "done": 0}
+                for start, end in split_ranges(total_size, connections)
+            ],
+        }
+
+    def _load_state(self, state_path, part_path, url, total_size, etag):
+        """
+        이어 받기가 가능한 사이드카가 있으면 반환, 아니면 남은 파일을 지우고 None
+        """
+        if not (os.path.exists(state_path) and os.path.exists(part_path)):
+            self._discard(part_path, state_path)
+            return None
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except Exception as e:
+            self.log(f"이어받기 정보 읽기 실패, 처음부터 받습니다: {str(e)}")
+            self._discard(part_path, state_path)
+            return None
+
+        # 같은 파일인지 확인 (크기 + ETag). HEAD 가 실패해 크기를 모르면 사이드카의 크기를 믿음
+        if total_size <= 0:
+            total_size = state.get("total_size", 0)
+        same_size = state.get("total_size") == total_size and os.path.getsize(part_path) == total_size
+        same_etag = not etag or not state.get("etag") or state.get("etag") == etag
+        if not (same_size and same_etag):
+            self.log("서버 파일이 변경되어 처음부터 다시 받습니다.")
+            self._discard(part_path, state_path)
+            return None
+
+        state["url"] = url
+        done = sum(r["done"] for r in state["ranges"])
+        self.log(f"이전 다운로드 이어받기: {done}/{total_size} bytes")
+        return state
+
+    def _save_state(self, state_path, state):
+        with self._lock:
+            data = json.dumps(state)
+        tmp_path = state_path + ".tmp"
+        with self._state_lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, state_path)
+
+    def _discard(self, part_path, state_path):
+        for path in (part_path, state_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    # ------------------------------------------------------------------
+    # 전송
+    # ------------------------------------------------------------------
+    def _open_writer(self, part_path: str, buffer_count: int, on_written=None, hasher=None):
+        return BufferedFileWriter(part_path, buffer_count=buffer_count, on_written=on_written, hasher=hasher)
+
+    def _download_single(self, url: str, part_path: str):
+        """
+        Range 미지원 서버: 실패 시 처음부터 다시 받음
+        앞에서부터 차례로 기록하므로 sha256 을 기록하면서 함께 계산. (기대 크기(content-length), sha256) 반환
+        """
+        attempt = 0
+        block = AdaptiveBlockSize(self.block_size, adaptive=self.adaptive_block)
+        planned = 0
+        while True:
+            written = [0]
+            hasher = hashlib.sha256()
+
+            def on_written(tag, nbytes):
+                written[0] += nbytes
+                self._add_progress(nbytes)
+
+            try:
+                with self._slot(url):
+                    response = self.http.get(url, headers=MEDIA_HEADERS, stream=True, timeout=self.timeout)
+                    response.raise_for_status()
+                    total_size = int(response.headers.get("content-length", 0))
+                    if not planned:
+                        planned = total_size
+                        self._plan(total_size)
+
+                    with open(part_path, "wb") as f:
+                        preallocate(f, total_size)
+                    writer = self._open_writer(part_path, 2, on_written=on_written, hasher=hasher)
+                    try:
+                        received = stream_response(response.raw, writer, 0, -1, block, on_read=self._on_read())
+                    finally:
+                        response.close()
+                        writer.close()
+                if total_size > 0 and received != total_size:
+                    raise IncompleteDownload(f"{received}/{total_size} bytes 수신 후 연결 종료")
+                if total_size == 0:
+                    with open(part_path, "r+b") as f:
+                        f.truncate(received)
+                return total_size, hasher.hexdigest()
+            except RETRYABLE_ERRORS as e:
+                # 처음부터 다시 받으므로 이번 시도에서 보고한 바이트는 되돌림
+                self._add_progress(-written[0], transferred=False)
+                self._report_error(e)
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                self.log(f"다운로드 오류, {delay:.0f}초 후 재시도 ({attempt}/{self.max_retries}): {str(e)}")
+                time.sleep(delay)
+
+    def _download_ranges(self, part_path: str, state_path: str, state: dict):
+        total_size = state["total_size"]
+        self._plan(total_size)
+        # 이어받기로 이미 있는 바이트 (속도 계산 제외)
+        self._add_progress(sum(r["done"] for r in state["ranges"]), transferred=False)
+        pending = [r for r in state["ranges"] if r["start"] + r["done"] <= r["end"]]
+        self.log(f"Range 다운로드: {len(pending)}개 연결, 총 {total_size} bytes")
+
+        # 기록이 끝난 바이트만 사이드카에 반영되도록 writer 스레드에서 진행 상황 갱신
+        unsaved = [0]
+
+        def on_written(rng, nbytes):
+            with self._lock:
+                rng["done"] += nbytes
+            self._add_progress(nbytes)
+            unsaved[0] += nbytes
+            if unsaved[0] >= STATE_SAVE_INTERVAL:
+                unsaved[0] = 0
+                self._save_state(state_path, state)
+
+        writer = self._open_writer(part_path, len(pending) * 2, on_written=on_written)
+        errors = []
+        threads = []
+        try:
+            for rng in pending:
+                t = threading.Thread(
+                    target=self._range_worker,
+                    args=(state["url"], state.get("etag", ""), writer, rng, errors),
+                    daemon=True
+                )
+                threads.append(t)
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            try:
+                writer.close()
+            except Exception as e:
+                errors.append(e)
+            # 실패하더라도 진행 상황은 남겨서 다음 실행에 이어 받을 수 있게 함
+            self._save_state(state_path, state)
+
+        if errors:
+            if any(isinstance(e, RangeNotSupported) for e in errors):
+                raise RangeNotSupported()
+            raise errors[0]
+
+    def _range_worker(self, url, etag, writer, rng, errors):
+        attempt = 0
+        block = AdaptiveBlockSize(self.block_size, adaptive=self.adaptive_block)
+        try:
+            while True:
+                # 이전 시도에서 예약한 기록이 끝나야 rng["done"] 이 정확함
+                writer.flush(rng)
+                if rng["start"] + rng["done"] > rng["end"]:
+                    break
+                try:
+                    with self._slot(url):
+                        self._fetch_range(url, etag, writer, rng, block)
+                except RangeNotSupported:
+                    raise
+                except RETRYABLE_ERRORS as e:
+                    self._report_error(e)
+                    attempt += 1
+                    if attempt > self.max_retries:
+                        raise
+                    delay = backoff_delay(attempt)
+                    self.log(
+                        f"구간 {rng['start']}-{rng['end']} 오류, {delay:.0f}초 후 "
+                        f"이어서 재시도 ({attempt}/{self.max_retries}): {str(e)}"
+                    )
+                    time.sleep(delay)
+        except Exception as e:
+            with self._lock:
+                errors.append(e)
+
+    def _fetch_range(self, url, etag, writer, rng, block):
+        offset = rng["start"] + rng["done"]
+        end = rng["end"]
+        headers = dict(MEDIA_HEADERS)
+        headers["Range"] = f"bytes={offset}-{end}"
+        if etag:
+            # 서버 파일이 바뀌었으면 206 대신 200 전체 응답이 옴
+            headers["If-Range"] = etag
+        response = self.http.get(url, headers=headers, stream=True, timeout=self.timeout)
+        response.raise_for_status()
+        if response.status_code != 206:
+            response.close()
+            raise RangeNotSupported()
+
+        length = end - offset + 1
+        try:
+            received = stream_response(response.raw, writer, offset, length, block, tag=rng,
+                                       on_read=self._on_read())
+        finally:
+            response.close()
+        if received < length:
+            raise IncompleteDownload(f"구간 {offset}-{end} 수신 바이트 부족 ({length - received} bytes 남음)")
@@ -4,6 +4,12 @@ import json
 import time
 from PyQt5 import QtCore
 from downloader import ECyberDownloader
+from progress import ProgressAggregator, format_bytes
+from scheduler import DownloadScheduler, DEFAULT_MAX_CONNECTIONS, DEFAULT_PER_HOST_CONNECTIONS
+from segment_cache import DEFAULT_CACHE_LIMIT
+from storage import DEFAULT_VIDEO_BUDGET
+from audio_extract import DEFAULT_AUDIO_FORMAT, DEFAULT_AUDIO_PROFILE
+from postprocess import PostProcessor, DEFAULT_POSTPROCESS_WORKERS
 
 
 class DownloaderWorker(QtCore.QObject):
@@ -21,14 +27,22 @@ class DownloaderWorker(QtCore.QObject):
     # 2차 본인인증이 필요할 때
     auth_confirmation_needed = QtCore.pyqtSignal()
     auth_confirmed_signal = QtCore.pyqtSignal()
-    progress_update_signal = QtCore.pyqtSignal(int)
+    # 집계된 진행 상황 스냅샷 (ProgressAggregator.snapshot(), 최대 10Hz)
+    progress_signal = QtCore.pyqtSignal(dict)
+    # 백그라운드 후처리 진행 {"id", "title", "stage", "percent"} / 완료 {"title", "ok", "error", ...}
+    job_progress_signal = QtCore.pyqtSignal(dict)
+    job_finished_signal = QtCore.pyqtSignal(dict)
 
     def wait_for_auth_confirmation(self):
         loop = QtCore.QEventLoop()
         self.auth_confirmed_signal.connect(loop.quit)
         loop.exec_()
 
-    def __init__(self, username, password, download_dir, headless=False, school_code="catholic", school_domain="e-cyber.catholic.ac.kr", parent=None):
+    def __init__(self, username, password, download_dir, headless=False, school_code="catholic", school_domain="e-cyber.catholic.ac.kr",
+                 max_connections=DEFAULT_MAX_CONNECTIONS, per_host_connections=DEFAULT_PER_HOST_CONNECTIONS,
+                 bandwidth_limit=0, cache_limit=DEFAULT_CACHE_LIMIT, audio_format=DEFAULT_AUDIO_FORMAT,
+                 audio_profile=DEFAULT_AUDIO_PROFILE, parallel_encode=True, video_budget=DEFAULT_VIDEO_BUDGET,
+                 postprocess_workers=DEFAULT_POSTPROCESS_WORKERS, network_capture=True, parent=None):
         super().__init__(parent)
         self.username = username
         self.password = password
@@ -36,9 +50,64 @@ class DownloaderWorker(QtCore.QObject):
         self.headless = headless
         self.school_code = school_code
         self.school_domain = school_domain
+        self.cache_limit = cache_limit
+        self.audio_format = audio_format
+        self.audio_profile = audio_profile
+        self.parallel_encode = parallel_encode
+        self.video_budget = video_budget
+        self.network_capture = network_capture
+        # 이번 실행의 프로필별 음성 변환 통계: 프로필 -> [강의 수, 변환 시간 합계, 용량 합계]
+        self.audio_stats = {}
         self.downloader = None
         self.all_subjects = []
         self.lectures_cache = {}
+        # 전체 다운로드에 걸친 동시 연결/대역폭 제어 (현재 연결 수와 처리량은 진행 스냅샷에 포함)
+        self.scheduler = DownloadScheduler(
+            max_connections=max_connections,
+            per_host=per_host_connections,
+            bandwidth_limit=bandwidth_limit
+        )
+        self.progress = ProgressAggregator(self.progress_signal.emit, stats_provider=self.scheduler.stats)
+        # 병합/음성 추출은 별도 프로세스에서 처리하고 브라우저는 다음 강의로 진행
+        self.postprocessor = PostProcessor(
+            workers=postprocess_workers,
+            log=self.log_signal.emit,
+            on_progress=self.job_progress_signal.emit,
+            on_pending=self.progress.set_postprocess_pending,
+            on_finished=self._postprocess_finished
+        )
+
+    def _postprocess_finished(self, job, outcome, error):
+        if job.get("kind") == "fragment":
+            return
+        outcome = outcome or {}
+        ok = error is None and bool(outcome.get("audio")) and bool(outcome.get("merge_ok"))
+        encode_sec = outcome.get("encode_sec", outcome.get("audio_sec", 0.0))
+        if ok:
+            stats = self.audio_stats.setdefault(outcome.get("audio_profile"), [0, 0.0, 0])
+            stats[0] += 1
+            stats[1] += encode_sec
+            stats[2] += outcome.get("audio_size", 0)
+        self.job_finished_signal.emit({
+            "title": job["title"],
+            "ok": ok,
+            "error": str(error) if error else None,
+            "audio": outcome.get("audio"),
+            "audio_profile": outcome.get("audio_profile"),
+            "audio_size": outcome.get("audio_size", 0),
+            "merge_sec": outcome.get("merge_sec", 0.0),
+            "encode_sec": encode_sec,
+        })
+
+    def log_audio_stats(self):
+        """
+        프로필별 음성 변환 시간/용량 합계와 강의당 평균
+        """
+        for profile, (count, seconds, size) in self.audio_stats.items():
+            self.log_signal.emit(
+                f"[음성 변환 통계] {profile}: 강의 {count}개, 변환 {seconds:.1f}초 "
+                f"(평균 {seconds / count:.1f}초), 용량 {format_bytes(size)} (평균 {format_bytes(size / count)})"
+            )
 
     def auth_callback(self):
         self.auth_confirmation_needed.emit()
@@ -53,9 +122,18 @@ class DownloaderWorker(QtCore.QObject):
             log_callback=self.log_signal.emit,
             download_dir=self.download_dir,
             headless=self.headless,
-            progress_callback=self.progress_update_signal.emit,
+            progress=self.progress,
             school_code=self.school_code,
-            school_domain=self.school_domain
+            school_domain=self.school_domain,
+            connections=self.scheduler.per_host,
+            scheduler=self.scheduler,
+            cache_limit=self.cache_limit,
+            audio_format=self.audio_format,
+            audio_profile=self.audio_profile,
+            parallel_encode=self.parallel_encode,
+            video_budget=self.video_budget,
+            postprocessor=self.postprocessor,
+            network_capture=self.network_capture
         )
         self.downloader.setup_driver()
         self.downloader.login(self.username, self.password)
@@ -114,6 +192,8 @@ class DownloaderWorker(QtCore.QObject):
         eclass_key = subject_info.get("eclassRoom", "")
         lectures_map = self.lectures_cache.get(eclass_key, {})
 
+        # (과목, 다운로드할 주차별 강의) 목록을 먼저 만들어 전체 강의 수를 알 수 있게 함
+        plan = []
         if subject_info.get("과목") == "전체":
             for subj in self.all_subjects:
                 eclass_key2 = subj["eclassRoom"]
@@ -135,7 +215,7 @@ class DownloaderWorker(QtCore.QObject):
                 self.log_signal.emit(
                     f"[전체 과목] {subj['과목']} => 다운로드 주차 {list(filtered.keys())}"
                 )
-                self.downloader.perform_lectures_actions(subj, filtered)
+                plan.append((subj, filtered))
         else:
             # 단일 과목 다운로드
             # 필요하면 여기서도 캐시를 갱신(사용자가 UI에서 주차 정보를 안 불러왔을 수도 있으므로)
@@ -154,7 +234,23 @@ class DownloaderWorker(QtCore.QObject):
             self.log_signal.emit(
                 f"[단일 과목] {subject_info['과목']} => 다운로드 주차 {list(filtered_map.keys())}"
             )
-            self.downloader.perform_lectures_actions(subject_info, filtered_map)
+            plan.append((subject_info, filtered_map))
+
+        total_lectures = sum(len(lectures) for _, m in plan for lectures in m.values())
+        self.audio_stats = {}
+        self.progress.start_run(total_lectures)
+        for subj, filtered in plan:
+            self.downloader.perform_lectures_actions(subj, filtered)
+        # 다운로드가 끝난 뒤 남은 후처리 대기
+        if self.postprocessor.pending():
+            self.log_signal.emit(f"남은 후처리 {self.postprocessor.pending()}개 완료 대기 중...")
+        self.postprocessor.wait()
+        self.log_audio_stats()
+        if self.downloader.waiter:
+            self.downloader.waiter.log_stats()
+        if self.downloader.navigator:
+            self.downloader.navigator.log_stats()
+        self.progress.finish_run()
 
         self.finished_signal.emit()
 
@@ -162,5 +258,6 @@ class DownloaderWorker(QtCore.QObject):
         """
         Worker 종료
         """
+        self.postprocessor.shutdown()
         if self.downloader:
             self.downloader.quit()
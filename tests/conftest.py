@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+테스트 공통 설정: 평면 구조인 src/ 모듈을 바로 import 할 수 있도록 경로 추가
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+HLS/DASH 매니페스트 해석 + 세그먼트 Range 요청 검증 테스트 (tests/fixtures 의 재생목록 사용, 네트워크/ffmpeg 불필요)
+"""
+import os
+
+import pytest
+
+from adaptive_stream import (
+    ManifestError, StreamDownloader, is_manifest_url, parse_iso_duration, parse_m3u8, parse_mpd, select_variant
+)
+from transfer import IncompleteDownload, RangeNotSupported
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+HLS_BASE = "https://lms.example.com/vod/lecture/index.m3u8"
+DASH_BASE = "https://lms.example.com/vod/lecture/manifest.mpd"
+
+
+def read_fixture(name: str):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_is_manifest_url():
+    assert is_manifest_url("https://cdn.example.com/a/index.m3u8?token=abc")
+    assert is_manifest_url("https://cdn.example.com/a/manifest.MPD")
+    assert not is_manifest_url("https://cdn.example.com/a/lecture.mp4")
+    assert not is_manifest_url("https://cdn.example.com/a.m3u8.mp4")
+    assert not is_manifest_url("")
+
+
+def test_parse_iso_duration():
+    assert parse_iso_duration("PT1H2M3.5S") == 3723.5
+    assert parse_iso_duration("P1DT30M") == 86400 + 1800
+    with pytest.raises(ManifestError):
+        parse_iso_duration("1:02:03")
+
+
+# ----------------------------------------------------------------------
+# HLS
+# ----------------------------------------------------------------------
+def test_master_playlist_variants_and_audio_group():
+    parsed = parse_m3u8(read_fixture("master.m3u8"), HLS_BASE)
+
+    assert [v["url"] for v in parsed["variants"]] == [
+        "https://lms.example.com/vod/lecture/360p/index.m3u8",
+        "https://lms.example.com/vod/lecture/720p/index.m3u8",
+        "https://cdn.example.com/1080p/index.m3u8",
+    ]
+    assert parsed["variants"][1]["bandwidth"] == 2400000
+    assert parsed["variants"][1]["resolution"] == (1280, 720)
+    assert all(v["audio"] == "aud" for v in parsed["variants"])
+    # 자막 그룹은 무시하고 음성 그룹만 (DEFAULT 표시 유지)
+    assert list(parsed["media"]) == ["aud"]
+    assert parsed["media"]["aud"] == [
+        {"url": "https://lms.example.com/vod/lecture/audio/ko.m3u8", "default": False},
+        {"url": "https://lms.example.com/vod/lecture/audio/main.m3u8", "default": True},
+    ]
+
+
+def test_select_variant_prefers_bandwidth_then_resolution():
+    parsed = parse_m3u8(read_fixture("master.m3u8"), HLS_BASE)
+    # 720p 와 1080p 의 대역폭이 같으면 해상도가 큰 쪽
+    assert select_variant(parsed["variants"])["url"] == "https://cdn.example.com/1080p/index.m3u8"
+    assert select_variant(parsed["variants"][:2])["resolution"] == (1280, 720)
+
+
+def test_byterange_continuation_and_map():
+    track = parse_m3u8(read_fixture("byterange.m3u8"), HLS_BASE)["track"]
+
+    assert track.kind == "muxed"
+    assert track.init.url == "https://lms.example.com/vod/lecture/lecture.mp4"
+    assert track.init.byte_range == (0, 719)
+    # 오프셋이 없는 BYTERANGE 는 이전 세그먼트 바로 다음부터
+    assert [s.byte_range for s in track.segments] == [(720, 1719), (1720, 2919), (2920, 3719)]
+    assert all(s.url == track.init.url for s in track.segments)
+    assert track.duration == pytest.approx(15.5)
+
+
+def test_aes128_key_inherited_until_changed():
+    track = parse_m3u8(read_fixture("encrypted.m3u8"), HLS_BASE)["track"]
+    first, second, plain, last = track.segments
+
+    assert [s.sequence for s in track.segments] == [7, 8, 9, 10]
+    assert first.key == {"uri": "https://lms.example.com/vod/lecture/keys/k1.bin",
+                         "iv": "0x000102030405060708090a0b0c0d0e0f"}
+    assert second.key == first.key
+    assert plain.key is None
+    # IV 가 없으면 None (다운로드 시 미디어 시퀀스 번호로 계산)
+    assert last.key == {"uri": "https://keys.example.com/k2.bin", "iv": None}
+    assert track.init is None
+
+
+def test_live_playlist_rejected():
+    with pytest.raises(ManifestError):
+        parse_m3u8(read_fixture("live.m3u8"), HLS_BASE)
+
+
+def test_sample_aes_rejected():
+    with pytest.raises(ManifestError):
+        parse_m3u8(read_fixture("sample_aes.m3u8"), HLS_BASE)
+
+
+def test_not_a_playlist_rejected():
+    with pytest.raises(ManifestError):
+        parse_m3u8("<html></html>", HLS_BASE)
+
+
+# ----------------------------------------------------------------------
+# DASH
+# ----------------------------------------------------------------------
+def test_segment_template_number_with_duration():
+    video, audio = parse_mpd(read_fixture("template_number.mpd"), DASH_BASE)
+
+    assert (video.kind, audio.kind) == ("video", "audio")
+    # 대역폭이 가장 높은 표현
+    assert video.bandwidth == 1800000
+    assert video.init.url == "https://lms.example.com/vod/lecture/media/v720/init.mp4"
+    assert [s.url.rsplit("/", 1)[1] for s in video.segments] == [
+        "seg-00001.m4s", "seg-00002.m4s", "seg-00003.m4s", "seg-00004.m4s", "seg-00005.m4s"
+    ]
+    # 마지막 세그먼트는 남은 시간만큼
+    assert [s.duration for s in video.segments] == [2.0, 2.0, 2.0, 2.0, 1.5]
+    assert audio.segments[0].url == "https://lms.example.com/vod/lecture/media/a128/seg-00001.m4s"
+    assert audio.duration == pytest.approx(9.5)
+
+
+def test_segment_timeline_repeat_to_period_end():
+    (track,) = parse_mpd(read_fixture("timeline.mpd"), DASH_BASE)
+
+    # 영상만 있으면 하나의 스트림
+    assert track.kind == "muxed"
+    assert track.init.url == "https://lms.example.com/vod/lecture/init-1000000.mp4"
+    times = [int(s.url.rsplit("-", 1)[1].split(".")[0]) for s in track.segments]
+    # r="1" -> 4초 2개, r="-1" -> 기간(20초) 끝까지 2초씩 6개
+    assert times == [0, 360000, 720000, 900000, 1080000, 1260000, 1440000, 1620000]
+    assert [s.duration for s in track.segments] == [4.0, 4.0] + [2.0] * 6
+    assert track.duration == pytest.approx(20.0)
+
+
+def test_segment_list_byte_ranges():
+    (track,) = parse_mpd(read_fixture("segment_list.mpd"), DASH_BASE)
+
+    url = "https://media.example.com/lectures/week1/lecture.mp4"
+    assert track.init.url == url
+    assert track.init.byte_range == (0, 899)
+    assert [s.url for s in track.segments] == [url] * 3
+    assert [s.byte_range for s in track.segments] == [(900, 50899), (50900, 99999), (100000, 140000)]
+    assert [s.duration for s in track.segments] == [4.0, 4.0, 4.0]
+
+
+def test_segment_base_whole_file_per_track():
+    video, audio = parse_mpd(read_fixture("segment_base.mpd"), DASH_BASE)
+
+    assert video.init is None and audio.init is None
+    assert [s.url for s in video.segments] == ["https://lms.example.com/vod/lecture/lecture_video.mp4"]
+    assert [s.url for s in audio.segments] == ["https://lms.example.com/vod/lecture/lecture_audio.mp4"]
+    assert video.segments[0].byte_range is None
+    assert video.duration == 90.0
+
+
+def test_dynamic_mpd_rejected():
+    with pytest.raises(ManifestError):
+        parse_mpd(read_fixture("live.mpd"), DASH_BASE)
+
+
+def test_drm_mpd_rejected():
+    with pytest.raises(ManifestError):
+        parse_mpd(read_fixture("drm.mpd"), DASH_BASE)
+
+
+def test_malformed_mpd_rejected():
+    with pytest.raises(ManifestError):
+        parse_mpd("<MPD><Period>", DASH_BASE)
+
+
+class FakeResponse:
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {"content-length": str(len(content))}
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeHttp:
+    """
+    요청마다 정해 둔 (상태 코드, 본문) 을 돌려주는 HttpClient 대용
+    """
+
+    def __init__(self, status_code, content):
+        self.response = FakeResponse(status_code, content)
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append(headers.get("Range"))
+        return self.response
+
+
+def test_ranged_get_rejects_full_body():
+    http = FakeHttp(200, b"x" * 1000)
+    downloader = StreamDownloader(print, http=http, max_retries=0)
+
+    with pytest.raises(RangeNotSupported):
+        downloader._get("https://media.example.com/lecture.mp4", (100, 199))
+    assert http.requests == ["bytes=100-199"]
+
+
+def test_ranged_get_requires_exact_length():
+    downloader = StreamDownloader(print, http=FakeHttp(206, b"x" * 99), max_retries=0)
+    with pytest.raises(IncompleteDownload):
+        downloader._get("https://media.example.com/lecture.mp4", (100, 199))
+
+    downloader = StreamDownloader(print, http=FakeHttp(206, b"x" * 100), max_retries=0)
+    assert downloader._get("https://media.example.com/lecture.mp4", (100, 199)) == b"x" * 100
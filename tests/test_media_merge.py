@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+재인코딩 병합(transcode_concat) 메모리 테스트
+- 벤치마크의 generate_part 로 짧은 가짜 분할 20개를 만들고, 5개/20개를 각각 새 파이썬 프로세스에서 병합
+- 그 프로세스의 자식(ffmpeg) 최대 RSS(RUSAGE_CHILDREN.ru_maxrss)가 분할 수와 관계없이 비슷한지,
+  ffmpeg 가 동시에 하나만 떠 있는지 확인
+- ffmpeg(imageio-ffmpeg 또는 PATH)와 /proc 가 있는 환경(Linux)에서만 실행
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+resource = pytest.importorskip("resource")
+
+from ffmpeg_util import FFmpegError, ffmpeg_exe  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from run_benchmarks import generate_part  # noqa: E402
+
+PART_SECONDS = 1.0
+PART_SIZE = "320x180"
+# 분할 4배 증가에 허용하는 최대 RSS 증가 (비율, KB)
+RSS_RATIO = 1.25
+RSS_SLACK_KB = 16 * 1024
+
+# 병합 프로세스: /proc 를 훑어 살아 있는 ffmpeg 자식 수를 기록하며 transcode_concat 실행
+_MEASURE_SCRIPT = r"""
+import json, os, resource, sys, threading
+sys.path.insert(0, sys.argv[1])
+from media_merge import transcode_concat
+
+def ffmpeg_children(pid):
+    count = 0
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        comm = stat[stat.index("(") + 1:stat.rindex(")")]
+        ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+        if ppid == pid and "ffmpeg" in comm:
+            count += 1
+    return count
+
+most, stop = [0], threading.Event()
+def sample():
+    while not stop.is_set():
+        most[0] = max(most[0], ffmpeg_children(os.getpid()))
+        stop.wait(0.005)
+sampler = threading.Thread(target=sample, daemon=True)
+sampler.start()
+transcode_concat(sys.argv[3:], sys.argv[2])
+stop.set()
+sampler.join()
+print(json.dumps({"peak_kb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss, "max_children": most[0]}))
+"""
+
+
+@pytest.fixture(scope="module")
+def parts(tmp_path_factory):
+    try:
+        ffmpeg_exe()
+    except FFmpegError:
+        pytest.skip("ffmpeg 없음")
+    if not os.path.isdir("/proc"):
+        pytest.skip("/proc 없음")
+    work_dir = tmp_path_factory.mktemp("parts")
+    return [generate_part(str(work_dir / f"part{index:02d}.mp4"), PART_SECONDS, PART_SIZE) for index in range(20)]
+
+
+def _measure(paths, output):
+    completed = subprocess.run(
+        [sys.executable, "-c", _MEASURE_SCRIPT, os.path.join(ROOT, "src"), output] + list(paths),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
+    )
+    return json.loads(completed.stdout.decode().strip().splitlines()[-1])
+
+
+def test_transcode_concat_peak_rss_independent_of_part_count(parts, tmp_path):
+    few = _measure(parts[:5], str(tmp_path / "few.mp4"))
+    many = _measure(parts, str(tmp_path / "many.mp4"))
+
+    assert os.path.getsize(tmp_path / "many.mp4") > os.path.getsize(tmp_path / "few.mp4") > 0
+    # 분할마다 ffmpeg 하나씩 순서대로 실행
+    assert few["max_children"] == 1
+    assert many["max_children"] == 1
+    # 분할이 4배여도 가장 큰 ffmpeg 의 메모리는 거의 같음
+    assert many["peak_kb"] <= few["peak_kb"] * RSS_RATIO + RSS_SLACK_KB, (few, many)